@@ -2,43 +2,79 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
 from .config import Config
+from .utils.db_routing import RoutingSession
+import importlib
 import logging
 import os
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 ma = Marshmallow()
 
+# Blueprint API: (modul app.routes, nama blueprint, url_prefix)
+BLUEPRINTS = (
+    ('auth', 'auth_bp', '/api/auth'),
+    ('users', 'users_bp', '/api/users'),
+    ('products', 'products_bp', '/api/products'),
+    ('crawler', 'crawler_bp', '/api/crawler'),
+    ('orders', 'orders_bp', '/api/orders'),
+    ('cart', 'cart_bp', '/api/cart'),
+)
+
 def create_app():
+    """
+    App factory. Tidak menyentuh skema database (lihat `flask --app wsgi migrate` di app/cli.py) dan tidak
+    memuat library crawler/import; waktu import dan RSS per blueprint dicatat di app.extensions['startup_report'].
+    """
+    from .utils.startup_report import StartupReport
+    report = StartupReport()
+
     app = Flask(__name__)
     app.config.from_object(Config)
 
     db.init_app(app)
     ma.init_app(app)
 
-    from .models.user import User, Session, UserActivity
-    from .models.product import Product, ProductStaging, Category, Brand, ProductImage, Inventory
-    from .models.crawler import CrawlQueue
-    
-    # Import skema produk di sini juga (atau melalui __init__.py di schemas/)
-    # Ini memastikan Marshmallow tahu tentang skema-skema tersebut
-    from .schemas.user_schema import UserSchema # UserSchema diimpor di sini
-    from .schemas.product_schema import ProductSchema # <-- Penting: Impor ProductSchema agar terdaftar
-
-    from .routes.auth import auth_bp
-    from .routes.users import users_bp
-    from .routes.products import products_bp
-    from .routes.crawler import crawler_bp
-
-    app.register_blueprint(auth_bp, url_prefix='/api/auth')
-    app.register_blueprint(users_bp, url_prefix='/api/users')
-    app.register_blueprint(products_bp, url_prefix='/api/products')
-    app.register_blueprint(crawler_bp, url_prefix='/api/crawler')
-
-    with app.app_context():
-        db.create_all()
-        logger.info("Tabel database telah dibuat (jika belum ada).")
-    
-    return app
\ No newline at end of file
+    from .utils.request_metrics import init_request_metrics
+    init_request_metrics(app)
+
+    with report.measure('models'):
+        from .models.user import User, Session, UserActivity
+        from .models.product import Product, ProductStaging, Category, Brand, ProductImage, Inventory
+        from .models.crawler import CrawlQueue, CrawlJob
+        from .models.order import Order, OrderItem, StockReservation
+        from .models.cart import Cart, CartItem
+        from .models.analytics import UserActivityDaily, ProductActivityDaily
+
+        # Import skema produk di sini juga (atau melalui __init__.py di schemas/)
+        # Ini memastikan Marshmallow tahu tentang skema-skema tersebut
+        from .schemas.user_schema import UserSchema # UserSchema diimpor di sini
+        from .schemas.product_schema import ProductSchema # <-- Penting: Impor ProductSchema agar terdaftar
+
+    for module_name, blueprint_name, url_prefix in BLUEPRINTS:
+        with report.measure(blueprint_name):
+            module = importlib.import_module(f'.routes.{module_name}', __name__)
+        app.register_blueprint(getattr(module, blueprint_name), url_prefix=url_prefix)
+
+    from .utils.compression import init_compression
+    init_compression(app)
+
+    from .utils.db_routing import init_db_routing
+    init_db_routing(app)
+
+    from .cli import register_cli
+    register_cli(app)
+
+    if app.config.get('TYPEAHEAD_BUILD_ON_STARTUP'):
+        with app.app_context(), report.measure('typeahead_index'):
+            from .services.typeahead_service import TypeaheadService
+            try:
+                TypeaheadService.build()
+            except Exception as e:
+                logger.error(f"Gagal membangun indeks typeahead saat startup: {e}")
+
+    app.extensions['startup_report'] = report.finish()
+    report.log()
+    return app
@@ -0,0 +1,88 @@
+import json
+import logging
+
+import click
+
+logger = logging.getLogger(__name__)
+
+# Perintah CLI aplikasi: flask --app wsgi <perintah>
+# create_app tidak lagi menyentuh skema database; tabel dan partisi dibuat lewat `flask --app wsgi migrate`
+# sekali per deploy (sebelum worker API dan worker.py dijalankan).
+
+
+# Perubahan kolom pada tabel yang sudah ada (create_all hanya membuat tabel baru). Idempoten, urut.
+SCHEMA_UPGRADES = (
+    # Posisi sync commit-ordered untuk product_changes (entri lama mendapat txid transaksi migrasi ini)
+    "ALTER TABLE product_changes ADD COLUMN IF NOT EXISTS txid BIGINT NOT NULL "
+    "DEFAULT (pg_current_xact_id()::text::bigint)",
+    "CREATE INDEX IF NOT EXISTS idx_product_changes_position ON product_changes (txid, id)",
+    # Lease job crawling yang sedang berjalan
+    "ALTER TABLE crawl_jobs ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP WITH TIME ZONE",
+)
+
+
+def upgrade_schema():
+    from sqlalchemy import text
+    from app import db
+
+    for statement in SCHEMA_UPGRADES:
+        db.session.execute(text(statement))
+    db.session.commit()
+
+
+def backfill_read_models():
+    """
+    Mengisi product_cards (dan product_facet_counts) jika masih kosong sementara products sudah berisi, mis. setelah
+    upgrade dari skema tanpa read model. Tanpa ini list_products, /sync, dan facet membaca read model kosong.
+    """
+    from sqlalchemy import select, exists
+    from app import db
+    from app.models.product import Product, ProductCard
+    from app.services.product_card_service import ProductCardService
+    from app.services.facet_service import FacetService
+
+    needs_backfill = db.session.execute(
+        select(exists().where(Product.id.isnot(None)) & ~exists().where(ProductCard.product_id.isnot(None)))
+    ).scalar()
+    db.session.rollback()
+    if not needs_backfill:
+        return 0
+
+    logger.info("product_cards kosong sementara products berisi, membangun ulang read model...")
+    total = ProductCardService.rebuild_all()
+    FacetService.rebuild()
+    return total
+
+
+def migrate_database():
+    """
+    Mengonversi user_activities lama ke tabel terpartisi, membuat tabel yang belum ada, menjalankan SCHEMA_UPGRADES,
+    mengisi read model yang masih kosong, dan membuat partisi bulanan ke depan.
+    Idempoten; dijalankan di dalam app context.
+    """
+    from app import db
+    from app.services.price_history_service import PriceHistoryService
+    from app.services.activity_rollup_service import ActivityRollupService
+
+    # create_all melewati tabel yang sudah ada, jadi user_activities lama (tanpa partisi) dikonversi lebih dulu
+    ActivityRollupService.convert_unpartitioned_table()
+    db.create_all()
+    logger.info("Tabel database telah dibuat (jika belum ada).")
+    upgrade_schema()
+    backfill_read_models()
+
+    created = PriceHistoryService.ensure_partitions() + ActivityRollupService.ensure_partitions()
+    logger.info(f"Partisi bulanan siap: {', '.join(created) if created else 'tidak ada partisi baru'}")
+    return created
+
+
+def register_cli(app):
+    @app.cli.command('migrate')
+    def migrate_command():
+        """Membuat tabel dan partisi database yang belum ada dan mengisi read model yang masih kosong."""
+        migrate_database()
+
+    @app.cli.command('startup-report')
+    def startup_report_command():
+        """Menampilkan waktu import dan RSS per blueprint saat app dibuat."""
+        click.echo(json.dumps(app.extensions['startup_report'].as_dict(), indent=2))
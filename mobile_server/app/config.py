@@ -8,13 +8,136 @@ class Config:
                             'postgresql://postgres:1@localhost:5432/server_mobile'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Pool koneksi per proses (berlaku juga untuk replica). statement_timeout 0 = tanpa batas;
+    # gunicorn.conf.py memasang batas untuk web worker, job batch di worker.py tetap tanpa batas.
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.environ.get('DB_POOL_SIZE', 5)),
+        "max_overflow": int(os.environ.get('DB_MAX_OVERFLOW', 5)),
+        "pool_timeout": int(os.environ.get('DB_POOL_TIMEOUT', 5)), # Detik menunggu koneksi sebelum error (bukan antre lama)
+        "pool_recycle": int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        "pool_pre_ping": True,
+        "connect_args": {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"},
+    }
+
+    # Read replica opsional (dipisahkan koma). GET membaca dari replica; setelah request tulis,
+    # pengguna dipin ke primary selama DB_REPLICA_PIN_SECONDS (read-your-writes).
+    SQLALCHEMY_BINDS = {
+        f"replica_{index}": url.strip()
+        for index, url in enumerate((os.environ.get('DATABASE_REPLICA_URLS') or '').split(','))
+        if url.strip()
+    }
+    DB_REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', 10))
+    DB_REPLICA_PIN_CACHE_SIZE = 100000
+
     STATIC_SALT = os.environ.get('STATIC_SALT') or 'ini_adalah_static_salt_anda_yang_super_panjang_dan_rahasia_di_dev'
 
     MOBILE_TOKEN_EXPIRY_DAYS = 90
 
     DEFAULT_PAGE_SIZE = 20
     MAX_PAGE_SIZE = 100
+    MAX_BATCH_PRODUCT_IDS = 50
+    DEFAULT_SYNC_PAGE_SIZE = 500
+    MAX_SYNC_PAGE_SIZE = 2000
 
       # Konfigurasi Rentang Stok Acak
     MIN_STOCK_RANDOM = 10  # Stok minimum saat diacak
     MAX_STOCK_RANDOM = 100 # Stok maksimum saat diacak
+
+    # Batas bawah setiap bucket harga untuk facet histogram harga (Rupiah, urut naik)
+    PRICE_FACET_BUCKETS = [0, 25000, 50000, 100000, 250000, 500000, 1000000]
+
+    # Kompresi respons (gzip, atau brotli jika paket 'brotli' terpasang)
+    COMPRESS_ENABLED = True
+    COMPRESS_MIN_SIZE = 1024 # Byte; respons lebih kecil tidak dikompres
+    COMPRESS_LEVEL = 6
+    COMPRESS_MIMETYPES = ['application/json', 'text/plain', 'text/csv']
+
+    # Reservasi stok & checkout
+    RESERVATION_TTL_SECONDS = 600 # Reservasi yang tidak di-checkout dikembalikan ke stok setelah ini
+    MAX_RESERVATION_QUANTITY = 10
+    RESERVATION_EXPIRY_BATCH_SIZE = 500
+    STOCK_SYNC_OVERLAP_SECONDS = 60 # Sinkronisasi stok mengulang jendela ini di belakang watermark (transaksi yang commit terlambat)
+    CARD_REFRESH_RETRY_BATCH_SIZE = 500 # Produk per run job refresh ulang product_cards yang gagal
+
+    # Keranjang
+    MAX_CART_ITEM_QUANTITY = 99
+    MAX_CART_OPERATIONS = 50 # Operasi per permintaan batch keranjang
+
+    # Typeahead (autocomplete nama produk & merek, indeks in-memory per proses)
+    TYPEAHEAD_BUILD_ON_STARTUP = True
+    TYPEAHEAD_DEFAULT_LIMIT = 8
+    TYPEAHEAD_MAX_LIMIT = 20
+    TYPEAHEAD_MAX_WORDS = 8 # Kata pertama nama yang bisa menjadi awal pencocokan
+    TYPEAHEAD_CHECK_INTERVAL_SECONDS = 30 # Interval pemeriksaan versi katalog
+    TYPEAHEAD_POPULARITY_DAYS = 30
+    TYPEAHEAD_POPULARITY_REFRESH_SECONDS = 600
+
+    # Rekomendasi "produk serupa" (co-view, dibangun offline)
+    RECOMMENDATION_WINDOW_DAYS = 90 # Rentang event view_product yang dipakai
+    RECOMMENDATION_TOP_K = 20 # Tetangga yang disimpan per produk
+    RECOMMENDATION_MIN_COVIEWS = 2 # Minimal user yang melihat kedua produk
+    RECOMMENDATION_MAX_ITEMS_PER_USER = 500 # User dengan view lebih banyak (bot) diabaikan
+    DEFAULT_SIMILAR_LIMIT = 10
+
+    # Cache verifikasi token (per proses). Perubahan sesi di proses lain terlihat paling lama setelah TTL,
+    # jadi TTL positif dijaga pendek: token yang dicabut (logout/login ulang) berhenti berlaku di semua worker dalam detik.
+    AUTH_TOKEN_CACHE_SIZE = 10000
+    AUTH_TOKEN_CACHE_TTL_SECONDS = 5
+    AUTH_NEGATIVE_CACHE_TTL_SECONDS = 30
+
+    # Reaper sesi kadaluwarsa
+    SESSION_REAPER_BATCH_SIZE = 1000
+    SESSION_REAPER_INTERVAL_MINUTES = 10
+
+    # Hashing password: scrypt (memory-hard) dengan format berversi; hash SHA-256 lama di-rehash saat login
+    SCRYPT_N = int(os.environ.get('SCRYPT_N', 2 ** 14))
+    SCRYPT_R = 8
+    SCRYPT_P = 1
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2)) # Hashing paralel maksimum per proses
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 16)) # Di atas ini login/registrasi ditolak 503
+    PASSWORD_HASH_TIMEOUT_SECONDS = 10
+    PASSWORD_HASH_RETRY_AFTER_SECONDS = 1
+
+    # Pencatatan aktivitas asinkron: buffer per proses, ditulis per batch oleh thread latar
+    ACTIVITY_ASYNC_LOGGING = os.environ.get('ACTIVITY_ASYNC_LOGGING', 'true').lower() == 'true'
+    ACTIVITY_BUFFER_MAX_EVENTS = 10000 # Di atas ini event dibuang (dihitung di statistik)
+    ACTIVITY_FLUSH_BATCH_SIZE = 500
+    ACTIVITY_FLUSH_INTERVAL_MS = 1000
+    ACTIVITY_WRITE_MAX_RETRIES = 3 # Batch yang gagal ditulis dicoba ulang sebanyak ini sebelum dibuang
+    ACTIVITY_WRITE_RETRY_BACKOFF_MS = 500 # Jeda sebelum percobaan ulang pertama, berlipat dua setiap kegagalan
+
+    # user_activities dipartisi per bulan: partisi lebih tua dari retensi di-DROP, rollup harian disimpan
+    ACTIVITY_RETENTION_MONTHS = 13
+    ACTIVITY_ROLLUP_LOOKBACK_DAYS = 2 # Hari ini dan kemarin dihitung ulang setiap job rollup
+    ACTIVITY_ROLLUP_INTERVAL_MINUTES = 60
+    ACTIVITY_ANALYTICS_MAX_DAYS = 366
+
+    # Produk trending: counter view dengan peluruhan eksponensial, nama window -> half-life (detik)
+    TRENDING_WINDOWS = {'1h': 3600, '24h': 86400, '7d': 7 * 86400}
+    TRENDING_DEFAULT_WINDOW = '24h'
+    TRENDING_DEFAULT_LIMIT = 20
+    TRENDING_MAX_LIMIT = 50
+    TRENDING_FLUSH_SECONDS = 10 # Kenaikan counter per proses dipersist paling lambat setiap interval ini
+    TRENDING_SNAPSHOT_SECONDS = 30 # Umur maksimum snapshot top-N per proses
+    TRENDING_MIN_SCORE = 0.01 # Counter di bawah skor ini dihapus oleh job prune
+
+    # Instrumentasi per request: jumlah/waktu SQL, waktu serialisasi dan handler, header Server-Timing,
+    # log request lambat, histogram latensi per route (per proses)
+    REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS_ENABLED', 'true').lower() == 'true'
+    REQUEST_SERVER_TIMING = True
+    REQUEST_SLOW_MS = int(os.environ.get('REQUEST_SLOW_MS', 500))
+    REQUEST_SLOW_TOP_STATEMENTS = 5
+    REQUEST_LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    # Job crawling: API/scheduler hanya memasukkan job ke crawl_jobs, proses crawler (worker.py) menjalankannya
+    CRAWL_MAX_CONCURRENT_JOBS = int(os.environ.get('CRAWL_MAX_CONCURRENT_JOBS', 1)) # Satu browser Chrome per job
+    CRAWL_MAX_QUEUED_JOBS = 20 # Di atas ini permintaan crawl baru ditolak 503
+    CRAWL_QUEUE_RETRY_AFTER_SECONDS = 60
+    CRAWL_DISPATCH_INTERVAL_SECONDS = 5
+    CRAWL_JOB_LEASE_SECONDS = 300 # Lease job 'running', diperpanjang setiap dispatch; yang kedaluwarsa dianggap terputus
+    CRAWL_JOB_MAX_ATTEMPTS = 3 # Job yang terputus sebanyak ini ditandai 'failed', tidak diantre ulang
+    CRAWL_DEFAULT_LIMIT = 50
+    CRAWL_MAX_LIMIT = 500 # Batas URL per job
+    CRAWL_SCHEDULED_SEED_URL = "https://www.jakmall.com/search?q=aksesoris%20fashion"
+    CRAWL_SCHEDULED_LIMIT = 1
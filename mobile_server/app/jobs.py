@@ -0,0 +1,151 @@
+import logging
+from datetime import datetime, timezone
+
+from app.services.crawl_job_service import CrawlJobService, CrawlJobQueueFull
+from app.services.price_history_service import PriceHistoryService
+from app.services.reservation_service import ReservationService
+from app.services.product_card_service import ProductCardService
+from app.services.recommendation_service import RecommendationService
+from app.services.auth_service import AuthService
+from app.services.activity_rollup_service import ActivityRollupService
+from app.services.trending_service import TrendingService
+
+logger = logging.getLogger(__name__)
+
+# Job terjadwal (crawling dan pemeliharaan). Didaftarkan ke scheduler oleh worker.py (proses terpisah dari
+# web worker) atau oleh run.py saat development. Setiap job berjalan di app context-nya sendiri.
+
+
+def scheduled_crawl_job(app):
+    with app.app_context():
+        try:
+            job, created = CrawlJobService.submit(
+                app.config['CRAWL_SCHEDULED_SEED_URL'], app.config['CRAWL_SCHEDULED_LIMIT'], source='scheduler'
+            )
+            if created:
+                logger.info(f"[{datetime.now(timezone.utc)}] Job crawling terjadwal masuk antrean (job {job['id']}).")
+            else:
+                logger.info(f"[{datetime.now(timezone.utc)}] Job crawling terjadwal dilewati, job {job['id']} masih {job['status']}.")
+        except CrawlJobQueueFull:
+            logger.warning(f"[{datetime.now(timezone.utc)}] Job crawling terjadwal dilewati: antrean crawling penuh.")
+        except Exception as e:
+            logger.error(f"[{datetime.now(timezone.utc)}] Job crawling terjadwal gagal: {e}")
+
+
+def scheduled_crawl_dispatch_job(app):
+    with app.app_context():
+        try:
+            CrawlJobService.dispatch(app)
+        except Exception as e:
+            logger.error(f"Dispatch job crawling gagal: {e}")
+
+
+def scheduled_partition_maintenance_job(app):
+    with app.app_context():
+        try:
+            created = PriceHistoryService.ensure_partitions() + ActivityRollupService.ensure_partitions()
+            ActivityRollupService.apply_retention()
+            logger.info(f"Pemeliharaan partisi selesai: {', '.join(created)}")
+        except Exception as e:
+            logger.error(f"Pemeliharaan partisi gagal: {e}")
+
+
+def scheduled_reservation_expiry_job(app):
+    with app.app_context():
+        try:
+            ReservationService.release_expired_reservations()
+        except Exception as e:
+            logger.error(f"Pengembalian reservasi kadaluwarsa gagal: {e}")
+
+
+def scheduled_stock_sync_job(app):
+    with app.app_context():
+        try:
+            ProductCardService.sync_stock()
+        except Exception as e:
+            logger.error(f"Sinkronisasi stok product_cards gagal: {e}")
+
+
+def scheduled_card_refresh_retry_job(app):
+    with app.app_context():
+        try:
+            ProductCardService.refresh_queued()
+        except Exception as e:
+            logger.error(f"Refresh ulang product_cards gagal: {e}")
+
+
+def scheduled_recommendation_job(app):
+    with app.app_context():
+        try:
+            RecommendationService.build_neighbors()
+        except Exception as e:
+            logger.error(f"Build rekomendasi produk gagal: {e}")
+
+
+def scheduled_session_reaper_job(app):
+    with app.app_context():
+        try:
+            AuthService.purge_expired_sessions()
+        except Exception as e:
+            logger.error(f"Penghapusan sesi kadaluwarsa gagal: {e}")
+
+
+def scheduled_activity_rollup_job(app):
+    with app.app_context():
+        try:
+            ActivityRollupService.rollup_recent()
+        except Exception as e:
+            logger.error(f"Rollup aktivitas harian gagal: {e}")
+
+
+def scheduled_trending_rebuild_job(app):
+    with app.app_context():
+        try:
+            TrendingService.rebuild_if_empty()
+        except Exception as e:
+            logger.error(f"Rebuild counter trending gagal: {e}")
+
+
+def scheduled_trending_prune_job(app):
+    with app.app_context():
+        try:
+            TrendingService.prune()
+        except Exception as e:
+            logger.error(f"Prune counter trending gagal: {e}")
+
+
+def register_jobs(scheduler, app):
+    """
+    Mendaftarkan semua job terjadwal ke scheduler APScheduler (Background atau Blocking).
+    """
+    config = app.config
+    now = datetime.now(timezone.utc)
+
+    # --- Crawling: job dimasukkan ke antrean sekali saat start lalu setiap jam; antrean (termasuk job dari API)
+    #     diklaim berkala dan dijalankan di executor berukuran CRAWL_MAX_CONCURRENT_JOBS ---
+    scheduler.add_job(scheduled_crawl_job, 'date', run_date=now, args=[app], id='initial_crawl_job')
+    scheduler.add_job(scheduled_crawl_job, 'interval', hours=1, args=[app], id='recurring_crawl_job')
+    scheduler.add_job(scheduled_crawl_dispatch_job, 'interval', seconds=config['CRAWL_DISPATCH_INTERVAL_SECONDS'], args=[app], id='crawl_dispatch_job')
+
+    # --- Partisi bulanan (riwayat harga/stok, aktivitas) dibuat beberapa bulan ke depan, partisi aktivitas lama dihapus ---
+    scheduler.add_job(scheduled_partition_maintenance_job, 'date', run_date=now, args=[app], id='initial_partition_maintenance_job')
+    scheduler.add_job(scheduled_partition_maintenance_job, 'interval', days=1, args=[app], id='partition_maintenance_job')
+
+    # --- Reservasi kadaluwarsa dikembalikan ke stok, stok read model disusulkan dari inventory,
+    #     refresh product_cards yang gagal dicoba ulang ---
+    scheduler.add_job(scheduled_reservation_expiry_job, 'interval', minutes=1, args=[app], id='reservation_expiry_job')
+    scheduler.add_job(scheduled_stock_sync_job, 'interval', minutes=1, args=[app], id='stock_sync_job')
+    scheduler.add_job(scheduled_card_refresh_retry_job, 'interval', minutes=1, args=[app], id='card_refresh_retry_job')
+
+    # --- Sesi kadaluwarsa dihapus per batch ---
+    scheduler.add_job(scheduled_session_reaper_job, 'interval', minutes=config['SESSION_REAPER_INTERVAL_MINUTES'], args=[app], id='session_reaper_job')
+
+    # --- Rollup aktivitas harian (hari ini dan kemarin) untuk analitik dan popularitas ---
+    scheduler.add_job(scheduled_activity_rollup_job, 'interval', minutes=config['ACTIVITY_ROLLUP_INTERVAL_MINUTES'], args=[app], id='activity_rollup_job')
+
+    # --- Counter trending: dibangun dari rollup/event saat startup jika kosong, counter yang sudah meluruh dihapus ---
+    scheduler.add_job(scheduled_trending_rebuild_job, 'date', run_date=now, args=[app], id='trending_rebuild_job')
+    scheduler.add_job(scheduled_trending_prune_job, 'interval', hours=6, args=[app], id='trending_prune_job')
+
+    # --- Rekomendasi produk serupa dibangun ulang setiap malam ---
+    scheduler.add_job(scheduled_recommendation_job, 'cron', hour=2, minute=0, args=[app], id='recommendation_job')
@@ -0,0 +1,58 @@
+from app import db
+
+
+class UserActivityDaily(db.Model):
+    """
+    Rollup harian aktivitas per pengguna dan jenis aktivitas (jumlah pengguna aktif per hari, dsb.).
+    Diisi ulang per hari oleh ActivityRollupService dari user_activities.
+    """
+    __tablename__ = 'user_activity_daily'
+
+    day = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, primary_key=True)
+    activity_type = db.Column(db.String(100), primary_key=True)
+    event_count = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<UserActivityDaily {self.day} User {self.user_id} {self.activity_type}: {self.event_count}>"
+
+
+class ProductActivityDaily(db.Model):
+    """
+    Rollup harian aktivitas per produk dan jenis aktivitas (view, tambah ke keranjang, ...).
+    Tanpa foreign key ke products agar riwayat tetap ada setelah produk dihapus.
+    """
+    __tablename__ = 'product_activity_daily'
+
+    day = db.Column(db.Date, primary_key=True)
+    product_id = db.Column(db.Integer, primary_key=True)
+    activity_type = db.Column(db.String(100), primary_key=True)
+    event_count = db.Column(db.Integer, nullable=False)
+    unique_users = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_product_activity_daily_product', product_id, day), # Statistik harian satu produk
+    )
+
+    def __repr__(self):
+        return f"<ProductActivityDaily {self.day} Product {self.product_id} {self.activity_type}: {self.event_count}>"
+
+
+class ProductTrendingScore(db.Model):
+    """
+    Counter view produk dengan peluruhan eksponensial per window (lihat app/utils/decayed_counter.py).
+    log_score tidak berubah seiring waktu, sehingga top-N = scan indeks (window_name, log_score DESC).
+    """
+    __tablename__ = 'product_trending_scores'
+
+    window_name = db.Column(db.String(16), primary_key=True)
+    product_id = db.Column(db.Integer, primary_key=True)
+    log_score = db.Column(db.Float(precision=53), nullable=False)
+    updated_at = db.Column(db.TIMESTAMP(timezone=True), nullable=False, server_default=db.func.now())
+
+    __table_args__ = (
+        db.Index('idx_trending_window_score', window_name, log_score.desc()), # Top-N per window tanpa sort
+    )
+
+    def __repr__(self):
+        return f"<ProductTrendingScore {self.window_name} Product {self.product_id}: {self.log_score}>"
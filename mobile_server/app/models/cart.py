@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+from app import db
+
+class Cart(db.Model):
+    __tablename__ = 'carts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), unique=True, nullable=False)
+    created_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    items = db.relationship('CartItem', backref='cart', lazy=True, cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<Cart {self.id} User {self.user_id}>"
+
+class CartItem(db.Model):
+    __tablename__ = 'cart_items'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cart_id = db.Column(db.Integer, db.ForeignKey('carts.id', ondelete='CASCADE'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='RESTRICT'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False, default=1)
+    price_at_add = db.Column(db.Numeric(15, 2), nullable=False)
+    added_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.UniqueConstraint('cart_id', 'product_id'),
+    )
+
+    def __repr__(self):
+        return f"<CartItem Cart {self.cart_id} Product {self.product_id} x{self.quantity}>"
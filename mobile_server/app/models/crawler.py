@@ -9,4 +9,39 @@ class CrawlQueue(db.Model):
     added_at = db.Column(db.TIMESTAMP(timezone=True), default=datetime.now(timezone.utc))
 
     def __repr__(self):
-        return f"<CrawlQueue {self.url} - {self.status}>"
\ No newline at end of file
+        return f"<CrawlQueue {self.url} - {self.status}>"
+
+class CrawlJob(db.Model):
+    __tablename__ = 'crawl_jobs'
+
+    ACTIVE_STATUSES = ('queued', 'running')
+
+    id = db.Column(db.Integer, primary_key=True)
+    seed_url = db.Column(db.String(255), nullable=False)
+    crawling_limit = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued') # queued, running, completed, failed, cancelled
+    source = db.Column(db.String(20), nullable=False, default='api') # api, scheduler
+    requested_by = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    urls_processed = db.Column(db.Integer, nullable=False, default=0)
+    products_ingested = db.Column(db.Integer, nullable=False, default=0)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    lease_expires_at = db.Column(db.TIMESTAMP(timezone=True)) # Diperpanjang proses crawler selama job 'running'
+    error_message = db.Column(db.Text)
+    created_at = db.Column(db.TIMESTAMP(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    started_at = db.Column(db.TIMESTAMP(timezone=True))
+    finished_at = db.Column(db.TIMESTAMP(timezone=True))
+    updated_at = db.Column(db.TIMESTAMP(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    # Satu job aktif per seed URL: permintaan crawl dengan seed yang sama digabung ke job yang sudah ada
+    # (target ON CONFLICT di CrawlJobService.submit)
+    __table_args__ = (
+        db.Index('uq_crawl_jobs_active_seed', seed_url, unique=True,
+                 postgresql_where=db.text("status IN ('queued', 'running')")),
+        db.Index('idx_crawl_jobs_queued', created_at, id, postgresql_where=db.text("status = 'queued'")),
+        db.Index('idx_crawl_jobs_status_created', status, created_at.desc()),
+        db.Index('idx_crawl_jobs_created', created_at.desc()),
+    )
+
+    def __repr__(self):
+        return f"<CrawlJob {self.id} {self.seed_url} - {self.status}>"
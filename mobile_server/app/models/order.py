@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+from app import db
+
+class Order(db.Model):
+    __tablename__ = 'orders'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='RESTRICT'), nullable=False)
+    order_date = db.Column(db.TIMESTAMP(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    total_amount = db.Column(db.Numeric(15, 2), nullable=False)
+    status = db.Column(db.String(50), nullable=False, default='pending')
+    shipping_address = db.Column(db.Text, nullable=False)
+    payment_method = db.Column(db.String(100))
+    idempotency_key = db.Column(db.String(100))
+    created_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    items = db.relationship('OrderItem', backref='order', lazy=True, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'idempotency_key', name='uq_orders_user_idempotency'),
+    )
+
+    def __repr__(self):
+        return f"<Order {self.id} User {self.user_id} - {self.status}>"
+
+class OrderItem(db.Model):
+    __tablename__ = 'order_items'
+
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id', ondelete='CASCADE'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='RESTRICT'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    price_at_purchase = db.Column(db.Numeric(15, 2), nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('order_id', 'product_id'),
+    )
+
+    def __repr__(self):
+        return f"<OrderItem Order {self.order_id} Product {self.product_id} x{self.quantity}>"
+
+class StockReservation(db.Model):
+    """
+    Reservasi stok berumur pendek. Stok sudah dikurangi dari inventory saat reservasi dibuat;
+    reservasi yang kadaluwarsa/dilepas mengembalikan stoknya, yang dipakai checkout menjadi 'consumed'.
+    """
+    __tablename__ = 'stock_reservations'
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='active') # active, consumed, released, expired
+    expires_at = db.Column(db.TIMESTAMP(timezone=True), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        # Job expiry hanya memindai reservasi aktif
+        db.Index('idx_reservations_active_expiry', expires_at, postgresql_where=db.text("status = 'active'")),
+        db.Index('idx_reservations_user_id', user_id),
+    )
+
+    def __repr__(self):
+        return f"<StockReservation {self.id} Product {self.product_id} x{self.quantity} - {self.status}>"
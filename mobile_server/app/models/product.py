@@ -1,14 +1,14 @@
 from datetime import datetime, timezone
 from app import db
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, ARRAY, REAL
 
 class Category(db.Model):
     __tablename__ = 'categories'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
     description = db.Column(db.Text)
-    created_at = db.Column(db.TIMESTAMP(timezone=True), default=datetime.now(timezone.utc))
-    updated_at = db.Column(db.TIMESTAMP(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     products = db.relationship('Product', backref='category', lazy=True)
 
@@ -20,8 +20,8 @@ class Brand(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
     description = db.Column(db.Text)
-    created_at = db.Column(db.TIMESTAMP(timezone=True), default=datetime.now(timezone.utc))
-    updated_at = db.Column(db.TIMESTAMP(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     products = db.relationship('Product', backref='brand', lazy=True)
 
@@ -44,7 +44,12 @@ class Inventory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='CASCADE'), unique=True, nullable=False)
     quantity = db.Column(db.Integer, nullable=False, default=0)
-    last_updated = db.Column(db.TIMESTAMP(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    last_updated = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        # Dipakai ProductCardService.sync_stock() untuk menemukan stok yang berubah
+        db.Index('idx_inventory_last_updated', last_updated),
+    )
 
     def __repr__(self):
         return f"<Inventory Product {self.product_id} - Qty: {self.quantity}>"
@@ -60,8 +65,8 @@ class Product(db.Model):
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id', ondelete='SET NULL'), nullable=True)
     brand_id = db.Column(db.Integer, db.ForeignKey('brands.id', ondelete='SET NULL'), nullable=True)
 
-    created_at = db.Column(db.TIMESTAMP(timezone=True), default=datetime.now(timezone.utc))
-    updated_at = db.Column(db.TIMESTAMP(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     images = db.relationship('ProductImage', backref='product', lazy=True, cascade="all, delete-orphan")
     inventory = db.relationship('Inventory', backref='product', lazy=True, uselist=False, cascade="all, delete-orphan")
@@ -87,3 +92,164 @@ class ProductStaging(db.Model):
 
     def __repr__(self):
         return f"<ProductStaging {self.name} from {self.source_url}>"
+
+class ProductCard(db.Model):
+    """
+    Read model datar untuk daftar produk (satu baris per produk).
+    Dipelihara secara inkremental oleh ProductCardService setiap kali produk/inventory/gambar berubah,
+    sehingga list_products cukup membaca satu tabel berindeks.
+    """
+    __tablename__ = 'product_cards'
+
+    # Sengaja tanpa foreign key: baris produk yang dihapus dibersihkan oleh refresh_cards(),
+    # yang masih perlu membaca nilai lama untuk memperbarui turunan (facet) secara inkremental.
+    product_id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False)
+    description = db.Column(db.Text)
+    price = db.Column(db.Numeric(15, 2), nullable=False)
+    source_url = db.Column(db.String(255))
+
+    category_id = db.Column(db.Integer)
+    category_name = db.Column(db.String(100))
+    category_description = db.Column(db.Text)
+    brand_id = db.Column(db.Integer)
+    brand_name = db.Column(db.String(100))
+    brand_description = db.Column(db.Text)
+
+    main_image_id = db.Column(db.Integer)
+    main_image_url = db.Column(db.String(255))
+    main_image_is_main = db.Column(db.Boolean)
+
+    stock = db.Column(db.Integer, nullable=False, default=0)
+    rating = db.Column(db.Float)
+    review_count = db.Column(db.Integer)
+
+    created_at = db.Column(db.TIMESTAMP(timezone=True))
+    updated_at = db.Column(db.TIMESTAMP(timezone=True))
+
+    # Index untuk filter dan urutan list_products (sama dengan server.sql, juga dibuat oleh `flask migrate`)
+    __table_args__ = (
+        db.Index('idx_product_cards_created_at', created_at.desc()),
+        db.Index('idx_product_cards_price', price),
+        db.Index('idx_product_cards_name', name),
+        db.Index('idx_product_cards_stock', stock),
+        db.Index('idx_product_cards_category_created', category_id, created_at.desc()),
+        db.Index('idx_product_cards_brand_created', brand_id, created_at.desc()),
+    )
+
+    def __repr__(self):
+        return f"<ProductCard {self.product_id} {self.name}>"
+
+class ProductCardRefresh(db.Model):
+    """
+    Antrean produk yang refresh product_cards-nya gagal (mis. di crawler). Diproses ulang oleh job terjadwal
+    lewat ProductCardService.refresh_queued() sampai berhasil.
+    """
+    __tablename__ = 'product_card_refresh_queue'
+
+    # Tanpa foreign key, sama seperti product_cards: produk yang sudah dihapus tetap perlu di-refresh (kartunya dihapus)
+    product_id = db.Column(db.Integer, primary_key=True)
+    queued_at = db.Column(db.TIMESTAMP(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+
+    def __repr__(self):
+        return f"<ProductCardRefresh {self.product_id} ({self.attempts} percobaan)>"
+
+class CatalogVersion(db.Model):
+    """
+    Penghitung versi katalog (satu baris, id=1). Dinaikkan setiap kali product_cards berubah,
+    dipakai sebagai dasar ETag/Last-Modified untuk daftar produk.
+    """
+    __tablename__ = 'catalog_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<CatalogVersion {self.version}>"
+
+class SyncWatermark(db.Model):
+    """
+    Titik lanjut (high-water mark) job sinkronisasi, satu baris per job.
+    Dipakai ProductCardService.sync_stock() untuk melanjutkan dari inventory.last_updated terakhir yang sudah diproses.
+    """
+    __tablename__ = 'sync_watermarks'
+
+    name = db.Column(db.String(50), primary_key=True)
+    position = db.Column(db.TIMESTAMP(timezone=True), nullable=False)
+    updated_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<SyncWatermark {self.name} {self.position}>"
+
+class ProductFacetCount(db.Model):
+    """
+    Agregat jumlah produk per facet yang dihitung di muka.
+    scope_type/scope_id menyatakan filter yang aktif ('all'/0, 'category'/<id>, 'brand'/<id>),
+    facet_type/facet_value menyatakan facet yang dihitung ('category'/<id>, 'brand'/<id>, 'price'/<indeks bucket>).
+    """
+    __tablename__ = 'product_facet_counts'
+
+    scope_type = db.Column(db.String(20), primary_key=True)
+    scope_id = db.Column(db.Integer, primary_key=True)
+    facet_type = db.Column(db.String(20), primary_key=True)
+    facet_value = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ProductFacetCount {self.scope_type}:{self.scope_id} {self.facet_type}:{self.facet_value} = {self.count}>"
+
+class ProductChange(db.Model):
+    """
+    Log perubahan katalog (append-only) untuk delta-sync klien mobile.
+    Ditulis oleh ProductCardService.refresh_cards() untuk setiap produk yang berubah.
+    """
+    __tablename__ = 'product_changes'
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    # Transaksi penulis (top-level). Posisi sync = (txid, id), dibaca hanya di bawah xmin snapshot (SyncService)
+    txid = db.Column(db.BigInteger, nullable=False, server_default=db.text("(pg_current_xact_id()::text::bigint)"))
+    product_id = db.Column(db.Integer, nullable=False)
+    change_type = db.Column(db.String(20), nullable=False)
+    changed_at = db.Column(db.TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.Index('idx_product_changes_product_id', product_id),
+        db.Index('idx_product_changes_position', txid, id),
+    )
+
+    def __repr__(self):
+        return f"<ProductChange {self.id} {self.change_type} Product {self.product_id}>"
+
+class ProductObservation(db.Model):
+    """
+    Observasi harga dan stok produk (append-only), dipartisi per bulan berdasarkan observed_at.
+    Ditulis per batch saat ingest crawler/CSV oleh PriceHistoryService.
+    """
+    __tablename__ = 'product_observations'
+    __table_args__ = {'postgresql_partition_by': 'RANGE (observed_at)'}
+
+    product_id = db.Column(db.Integer, primary_key=True)
+    observed_at = db.Column(db.TIMESTAMP(timezone=True), primary_key=True)
+    price = db.Column(db.Numeric(15, 2), nullable=False)
+    stock = db.Column(db.Integer)
+
+    def __repr__(self):
+        return f"<ProductObservation Product {self.product_id} at {self.observed_at}: {self.price} / {self.stock}>"
+
+class ProductNeighbor(db.Model):
+    """
+    Top-K produk serupa (co-view) per produk, hasil job rekomendasi offline.
+    Satu baris per produk dengan array berurutan (skor menurun) agar dibaca dengan satu lookup primary key.
+    """
+    __tablename__ = 'product_neighbors'
+
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    neighbor_ids = db.Column(ARRAY(db.Integer), nullable=False)
+    scores = db.Column(ARRAY(REAL), nullable=False)
+    computed_at = db.Column(db.TIMESTAMP(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<ProductNeighbor Product {self.product_id}: {len(self.neighbor_ids or [])} tetangga>"
@@ -25,23 +25,44 @@ class Session(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     user_role = db.Column(db.String(50), nullable=False)
-    token = db.Column(db.String(255), unique=True, nullable=False)
+    token = db.Column(db.String(255), nullable=False) # Unik lewat idx_sessions_token
     expiry_time = db.Column(db.TIMESTAMP(timezone=True), nullable=False)
     created_at = db.Column(db.TIMESTAMP(timezone=True), default=datetime.now(timezone.utc))
 
+    # Sama dengan server.sql: satu unique index untuk lookup token (tanpa constraint UNIQUE terpisah)
+    __table_args__ = (
+        db.Index('idx_sessions_token', token, unique=True),
+        db.Index('idx_sessions_expiry', expiry_time), # Reaper sesi kadaluwarsa
+        db.Index('idx_sessions_user_id', user_id), # Penghapusan sesi lama saat login
+    )
+
     def __repr__(self):
         return f"<Session {self.token[:10]}... for User {self.user_id}>"
 
 class UserActivity(db.Model):
+    """
+    Event aktivitas pengguna (append-only), dipartisi per bulan berdasarkan timestamp.
+    Partisi lama dihapus oleh retensi; analitik membaca tabel rollup harian (app/models/analytics.py).
+    """
     __tablename__ = 'user_activities'
-
-    id = db.Column(db.Integer, primary_key=True)
+    # Primary key tabel terpartisi wajib memuat kolom partisi
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     activity_type = db.Column(db.String(100), nullable=False)
     related_id = db.Column(db.Integer, nullable=True)
     related_type = db.Column(db.String(50), nullable=True)
     details = db.Column(JSONB, nullable=True)
-    timestamp = db.Column(db.TIMESTAMP(timezone=True), default=datetime.now(timezone.utc))
+    timestamp = db.Column(db.TIMESTAMP(timezone=True), primary_key=True, default=lambda: datetime.now(timezone.utc))
+
+    # Index pada tabel induk, diturunkan PostgreSQL ke setiap partisi
+    __table_args__ = (
+        db.Index('idx_activity_user_time_type', user_id, timestamp.desc(), activity_type),
+        db.Index('idx_activity_related', related_type, related_id),
+        # Pasangan user-produk view_product dalam rentang waktu (job rekomendasi)
+        db.Index('idx_activity_view_product_time', timestamp, related_id,
+                 postgresql_where=db.text("activity_type = 'view_product'")),
+        {'postgresql_partition_by': 'RANGE (timestamp)'},
+    )
 
     def __repr__(self):
         return f"<UserActivity {self.activity_type} by User {self.user_id} at {self.timestamp}>"
\ No newline at end of file
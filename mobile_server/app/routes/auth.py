@@ -1,11 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g, current_app
 from app.services.auth_service import AuthService
+from app.utils.password_hashing import PasswordHashingBusy
+from app.routes.users import token_required, role_required
 from app.schemas.user_schema import UserSchema
 from app import db 
 
 auth_bp = Blueprint('auth', __name__)
 user_schema = UserSchema()
 
+def _hashing_busy_response():
+    response = jsonify({"message": "Server sedang sibuk memproses login, coba lagi sebentar."})
+    response.headers['Retry-After'] = str(current_app.config['PASSWORD_HASH_RETRY_AFTER_SECONDS'])
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """
@@ -25,6 +32,8 @@ def register():
         else:
             return jsonify({"message": error_message}), 409
 
+    except PasswordHashingBusy:
+        return _hashing_busy_response()
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
@@ -45,7 +54,10 @@ def login():
     if client_type not in ["mobile"]:
         return jsonify({"message": "Jenis klien tidak valid atau tidak didukung"}), 400
 
-    auth_result, error_message = AuthService.login_user(email, password, client_type)
+    try:
+        auth_result, error_message = AuthService.login_user(email, password, client_type)
+    except PasswordHashingBusy:
+        return _hashing_busy_response()
 
     if auth_result:
         return jsonify({
@@ -54,4 +66,31 @@ def login():
             "auth_token": auth_result['token']
         }), 200
     else:
-        return jsonify({"message": error_message}), 401
\ No newline at end of file
+        return jsonify({"message": error_message}), 401
+
+@auth_bp.route('/logout', methods=['POST'])
+@token_required
+def logout():
+    """
+    Endpoint untuk logout: menghapus sesi token yang dipakai dan mengeluarkannya dari cache verifikasi.
+    """
+    AuthService.logout_user(g.auth_token)
+    return jsonify({"message": "Logout berhasil"}), 200
+
+@auth_bp.route('/token-cache/stats', methods=['GET'])
+@token_required
+@role_required('admin')
+def token_cache_stats():
+    """
+    Endpoint statistik cache verifikasi token proses ini (hit, miss, hit ratio, eviction).
+    """
+    return jsonify(AuthService.token_cache_stats()), 200
+
+@auth_bp.route('/password-hashing/stats', methods=['GET'])
+@token_required
+@role_required('admin')
+def password_hashing_stats():
+    """
+    Endpoint statistik pool hashing password proses ini (jumlah worker, batas antrean, selesai, ditolak).
+    """
+    return jsonify(AuthService.password_hashing_stats()), 200
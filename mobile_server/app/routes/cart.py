@@ -0,0 +1,98 @@
+from flask import Blueprint, request, jsonify, g, current_app
+from app.routes.users import token_required
+from app.services.cart_service import CartService, CART_OP_ADD, CART_OP_SET, CART_OP_REMOVE, CART_OPERATIONS
+
+cart_bp = Blueprint('cart', __name__)
+
+def _validate_operation(operation):
+    """
+    Memvalidasi satu operasi keranjang. Mengembalikan pesan error atau None jika valid.
+    """
+    if not isinstance(operation, dict) or operation.get('op') not in CART_OPERATIONS:
+        return f"op wajib salah satu dari: {', '.join(CART_OPERATIONS)}."
+    if not isinstance(operation.get('product_id'), int):
+        return "product_id wajib berupa angka."
+    if operation['op'] == CART_OP_REMOVE:
+        return None
+    quantity = operation.get('quantity')
+    max_quantity = current_app.config['MAX_CART_ITEM_QUANTITY']
+    minimum = 1 if operation['op'] == CART_OP_ADD else 0
+    if not isinstance(quantity, int) or quantity < minimum or quantity > max_quantity:
+        return f"quantity harus antara {minimum} dan {max_quantity}."
+    return None
+
+def _apply(operations):
+    for operation in operations:
+        error_message = _validate_operation(operation)
+        if error_message:
+            return jsonify({"message": error_message}), 400
+
+    not_found_ids, error_message = CartService.apply_operations(g.current_user.id, operations)
+    if not_found_ids is None:
+        return jsonify({"message": error_message}), 500
+
+    # Respons berisi isi keranjang terbaru agar layar keranjang tidak perlu request tambahan
+    cart = CartService.get_cart(g.current_user.id)
+    cart["not_found_ids"] = not_found_ids
+    return jsonify(cart), 200
+
+@cart_bp.route('/', methods=['GET'])
+@token_required
+def get_cart():
+    """
+    Endpoint untuk mendapatkan isi keranjang beserta harga terkini, stok, dan total (satu query).
+    """
+    return jsonify(CartService.get_cart(g.current_user.id)), 200
+
+@cart_bp.route('/items', methods=['POST'])
+@token_required
+def add_cart_item():
+    """
+    Endpoint untuk menambah produk ke keranjang.
+    Body JSON: product_id (int), quantity (int, default 1). Jumlah ditambahkan ke item yang sudah ada.
+    """
+    data = request.get_json(silent=True) or {}
+    return _apply([{"op": CART_OP_ADD, "product_id": data.get('product_id'), "quantity": data.get('quantity', 1)}])
+
+@cart_bp.route('/items/<int:product_id>', methods=['PUT'])
+@token_required
+def update_cart_item(product_id):
+    """
+    Endpoint untuk mengganti jumlah produk di keranjang. Body JSON: quantity (int, 0 = hapus).
+    """
+    data = request.get_json(silent=True) or {}
+    return _apply([{"op": CART_OP_SET, "product_id": product_id, "quantity": data.get('quantity')}])
+
+@cart_bp.route('/items/<int:product_id>', methods=['DELETE'])
+@token_required
+def remove_cart_item(product_id):
+    """
+    Endpoint untuk menghapus produk dari keranjang.
+    """
+    return _apply([{"op": CART_OP_REMOVE, "product_id": product_id}])
+
+@cart_bp.route('/batch', methods=['POST'])
+@token_required
+def batch_update_cart():
+    """
+    Endpoint untuk menerapkan beberapa perubahan keranjang sekaligus (misal perubahan yang ditampung di aplikasi).
+    Body JSON: operations (list) - {"op": "add"|"set"|"remove", "product_id": int, "quantity": int}.
+    Operasi dipadatkan per produk dan ditulis dalam satu transaksi.
+    """
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"message": "operations wajib berupa daftar operasi."}), 400
+    if len(operations) > current_app.config['MAX_CART_OPERATIONS']:
+        return jsonify({"message": f"Maksimal {current_app.config['MAX_CART_OPERATIONS']} operasi per permintaan."}), 400
+    return _apply(operations)
+
+@cart_bp.route('/', methods=['DELETE'])
+@token_required
+def clear_cart():
+    """
+    Endpoint untuk mengosongkan keranjang.
+    """
+    if CartService.clear_cart(g.current_user.id) is None:
+        return jsonify({"message": "Gagal mengosongkan keranjang"}), 500
+    return jsonify(CartService.get_cart(g.current_user.id)), 200
@@ -1,32 +1,95 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g, current_app
 from app.services.crawler_service import CrawlerService
+from app.services.crawl_job_service import CrawlJobService, CrawlJobQueueFull
 from app.routes.users import token_required, role_required
-import threading
 import logging
 
 crawler_bp = Blueprint('crawler', __name__)
 logger = logging.getLogger(__name__)
 
+JOB_STATUSES = ('queued', 'running', 'completed', 'failed', 'cancelled')
+
 @crawler_bp.route('/start-jakmall-selenium', methods=['POST'])
 @token_required
 @role_required('admin')
 def start_jakmall_scraping():
     """
     Endpoint untuk memicu proses scraping Jakmall menggunakan Selenium.
+    Job dimasukkan ke antrean dan dijalankan oleh proses crawler (worker.py); status dipantau di /jobs/<id>.
     """
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     seed_url = data.get('seed_url', "https://www.jakmall.com/search?q=aksesoris+tangan+gelang")
-    crawling_limit = data.get('crawling_limit', 50)
+    crawling_limit = data.get('crawling_limit', current_app.config['CRAWL_DEFAULT_LIMIT'])
 
     if not seed_url:
         return jsonify({"message": "seed_url wajib diisi."}), 400
-    
-    threading.Thread(
-        target=CrawlerService.start_jakmall_scraping_selenium,
-        args=(seed_url, crawling_limit)
-    ).start()
+    if len(seed_url) > 255:
+        return jsonify({"message": "seed_url maksimal 255 karakter."}), 400
+
+    max_limit = current_app.config['CRAWL_MAX_LIMIT']
+    if isinstance(crawling_limit, bool) or not isinstance(crawling_limit, int) or not 1 <= crawling_limit <= max_limit:
+        return jsonify({"message": f"crawling_limit harus bilangan bulat antara 1 dan {max_limit}."}), 400
+
+    try:
+        job, created = CrawlJobService.submit(seed_url, crawling_limit, source='api', requested_by=g.current_user.id)
+    except CrawlJobQueueFull:
+        response = jsonify({"message": "Antrean crawling penuh, coba lagi nanti."})
+        response.headers['Retry-After'] = str(current_app.config['CRAWL_QUEUE_RETRY_AFTER_SECONDS'])
+        return response, 503
+
+    if not created:
+        return jsonify({"message": "Crawling untuk seed_url ini sudah berjalan atau dalam antrean.", "job": job}), 200
+    return jsonify({"message": "Job scraping Jakmall masuk antrean.", "job": job}), 202
+
+@crawler_bp.route('/jobs', methods=['GET'])
+@token_required
+@role_required('admin')
+def list_crawl_jobs():
+    """
+    Endpoint riwayat job crawling (terbaru lebih dulu), opsional difilter ?status=.
+    """
+    status = request.args.get('status')
+    if status and status not in JOB_STATUSES:
+        return jsonify({"message": f"Status tidak valid. Gunakan salah satu: {', '.join(JOB_STATUSES)}."}), 400
+
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', current_app.config['DEFAULT_PAGE_SIZE'], type=int)
+    per_page = max(1, min(per_page, current_app.config['MAX_PAGE_SIZE']))
 
-    return jsonify({"message": "Proses scraping Jakmall dimulai di background."}), 202
+    jobs, pagination = CrawlJobService.list_jobs(status, page, per_page)
+    return jsonify({
+        "jobs": jobs,
+        "total_items": pagination.total,
+        "total_pages": pagination.pages,
+        "current_page": pagination.page,
+        "per_page": pagination.per_page,
+        "has_next": pagination.has_next,
+        "has_prev": pagination.has_prev
+    }), 200
+
+@crawler_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@token_required
+@role_required('admin')
+def get_crawl_job(job_id):
+    """
+    Endpoint status dan progres satu job crawling.
+    """
+    job = CrawlJobService.get_job(job_id)
+    if job is None:
+        return jsonify({"message": "Job crawling tidak ditemukan"}), 404
+    return jsonify(job), 200
+
+@crawler_bp.route('/jobs/<int:job_id>/cancel', methods=['POST'])
+@token_required
+@role_required('admin')
+def cancel_crawl_job(job_id):
+    """
+    Endpoint pembatalan job crawling. Job yang sedang berjalan berhenti setelah URL yang sedang diproses.
+    """
+    job, error = CrawlJobService.cancel(job_id)
+    if error:
+        return jsonify({"message": error}), 404 if job is None else 409
+    return jsonify({"message": "Pembatalan job crawling diterima.", "job": job}), 202
 
 @crawler_bp.route('/export', methods=['GET'])
 @token_required
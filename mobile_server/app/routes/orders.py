@@ -0,0 +1,91 @@
+from flask import Blueprint, request, jsonify, g, current_app
+from app.routes.users import token_required
+from app.services.reservation_service import ReservationService
+from app.services.activity_service import ActivityService
+
+orders_bp = Blueprint('orders', __name__)
+
+@orders_bp.route('/reservations', methods=['POST'])
+@token_required
+def create_reservation():
+    """
+    Endpoint untuk mereservasi stok satu produk sebelum checkout.
+    Body JSON: product_id (int), quantity (int, default 1, maksimal MAX_RESERVATION_QUANTITY).
+    Stok langsung dikurangi; reservasi yang tidak di-checkout kembali ke stok setelah RESERVATION_TTL_SECONDS.
+    """
+    data = request.get_json(silent=True) or {}
+    product_id = data.get('product_id')
+    quantity = data.get('quantity', 1)
+
+    if not isinstance(product_id, int) or not isinstance(quantity, int):
+        return jsonify({"message": "product_id dan quantity wajib berupa angka."}), 400
+    if quantity < 1 or quantity > current_app.config['MAX_RESERVATION_QUANTITY']:
+        return jsonify({"message": f"quantity harus antara 1 dan {current_app.config['MAX_RESERVATION_QUANTITY']}."}), 400
+
+    reservation, error_message = ReservationService.reserve_stock(g.current_user.id, product_id, quantity)
+    if not reservation:
+        return jsonify({"message": error_message}), 409
+
+    reservation["expires_at"] = reservation["expires_at"].isoformat()
+    return jsonify({"message": "Stok berhasil direservasi", "reservation": reservation}), 201
+
+@orders_bp.route('/reservations/<int:reservation_id>', methods=['DELETE'])
+@token_required
+def release_reservation(reservation_id):
+    """
+    Endpoint untuk melepas reservasi aktif milik user; stoknya langsung dikembalikan.
+    """
+    if not ReservationService.release_reservation(g.current_user.id, reservation_id):
+        return jsonify({"message": "Reservasi aktif tidak ditemukan"}), 404
+    return jsonify({"message": "Reservasi dilepas"}), 200
+
+@orders_bp.route('/checkout', methods=['POST'])
+@token_required
+def checkout():
+    """
+    Endpoint untuk membuat order dari reservasi aktif.
+    Header: Idempotency-Key (wajib) - checkout ulang dengan key yang sama mengembalikan order yang sama (200)
+    tanpa membuat order baru.
+    Body JSON: reservation_ids (list int), shipping_address (str), payment_method (str, opsional).
+    """
+    idempotency_key = (request.headers.get('Idempotency-Key') or '').strip()
+    if not idempotency_key or len(idempotency_key) > 100:
+        return jsonify({"message": "Header Idempotency-Key wajib diisi (maksimal 100 karakter)."}), 400
+
+    data = request.get_json(silent=True) or {}
+    reservation_ids = data.get('reservation_ids')
+    shipping_address = data.get('shipping_address')
+    payment_method = data.get('payment_method')
+
+    if not isinstance(reservation_ids, list) or not reservation_ids or \
+            not all(isinstance(reservation_id, int) for reservation_id in reservation_ids):
+        return jsonify({"message": "reservation_ids wajib berupa daftar ID reservasi."}), 400
+    if not shipping_address:
+        return jsonify({"message": "shipping_address wajib diisi."}), 400
+
+    order, created, error_message = ReservationService.create_order(
+        g.current_user.id, reservation_ids, shipping_address, payment_method, idempotency_key
+    )
+    if not order:
+        return jsonify({"message": error_message}), 409
+
+    if created:
+        ActivityService.log_user_activity(
+            user_id=g.current_user.id,
+            activity_type='purchase',
+            related_type='order',
+            related_id=order["order_id"]
+        )
+        return jsonify({"message": "Order berhasil dibuat", "order": order}), 201
+    return jsonify({"message": "Order sudah dibuat sebelumnya", "order": order}), 200
+
+@orders_bp.route('/<int:order_id>', methods=['GET'])
+@token_required
+def get_order(order_id):
+    """
+    Endpoint untuk mendapatkan detail order milik user.
+    """
+    order = ReservationService.get_order(g.current_user.id, order_id)
+    if not order:
+        return jsonify({"message": "Order tidak ditemukan"}), 404
+    return jsonify(order), 200
@@ -1,16 +1,57 @@
 from flask import Blueprint, request, jsonify, g, current_app
-from app.models.product import Product, Category, Brand, ProductImage, Inventory
+from app.models.product import Product, Category, Brand, ProductImage, Inventory, ProductCard, ProductChange
 from app.routes.users import token_required, role_required
 from app.services.activity_service import ActivityService
-from app.schemas.product_schema import product_schema, products_schema
+from app.services.catalog_service import CatalogService
+from app.services.facet_service import FacetService, SCOPE_ALL
+from app.services.sync_service import SyncService
+from app.services.price_history_service import PriceHistoryService
+from app.services.typeahead_service import TypeaheadService
+from app.services.recommendation_service import RecommendationService
+from app.services.activity_rollup_service import ActivityRollupService
+from app.services.trending_service import TrendingService
+from app.schemas.product_serializer import (
+    PRODUCT_FIELDS, PRODUCT_CARD_FIELDS, parse_fields, product_load_options, product_card_columns,
+    dump_product, dump_product_card_row
+)
+from app.utils.request_metrics import serialization_span
+from app.utils.http_cache import make_etag, canonical_query_string, is_not_modified, apply_cache_headers, not_modified_response
 from app import db
-from sqlalchemy import desc, asc
-from sqlalchemy.orm import joinedload
+from sqlalchemy import desc, asc, select, func, literal_column
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.exc import IntegrityError
-from datetime import datetime, timezone # <-- Correct import for datetime and timezone
+from datetime import datetime, timedelta, timezone # <-- Correct import for datetime and timezone
 
 products_bp = Blueprint('products', __name__)
 
+def _card_filters():
+    """
+    Membangun daftar filter atas product_cards dari parameter query
+    (category_id, brand_id, min_price, max_price, search). Dipakai bersama oleh daftar produk dan facet.
+    """
+    category_id = request.args.get('category_id', type=int)
+    brand_id = request.args.get('brand_id', type=int)
+    min_price = request.args.get('min_price', type=float)
+    max_price = request.args.get('max_price', type=float)
+    search_term = request.args.get('search', type=str)
+
+    filters = []
+    if category_id:
+        filters.append(ProductCard.category_id == category_id)
+    if brand_id:
+        filters.append(ProductCard.brand_id == brand_id)
+    if min_price is not None:
+        filters.append(ProductCard.price >= min_price)
+    if max_price is not None:
+        filters.append(ProductCard.price <= max_price)
+    if search_term:
+        search_pattern = f"%{search_term}%"
+        filters.append(
+            (ProductCard.name.ilike(search_pattern)) |
+            (ProductCard.description.ilike(search_pattern))
+        )
+    return filters
+
 @products_bp.route('/', methods=['GET'])
 def list_products():
     """
@@ -25,7 +66,14 @@ def list_products():
     - search (str): Pencarian berdasarkan nama atau deskripsi produk (case-insensitive).
     - sort_by (str): Kolom untuk sorting (contoh: 'name', 'price', 'created_at', 'stock'). Bisa multiple, dipisahkan koma.
     - sort_order (str): Urutan sorting ('asc' atau 'desc'). Bisa multiple, dipisahkan koma, sesuai dengan sort_by.
+    - fields (str): Field yang dikembalikan per produk, dipisahkan koma (contoh: 'name,price,images,stock').
+    Mendukung conditional GET: ETag dari versi katalog + query string, 304 jika If-None-Match cocok.
     """
+    catalog_version, catalog_updated_at = CatalogService.get_version()
+    etag = make_etag('products', catalog_version, canonical_query_string())
+    if is_not_modified(etag, catalog_updated_at):
+        return not_modified_response(etag, catalog_updated_at)
+
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', current_app.config['DEFAULT_PAGE_SIZE'], type=int)
 
@@ -34,37 +82,21 @@ def list_products():
     elif per_page < 1:
         per_page = 1
 
-    query = Product.query
+    try:
+        fields = parse_fields(request.args.get('fields'), PRODUCT_CARD_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
-    category_id = request.args.get('category_id', type=int)
-    brand_id = request.args.get('brand_id', type=int)
-    min_price = request.args.get('min_price', type=float)
-    max_price = request.args.get('max_price', type=float)
-    search_term = request.args.get('search', type=str)
-
-    if category_id:
-        query = query.filter_by(category_id=category_id)
-    if brand_id:
-        query = query.filter_by(brand_id=brand_id)
-    if min_price is not None:
-        query = query.filter(Product.price >= min_price)
-    if max_price is not None:
-        query = query.filter(Product.price <= max_price)
-    if search_term:
-        search_pattern = f"%{search_term}%"
-        query = query.filter(
-            (Product.name.ilike(search_pattern)) |
-            (Product.description.ilike(search_pattern))
-        )
+    query = db.session.query(*product_card_columns(fields)).filter(*_card_filters())
 
     sort_by_param = request.args.get('sort_by', 'created_at')
     sort_order_param = request.args.get('sort_order', 'desc')
 
     ALLOWED_SORT_COLUMNS = {
-        'name': Product.name,
-        'price': Product.price,
-        'created_at': Product.created_at,
-        'stock': Inventory.quantity
+        'name': ProductCard.name,
+        'price': ProductCard.price,
+        'created_at': ProductCard.created_at,
+        'stock': ProductCard.stock
     }
     ALLOWED_SORT_ORDERS = {'asc': asc, 'desc': desc}
 
@@ -83,25 +115,17 @@ def list_products():
             order_by_clauses.append(order_func(ALLOWED_SORT_COLUMNS[col_name]))
         else:
             return jsonify({"message": f"Kolom sorting '{col_name}' tidak valid."}), 400
-    
-    if 'stock' in sort_columns or any(col in ALLOWED_SORT_COLUMNS for col in sort_columns if ALLOWED_SORT_COLUMNS[col] == Inventory.quantity):
-        query = query.join(Inventory, Product.id == Inventory.product_id)
 
     if order_by_clauses:
         query = query.order_by(*order_by_clauses)
 
-    query = query.options(
-        joinedload(Product.category),
-        joinedload(Product.brand),
-        joinedload(Product.images),
-        joinedload(Product.inventory)
-    )
-
+    # Satu tabel berindeks (product_cards), tanpa join ke categories/brands/images/inventory.
     products_pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
-    products_list = products_schema.dump(products_pagination.items)
+    with serialization_span():
+        products_list = [dump_product_card_row(row, fields) for row in products_pagination.items]
     
-    return jsonify({
+    response = jsonify({
         "products": products_list,
         "total_items": products_pagination.total,
         "total_pages": products_pagination.pages,
@@ -109,32 +133,322 @@ def list_products():
         "per_page": products_pagination.per_page,
         "has_next": products_pagination.has_next,
         "has_prev": products_pagination.has_prev
+    })
+    return apply_cache_headers(response, etag, catalog_updated_at), 200
+
+@products_bp.route('/facets', methods=['GET'])
+def get_product_facets():
+    """
+    Endpoint facet untuk panel filter: jumlah produk per kategori, per merek, dan per rentang harga
+    untuk filter yang sedang aktif (parameter sama dengan daftar produk).
+    Tanpa filter atau dengan satu filter category_id/brand_id dibaca dari agregat yang dihitung di muka;
+    kombinasi lain dihitung langsung dari product_cards.
+    """
+    catalog_version, catalog_updated_at = CatalogService.get_version()
+    etag = make_etag('facets', catalog_version, canonical_query_string())
+    if is_not_modified(etag, catalog_updated_at):
+        return not_modified_response(etag, catalog_updated_at)
+
+    category_id = request.args.get('category_id', type=int)
+    brand_id = request.args.get('brand_id', type=int)
+    filters = _card_filters()
+
+    if not filters:
+        counts = FacetService.get_precomputed_counts(SCOPE_ALL, 0)
+        source = 'precomputed'
+    elif len(filters) == 1 and category_id:
+        counts = FacetService.get_precomputed_counts('category', category_id)
+        source = 'precomputed'
+    elif len(filters) == 1 and brand_id:
+        counts = FacetService.get_precomputed_counts('brand', brand_id)
+        source = 'precomputed'
+    else:
+        counts = FacetService.get_live_counts(filters)
+        source = 'live'
+
+    response_data = FacetService.format_counts(counts)
+    response_data["source"] = source
+
+    return apply_cache_headers(jsonify(response_data), etag, catalog_updated_at), 200
+
+@products_bp.route('/suggest', methods=['GET'])
+def suggest_products():
+    """
+    Endpoint autocomplete untuk kotak pencarian: saran nama produk dan merek berdasarkan prefix.
+    Parameter query:
+    - q (str): Teks yang sedang diketik. Dicocokkan dengan awal kata pada nama (tanpa beda huruf besar/kecil dan aksen).
+    - limit (int): Jumlah saran. Default dari config.
+    Dilayani dari indeks in-memory (tanpa query database); saran diurutkan berdasarkan popularitas view_product.
+    """
+    query = request.args.get('q', '', type=str)
+    limit = request.args.get('limit', current_app.config['TYPEAHEAD_DEFAULT_LIMIT'], type=int)
+    limit = max(1, min(limit, current_app.config['TYPEAHEAD_MAX_LIMIT']))
+
+    TypeaheadService.maybe_refresh()
+    suggestions = TypeaheadService.suggest(query, limit)
+    if suggestions is None:
+        return jsonify({"message": "Indeks pencarian sedang disiapkan, coba lagi sebentar."}), 503
+
+    return jsonify({"query": query, "suggestions": suggestions}), 200
+
+@products_bp.route('/sync', methods=['GET'])
+def sync_products():
+    """
+    Endpoint delta-sync katalog untuk klien mobile.
+    Parameter query:
+    - since (str): Token sync dari respons sebelumnya. Kosong = sinkronisasi penuh.
+    - limit (int): Jumlah entri log perubahan maksimal per halaman (dipadatkan per produk). Default dari config.
+    Mengembalikan satu entri per produk yang berubah sejak token (kondisi terbaru, atau deleted),
+    sync_token untuk permintaan berikutnya, dan has_more jika masih ada perubahan tersisa.
+    lagging = true jika ada perubahan yang sudah commit tetapi belum bisa dikirim karena transaksi lain yang lebih lama
+    belum selesai (perubahan hanya dikirim menurut urutan commit); ulangi permintaan dengan token yang sama nanti.
+    Respons dikompres (gzip/brotli) oleh after_request kompresi jika klien menerimanya.
+    """
+    try:
+        position = SyncService.parse_sync_token(request.args.get('since'))
+    except ValueError:
+        return jsonify({"message": "Token sync tidak valid."}), 400
+
+    limit = request.args.get('limit', current_app.config['DEFAULT_SYNC_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, current_app.config['MAX_SYNC_PAGE_SIZE']))
+
+    changes, next_token, has_more, lagging = SyncService.get_changes_since(position, limit)
+
+    return jsonify({
+        "changes": changes,
+        "sync_token": next_token,
+        "has_more": has_more,
+        "lagging": lagging
     }), 200
 
+@products_bp.route('/batch', methods=['GET'])
+@token_required
+def get_products_batch():
+    """
+    Endpoint untuk mengambil detail beberapa produk sekaligus (keranjang, wishlist, terakhir dilihat).
+    Parameter query:
+    - ids (str): Daftar ID produk dipisahkan koma, maksimal MAX_BATCH_PRODUCT_IDS.
+    - fields (str): Field yang dikembalikan per produk, dipisahkan koma.
+    Produk dikembalikan sesuai urutan ids; ID yang tidak ditemukan diberi penanda not_found.
+    """
+    ids_param = request.args.get('ids', '')
+    try:
+        requested_ids = [int(value) for value in ids_param.split(',') if value.strip()]
+    except ValueError:
+        return jsonify({"message": "Parameter ids harus berupa daftar angka dipisahkan koma."}), 400
+
+    try:
+        fields = parse_fields(request.args.get('fields'), PRODUCT_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    requested_ids = list(dict.fromkeys(requested_ids))
+    if not requested_ids:
+        return jsonify({"message": "Parameter ids wajib diisi."}), 400
+    if len(requested_ids) > current_app.config['MAX_BATCH_PRODUCT_IDS']:
+        return jsonify({"message": f"Maksimal {current_app.config['MAX_BATCH_PRODUCT_IDS']} produk per permintaan."}), 400
+
+    products = Product.query.options(*product_load_options(fields))\
+        .filter(Product.id.in_(requested_ids)).all()
+    products_by_id = {product.id: product for product in products}
+
+    products_list = []
+    not_found_ids = []
+    with serialization_span():
+        for product_id in requested_ids:
+            product = products_by_id.get(product_id)
+            if product:
+                products_list.append(dump_product(product, fields))
+            else:
+                products_list.append({"id": product_id, "not_found": True})
+                not_found_ids.append(product_id)
+
+    if hasattr(g, 'current_user') and products_by_id:
+        ActivityService.log_user_activities(g.current_user.id, [
+            {"activity_type": 'view_product', "related_type": 'product', "related_id": product_id}
+            for product_id in requested_ids if product_id in products_by_id
+        ])
+
+    return jsonify({"products": products_list, "not_found_ids": not_found_ids}), 200
+
+@products_bp.route('/trending', methods=['GET'])
+def get_trending_products():
+    """
+    Endpoint produk trending berdasarkan view terbaru dengan peluruhan eksponensial.
+    Parameter query:
+    - window (str): Nama window (half-life) dari TRENDING_WINDOWS, misal '1h', '24h', '7d'. Default dari config.
+    - limit (int): Jumlah produk. Default dari config, maksimal TRENDING_MAX_LIMIT.
+    - fields (str): Field yang dikembalikan per produk, dipisahkan koma.
+    Top-N dibaca dari snapshot in-memory, lalu kartu produk diambil dengan satu lookup primary key.
+    """
+    window = request.args.get('window', current_app.config['TRENDING_DEFAULT_WINDOW'])
+    if window not in current_app.config['TRENDING_WINDOWS']:
+        return jsonify({"message": f"Window tidak didukung. Gunakan salah satu dari: {', '.join(current_app.config['TRENDING_WINDOWS'])}."}), 400
+    limit = request.args.get('limit', current_app.config['TRENDING_DEFAULT_LIMIT'], type=int)
+    limit = max(1, min(limit, current_app.config['TRENDING_MAX_LIMIT']))
+    try:
+        fields = parse_fields(request.args.get('fields'), PRODUCT_CARD_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    products_list = []
+    trending = TrendingService.get_trending(window, limit, fields)
+    with serialization_span():
+        for row, score in trending:
+            data = dump_product_card_row(row, fields)
+            data["score"] = round(score, 4)
+            products_list.append(data)
+
+    return jsonify({"window": window, "products": products_list}), 200
+
 @products_bp.route('/<int:product_id>', methods=['GET'])
 @token_required
 def get_product_detail(product_id):
     """
     Endpoint untuk mendapatkan detail produk berdasarkan ID.
+    Parameter query: fields (str) - field yang dikembalikan, dipisahkan koma.
+    Mendukung conditional GET: ETag dari penanda versi produk dan relasinya (inventory, kategori, brand,
+    gambar, posisi product_changes terakhir), 304 dikembalikan sebelum relasi di-load dan diserialisasi.
     """
-    product = Product.query.options(
-        joinedload(Product.category),
-        joinedload(Product.brand),
-        joinedload(Product.images),
-        joinedload(Product.inventory)
-    ).get(product_id)
+    try:
+        fields = parse_fields(request.args.get('fields'), PRODUCT_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # product_images tidak punya updated_at: versinya adalah ringkasan isi baris gambar produk ini
+    images_version = select(
+        func.md5(func.string_agg(
+            func.concat_ws(':', ProductImage.id, ProductImage.is_main, ProductImage.image_url),
+            aggregate_order_by(literal_column("','"), ProductImage.id)
+        ))
+    ).where(ProductImage.product_id == product_id).scalar_subquery()
+    last_change_id = select(func.max(ProductChange.id))\
+        .where(ProductChange.product_id == product_id).scalar_subquery()
+
+    version_row = db.session.query(
+            Product.updated_at, Inventory.last_updated, Category.updated_at.label('category_updated_at'),
+            Brand.updated_at.label('brand_updated_at'), images_version.label('images_version'),
+            last_change_id.label('last_change_id')
+        )\
+        .outerjoin(Inventory, Inventory.product_id == Product.id)\
+        .outerjoin(Category, Category.id == Product.category_id)\
+        .outerjoin(Brand, Brand.id == Product.brand_id)\
+        .filter(Product.id == product_id)\
+        .first()
+
+    if not version_row:
+        return jsonify({"message": "Produk tidak ditemukan"}), 404
+
+    etag = make_etag('product', product_id, *version_row, fields)
+    timestamps = [
+        value for value in (version_row.updated_at, version_row.last_updated,
+                            version_row.category_updated_at, version_row.brand_updated_at)
+        if value is not None
+    ]
+    last_modified = max(timestamps) if timestamps else None
+
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+
+    product = Product.query.options(*product_load_options(fields)).get(product_id)
 
     if not product:
         return jsonify({"message": "Produk tidak ditemukan"}), 404
-    
+
+    with serialization_span():
+        response_data = dump_product(product, fields)
+
+    # Hanya tampilan penuh yang dicatat; revalidasi 304 tidak dihitung sebagai view baru
     if hasattr(g, 'current_user'):
         ActivityService.log_user_activity(
             user_id=g.current_user.id,
             activity_type='view_product',
             related_type='product',
-            related_id=product.id
+            related_id=product_id
         )
 
-    response_data = product_schema.dump(product)
-    
-    return jsonify(response_data), 200
\ No newline at end of file
+    return apply_cache_headers(jsonify(response_data), etag, last_modified), 200
+
+@products_bp.route('/<int:product_id>/history', methods=['GET'])
+def get_product_price_history(product_id):
+    """
+    Endpoint riwayat harga dan stok produk untuk grafik, di-downsample per bucket waktu.
+    Parameter query:
+    - resolution (str): 'hour', 'day', 'week', atau 'month'. Default 'day'.
+    - from (str): Awal rentang (ISO 8601). Default 90 hari terakhir.
+    - to (str): Akhir rentang (ISO 8601, eksklusif). Default sekarang.
+    Setiap titik berisi harga/stok minimum, maksimum, dan terakhir di bucket tersebut.
+    """
+    resolution = request.args.get('resolution', 'day')
+    default_start, default_end = PriceHistoryService.default_range()
+    try:
+        start = datetime.fromisoformat(request.args['from']) if request.args.get('from') else default_start
+        end = datetime.fromisoformat(request.args['to']) if request.args.get('to') else default_end
+    except ValueError:
+        return jsonify({"message": "Format tanggal tidak valid. Gunakan ISO 8601."}), 400
+
+    start = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+    end = end if end.tzinfo else end.replace(tzinfo=timezone.utc)
+    if start >= end:
+        return jsonify({"message": "Parameter 'from' harus sebelum 'to'."}), 400
+
+    if not db.session.query(Product.id).filter(Product.id == product_id).first():
+        return jsonify({"message": "Produk tidak ditemukan"}), 404
+
+    try:
+        points = PriceHistoryService.get_history(product_id, resolution, start, end)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    return jsonify({
+        "product_id": product_id,
+        "resolution": resolution,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "points": points
+    }), 200
+
+@products_bp.route('/<int:product_id>/activity-stats', methods=['GET'])
+@token_required
+@role_required('admin')
+def get_product_activity_stats(product_id):
+    """
+    Endpoint statistik harian produk (view, tambah ke keranjang, ...) dari rollup product_activity_daily.
+    Parameter query: days (int) - jumlah hari terakhir (termasuk hari ini). Default 30.
+    """
+    days = request.args.get('days', 30, type=int)
+    days = max(1, min(days, current_app.config['ACTIVITY_ANALYTICS_MAX_DAYS']))
+    end_day = datetime.now(timezone.utc).date()
+    start_day = end_day - timedelta(days=days - 1)
+    return jsonify({
+        "product_id": product_id,
+        "from": start_day.isoformat(),
+        "to": end_day.isoformat(),
+        "stats": ActivityRollupService.product_daily_stats(product_id, start_day, end_day)
+    }), 200
+
+@products_bp.route('/<int:product_id>/similar', methods=['GET'])
+def get_similar_products(product_id):
+    """
+    Endpoint rekomendasi "produk serupa / juga dilihat" berdasarkan co-view pengguna lain.
+    Parameter query:
+    - limit (int): Jumlah produk. Default dari config, maksimal RECOMMENDATION_TOP_K.
+    - fields (str): Field yang dikembalikan per produk, dipisahkan koma.
+    Dibaca dari product_neighbors (dibangun ulang oleh job offline) dengan satu query.
+    """
+    limit = request.args.get('limit', current_app.config['DEFAULT_SIMILAR_LIMIT'], type=int)
+    limit = max(1, min(limit, current_app.config['RECOMMENDATION_TOP_K']))
+    try:
+        fields = parse_fields(request.args.get('fields'), PRODUCT_CARD_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    rows = RecommendationService.get_similar_products(product_id, limit, fields)
+    products_list = []
+    with serialization_span():
+        for row in rows:
+            data = dump_product_card_row(row, fields)
+            data["score"] = row.score
+            products_list.append(data)
+
+    return jsonify({"product_id": product_id, "products": products_list}), 200
@@ -1,11 +1,14 @@
 from flask import Blueprint, request, jsonify, g, current_app, url_for, send_from_directory
 from functools import wraps
-from app.services.auth_service import AuthService
+from app.services.auth_service import AuthService, PrincipalUserMissing
 from app.services.activity_service import ActivityService
+from app.services.activity_rollup_service import ActivityRollupService
 from app.models.user import User, UserActivity
-from app.models.product import Product # Import Product untuk JOIN di activities
 from app.schemas.user_schema import UserSchema
-from datetime import datetime, timezone
+from app.schemas.activity_renderer import render_activities
+from app.utils.db_routing import pin_user_if_recent_write
+from app.utils.request_metrics import request_metrics_snapshot
+from datetime import datetime, timedelta, timezone
 import os
 from werkzeug.utils import secure_filename
 from app import db
@@ -33,7 +36,15 @@ def token_required(f):
             return jsonify({"message": "Token tidak valid atau kadaluwarsa"}), 401
 
         g.current_user = current_user
-        return f(*args, **kwargs)
+        g.auth_token = token
+        pin_user_if_recent_write(current_user.id)
+        try:
+            return f(*args, **kwargs)
+        except PrincipalUserMissing:
+            # User dihapus sementara tokennya masih di cache verifikasi: diperlakukan sebagai tidak terotentikasi
+            db.session.rollback()
+            AuthService.invalidate_user_tokens(current_user.id)
+            return jsonify({"message": "Token tidak valid atau kadaluwarsa"}), 401
     return decorated
 
 # --- Decorator untuk otorisasi peran ---
@@ -77,8 +88,8 @@ def update_username():
     if not new_name or not isinstance(new_name, str) or len(new_name.strip()) == 0:
         return jsonify({"message": "Nama pengguna baru tidak valid."}), 400
 
+    user = g.current_user.user # Ambil objek User (dimuat dari database) dari principal di g
     try:
-        user = g.current_user # Ambil objek user dari g
         user.name = new_name.strip() # Perbarui nama
         db.session.commit()
 
@@ -110,6 +121,8 @@ def get_user_activities():
     Endpoint untuk mendapatkan daftar aktivitas pengguna yang sedang login dengan pagination.
     Mendukung filter berdasarkan 'type'.
     Parameter query: page (int), per_page (int), type (str)
+    Nama objek terkait dimuat sekaligus per related_type (lihat app/schemas/activity_renderer.py),
+    jumlah query tidak bergantung pada ukuran halaman.
     """
     user_id = g.current_user.id
     activity_filter_type = request.args.get('type')
@@ -130,41 +143,7 @@ def get_user_activities():
     activities_pagination = query.order_by(UserActivity.timestamp.desc())\
                                 .paginate(page=page, per_page=per_page, error_out=False)
 
-    formatted_activities = []
-    for activity in activities_pagination.items:
-        display_text = "Aktivitas tidak dikenal"
-        related_object_name = None
-
-        if activity.activity_type == 'login':
-            display_text = "Login ke akun"
-        elif activity.activity_type == 'view_profile':
-            display_text = "Melihat profil akun"
-        elif activity.activity_type == 'view_product' and activity.related_type == 'product' and activity.related_id:
-            product = Product.query.get(activity.related_id)
-            if product:
-                related_object_name = product.name
-                display_text = f"Melihat produk '{product.name}'"
-            else:
-                display_text = f"Melihat produk (ID: {activity.related_id})"
-        elif activity.activity_type == 'add_to_cart' and activity.related_type == 'product' and activity.related_id:
-            product = Product.query.get(activity.related_id)
-            quantity = activity.details.get('quantity', 1) if activity.details else 1
-            if product:
-                related_object_name = product.name
-                display_text = f"Menambah {quantity}x produk '{product.name}' ke keranjang"
-            else:
-                display_text = f"Menambah {quantity}x produk (ID: {activity.related_id}) ke keranjang"
-
-        formatted_activities.append({
-            "id": activity.id,
-            "type": activity.activity_type,
-            "display_text": display_text,
-            "timestamp": activity.timestamp.isoformat(),
-            "related_id": activity.related_id,
-            "related_type": activity.related_type,
-            "related_object_name": related_object_name,
-            "details": activity.details
-        })
+    formatted_activities = render_activities(activities_pagination.items)
 
     return jsonify({
         "activities": formatted_activities,
@@ -175,3 +154,39 @@ def get_user_activities():
         "has_next": activities_pagination.has_next,
         "has_prev": activities_pagination.has_prev
     }), 200
+
+@users_bp.route('/activity-sink/stats', methods=['GET'])
+@token_required
+@role_required('admin')
+def activity_sink_stats():
+    """
+    Endpoint statistik buffer aktivitas proses ini (antre, tertulis, dibuang, gagal, jumlah flush).
+    """
+    return jsonify(ActivityService.sink_stats()), 200
+
+@users_bp.route('/request-metrics', methods=['GET'])
+@token_required
+@role_required('admin')
+def get_request_metrics():
+    """
+    Endpoint histogram latensi per route (jumlah request, error 5xx, p50/p95/p99, rata-rata query SQL) proses ini.
+    """
+    return jsonify(request_metrics_snapshot()), 200
+
+@users_bp.route('/analytics/daily-active', methods=['GET'])
+@token_required
+@role_required('admin')
+def get_daily_active_users():
+    """
+    Endpoint jumlah pengguna aktif dan event per hari dari rollup user_activity_daily.
+    Parameter query: days (int) - jumlah hari terakhir (termasuk hari ini). Default 30.
+    """
+    days = request.args.get('days', 30, type=int)
+    days = max(1, min(days, current_app.config['ACTIVITY_ANALYTICS_MAX_DAYS']))
+    end_day = datetime.now(timezone.utc).date()
+    start_day = end_day - timedelta(days=days - 1)
+    return jsonify({
+        "from": start_day.isoformat(),
+        "to": end_day.isoformat(),
+        "days": ActivityRollupService.daily_active_users(start_day, end_day)
+    }), 200
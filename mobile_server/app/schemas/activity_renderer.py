@@ -0,0 +1,148 @@
+from sqlalchemy import select
+from app import db
+from app.models.product import Product
+from app.utils.request_metrics import timed_serialization
+
+# Render feed aktivitas pengguna (GET /api/users/activities) tanpa query per baris:
+# - RELATED_NAME_LOADERS: per related_type, satu query IN untuk semua ID di halaman -> {id: nama}
+# - ACTIVITY_RENDERERS: per activity_type, fungsi (activity, related_name) -> teks tampilan
+# Jenis aktivitas baru cukup didaftarkan dengan @activity_renderer, tanpa cabang baru di endpoint.
+
+UNKNOWN_ACTIVITY_TEXT = "Aktivitas tidak dikenal"
+
+RELATED_NAME_LOADERS = {}
+ACTIVITY_RENDERERS = {}
+
+
+def related_name_loader(related_type):
+    def register(function):
+        RELATED_NAME_LOADERS[related_type] = function
+        return function
+    return register
+
+
+def activity_renderer(*activity_types):
+    def register(function):
+        for activity_type in activity_types:
+            ACTIVITY_RENDERERS[activity_type] = function
+        return function
+    return register
+
+
+@related_name_loader('product')
+def _load_product_names(product_ids):
+    rows = db.session.execute(select(Product.id, Product.name).where(Product.id.in_(product_ids))).all()
+    return {row.id: row.name for row in rows}
+
+
+def _quantity(activity):
+    return activity.details.get('quantity', 1) if activity.details else 1
+
+
+def _product_text(activity, related_name, found_text, missing_text):
+    if activity.related_type != 'product' or not activity.related_id:
+        return None
+    if related_name:
+        return found_text.format(name=related_name, quantity=_quantity(activity))
+    return missing_text.format(id=activity.related_id, quantity=_quantity(activity))
+
+
+@activity_renderer('login')
+def _render_login(activity, related_name):
+    return "Login ke akun"
+
+
+@activity_renderer('view_profile')
+def _render_view_profile(activity, related_name):
+    return "Melihat profil akun"
+
+
+@activity_renderer('view_purchase_history')
+def _render_view_purchase_history(activity, related_name):
+    return "Melihat riwayat belanja"
+
+
+@activity_renderer('update_username')
+def _render_update_username(activity, related_name):
+    return "Mengganti nama pengguna"
+
+
+@activity_renderer('view_product')
+def _render_view_product(activity, related_name):
+    return _product_text(activity, related_name, "Melihat produk '{name}'", "Melihat produk (ID: {id})")
+
+
+@activity_renderer('add_to_cart')
+def _render_add_to_cart(activity, related_name):
+    return _product_text(
+        activity, related_name,
+        "Menambah {quantity}x produk '{name}' ke keranjang",
+        "Menambah {quantity}x produk (ID: {id}) ke keranjang"
+    )
+
+
+@activity_renderer('update_cart_item')
+def _render_update_cart_item(activity, related_name):
+    return _product_text(
+        activity, related_name,
+        "Mengubah jumlah produk '{name}' di keranjang menjadi {quantity}",
+        "Mengubah jumlah produk (ID: {id}) di keranjang menjadi {quantity}"
+    )
+
+
+@activity_renderer('remove_from_cart')
+def _render_remove_from_cart(activity, related_name):
+    return _product_text(
+        activity, related_name,
+        "Menghapus produk '{name}' dari keranjang",
+        "Menghapus produk (ID: {id}) dari keranjang"
+    )
+
+
+@activity_renderer('purchase')
+def _render_purchase(activity, related_name):
+    if activity.related_type == 'order' and activity.related_id:
+        return f"Membuat pesanan #{activity.related_id}"
+    return "Membuat pesanan"
+
+
+def load_related_names(activities):
+    """
+    Memuat nama objek terkait untuk semua aktivitas sekaligus: satu query per related_type yang punya loader.
+    Returns:
+        dict {(related_type, related_id): nama}
+    """
+    ids_by_type = {}
+    for activity in activities:
+        if activity.related_id and activity.related_type in RELATED_NAME_LOADERS:
+            ids_by_type.setdefault(activity.related_type, set()).add(activity.related_id)
+
+    names = {}
+    for related_type, related_ids in ids_by_type.items():
+        for related_id, name in RELATED_NAME_LOADERS[related_type](sorted(related_ids)).items():
+            names[(related_type, related_id)] = name
+    return names
+
+
+@timed_serialization
+def render_activities(activities):
+    """
+    Mengubah daftar UserActivity menjadi dict untuk respons feed, dengan jumlah query tetap per halaman.
+    """
+    names = load_related_names(activities)
+    rendered = []
+    for activity in activities:
+        related_name = names.get((activity.related_type, activity.related_id))
+        renderer = ACTIVITY_RENDERERS.get(activity.activity_type)
+        display_text = renderer(activity, related_name) if renderer else None
+        rendered.append({
+            "id": activity.id,
+            "type": activity.activity_type,
+            "display_text": display_text or UNKNOWN_ACTIVITY_TEXT,
+            "timestamp": activity.timestamp.isoformat(),
+            "related_id": activity.related_id,
+            "related_type": activity.related_type,
+            "related_object_name": related_name if display_text else None,
+            "details": activity.details
+        })
+    return rendered
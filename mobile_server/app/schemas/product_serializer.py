@@ -0,0 +1,265 @@
+from decimal import Decimal
+from sqlalchemy.orm import joinedload, load_only
+from app.models.product import Product, Category, Brand, Inventory, ProductCard
+from app.utils.request_metrics import timed_serialization
+
+# Serializer cepat untuk bentuk output ProductSchema (kartu produk dan detail produk).
+# ProductSchema tetap menjadi acuan bentuk JSON (dan tetap dipakai untuk .load()),
+# modul ini hanya menghindari overhead marshmallow per item saat dump.
+# Paritas output diuji oleh tests/test_product_serializer.py (python -m unittest discover tests).
+
+# Kolom yang dibaca oleh dump_product_row(), urutannya sesuai dengan atribut row.
+PRODUCT_ROW_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.description,
+    Product.price,
+    Product.source_url,
+    Product.category_id,
+    Product.brand_id,
+    Product.created_at,
+    Product.updated_at,
+    Category.name.label('category_name'),
+    Category.description.label('category_description'),
+    Brand.name.label('brand_name'),
+    Brand.description.label('brand_description'),
+    Inventory.quantity.label('stock'),
+)
+
+# Kolom product_cards yang dibaca oleh dump_product_card_row().
+PRODUCT_CARD_COLUMNS = (
+    ProductCard.product_id.label('id'),
+    ProductCard.name,
+    ProductCard.description,
+    ProductCard.price,
+    ProductCard.source_url,
+    ProductCard.category_id,
+    ProductCard.brand_id,
+    ProductCard.created_at,
+    ProductCard.updated_at,
+    ProductCard.category_name,
+    ProductCard.category_description,
+    ProductCard.brand_name,
+    ProductCard.brand_description,
+    ProductCard.stock,
+    ProductCard.main_image_id,
+    ProductCard.main_image_url,
+    ProductCard.main_image_is_main,
+    ProductCard.rating,
+    ProductCard.review_count,
+)
+
+# Field output yang boleh dipilih lewat parameter fields= (sparse fieldset). "id" selalu disertakan.
+PRODUCT_FIELDS = (
+    "id", "name", "description", "price", "source_url", "category_id", "brand_id",
+    "created_at", "updated_at", "category", "brand", "images", "stock",
+)
+PRODUCT_CARD_FIELDS = PRODUCT_FIELDS + ("rating", "review_count")
+
+# Kebutuhan load per field untuk objek Product: kolom products atau relasi yang harus di-joinedload.
+# Disimpan sebagai nama atribut karena relasi backref (category, brand) baru ada setelah semua model diimpor.
+_PRODUCT_FIELD_LOADS = {
+    "category": "category",
+    "brand": "brand",
+    "images": "images",
+    "stock": "inventory",
+}
+
+# Kolom product_cards yang dibutuhkan per field.
+_CARD_FIELD_COLUMNS = {
+    "id": (ProductCard.product_id.label('id'),),
+    "category": (ProductCard.category_id, ProductCard.category_name, ProductCard.category_description),
+    "brand": (ProductCard.brand_id, ProductCard.brand_name, ProductCard.brand_description),
+    "images": (ProductCard.main_image_id, ProductCard.main_image_url, ProductCard.main_image_is_main),
+}
+
+
+def parse_fields(value, allowed=PRODUCT_FIELDS):
+    """
+    Mem-parsing parameter fields= (dipisahkan koma). Mengembalikan None jika kosong (semua field).
+    Raises:
+        ValueError: Jika ada field yang tidak dikenal.
+    """
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Field tidak dikenal: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(["id"] + fields))
+
+
+def product_load_options(fields=None):
+    """
+    Opsi loader SQLAlchemy untuk Product: hanya kolom dan relasi yang dibutuhkan oleh fields.
+    """
+    if fields is None:
+        return [joinedload(getattr(Product, relation)) for relation in _PRODUCT_FIELD_LOADS.values()]
+    columns = [getattr(Product, field) for field in fields if field not in _PRODUCT_FIELD_LOADS]
+    relations = [getattr(Product, _PRODUCT_FIELD_LOADS[field]) for field in fields if field in _PRODUCT_FIELD_LOADS]
+    return [load_only(*columns)] + [joinedload(relation) for relation in relations]
+
+
+def product_card_columns(fields=None):
+    """
+    Kolom product_cards yang perlu di-select untuk fields (None = semua kolom kartu).
+    """
+    if fields is None:
+        return PRODUCT_CARD_COLUMNS
+    columns = []
+    for field in fields:
+        if field in _CARD_FIELD_COLUMNS:
+            columns.extend(_CARD_FIELD_COLUMNS[field])
+        else:
+            columns.append(getattr(ProductCard, field))
+    return tuple(dict.fromkeys(columns))
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def _decimal(value):
+    if value is None or isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def _nested(obj_id, name, description):
+    if obj_id is None:
+        return None
+    return {"id": obj_id, "name": name, "description": description}
+
+
+def dump_image(image):
+    return {
+        "id": image.id,
+        "image_url": image.image_url,
+        "is_main": bool(image.is_main) if image.is_main is not None else None,
+    }
+
+
+def _dump_relation(obj):
+    return _nested(obj.id, obj.name, obj.description) if obj else None
+
+
+def _dump_card_images(row):
+    if row.main_image_id is None:
+        return []
+    return [{
+        "id": row.main_image_id,
+        "image_url": row.main_image_url,
+        "is_main": bool(row.main_image_is_main) if row.main_image_is_main is not None else None,
+    }]
+
+
+_PRODUCT_FIELD_DUMPERS = {
+    "id": lambda product: product.id,
+    "name": lambda product: product.name,
+    "description": lambda product: product.description,
+    "price": lambda product: _decimal(product.price),
+    "source_url": lambda product: product.source_url,
+    "category_id": lambda product: product.category_id,
+    "brand_id": lambda product: product.brand_id,
+    "created_at": lambda product: _isoformat(product.created_at),
+    "updated_at": lambda product: _isoformat(product.updated_at),
+    "category": lambda product: _dump_relation(product.category),
+    "brand": lambda product: _dump_relation(product.brand),
+    "images": lambda product: [dump_image(image) for image in product.images],
+    "stock": lambda product: product.inventory.quantity if product.inventory else 0,
+}
+
+_CARD_FIELD_DUMPERS = {
+    "id": lambda row: row.id,
+    "name": lambda row: row.name,
+    "description": lambda row: row.description,
+    "price": lambda row: _decimal(row.price),
+    "source_url": lambda row: row.source_url,
+    "category_id": lambda row: row.category_id,
+    "brand_id": lambda row: row.brand_id,
+    "created_at": lambda row: _isoformat(row.created_at),
+    "updated_at": lambda row: _isoformat(row.updated_at),
+    "category": lambda row: _nested(row.category_id if row.category_name is not None else None,
+                                    row.category_name, row.category_description),
+    "brand": lambda row: _nested(row.brand_id if row.brand_name is not None else None,
+                                 row.brand_name, row.brand_description),
+    "images": _dump_card_images,
+    "stock": lambda row: row.stock if row.stock is not None else 0,
+    "rating": lambda row: row.rating,
+    "review_count": lambda row: row.review_count,
+}
+
+
+def dump_product(product, fields=None):
+    """
+    Serialisasi objek Product (dengan relasi yang sudah di-load) ke dict yang sama dengan ProductSchema.dump().
+    Jika fields diberikan, hanya field tersebut yang diserialisasi (dan hanya itu yang perlu di-load).
+    """
+    if fields is not None:
+        return {field: _PRODUCT_FIELD_DUMPERS[field](product) for field in fields}
+
+    category = product.category
+    brand = product.brand
+    inventory = product.inventory
+    return {
+        "id": product.id,
+        "name": product.name,
+        "description": product.description,
+        "price": _decimal(product.price),
+        "source_url": product.source_url,
+        "category_id": product.category_id,
+        "brand_id": product.brand_id,
+        "created_at": _isoformat(product.created_at),
+        "updated_at": _isoformat(product.updated_at),
+        "category": _dump_relation(category),
+        "brand": _dump_relation(brand),
+        "images": [dump_image(image) for image in product.images],
+        "stock": inventory.quantity if inventory else 0,
+    }
+
+
+# Daftar diukur sekali per panggilan; fungsi per item tidak diukur agar jalur per baris tetap ringan
+@timed_serialization
+def dump_products(products, fields=None):
+    return [dump_product(product, fields) for product in products]
+
+
+def dump_product_row(row, images=()):
+    """
+    Serialisasi satu row hasil select(*PRODUCT_ROW_COLUMNS) tanpa membuat objek ORM.
+    Args:
+        row: Row/namedtuple dengan atribut sesuai label di PRODUCT_ROW_COLUMNS.
+        images (iterable): Row/objek gambar dengan atribut id, image_url, is_main.
+    """
+    return {
+        "id": row.id,
+        "name": row.name,
+        "description": row.description,
+        "price": _decimal(row.price),
+        "source_url": row.source_url,
+        "category_id": row.category_id,
+        "brand_id": row.brand_id,
+        "created_at": _isoformat(row.created_at),
+        "updated_at": _isoformat(row.updated_at),
+        "category": _nested(row.category_id if row.category_name is not None else None,
+                            row.category_name, row.category_description),
+        "brand": _nested(row.brand_id if row.brand_name is not None else None,
+                         row.brand_name, row.brand_description),
+        "images": [dump_image(image) for image in images],
+        "stock": row.stock if row.stock is not None else 0,
+    }
+
+
+def dump_product_card_row(row, fields=None):
+    """
+    Serialisasi satu row product_cards (select(*product_card_columns(fields))) ke bentuk kartu produk:
+    field ProductSchema dengan images berisi gambar utama saja, ditambah rating dan review_count.
+    """
+    if fields is not None:
+        return {field: _CARD_FIELD_DUMPERS[field](row) for field in fields}
+
+    data = dump_product_row(row)
+    data["images"] = _dump_card_images(row)
+    data["rating"] = row.rating
+    data["review_count"] = row.review_count
+    return data
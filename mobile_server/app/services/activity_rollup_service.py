@@ -0,0 +1,210 @@
+import logging
+from datetime import datetime, timedelta, timezone, time as dt_time
+from flask import current_app
+from sqlalchemy import select, delete, insert, func, literal, distinct, text
+
+from app import db
+from app.models.user import UserActivity
+from app.models.analytics import UserActivityDaily, ProductActivityDaily
+from app.utils.partitions import ensure_monthly_partitions, drop_monthly_partitions_before, add_months, month_start
+
+logger = logging.getLogger(__name__)
+
+ACTIVITIES_TABLE = 'user_activities'
+# Nama sementara tabel user_activities lama (tanpa partisi) selama konversi oleh migrate
+LEGACY_ACTIVITIES_TABLE = 'user_activities_unpartitioned'
+
+
+class ActivityRollupService:
+    PARTITION_MONTHS_AHEAD = 3
+
+    @staticmethod
+    def ensure_partitions():
+        """
+        Memastikan partisi user_activities untuk bulan berjalan, beberapa bulan ke depan, dan partisi DEFAULT ada, lalu commit.
+        """
+        created = ensure_monthly_partitions(ACTIVITIES_TABLE, months_ahead=ActivityRollupService.PARTITION_MONTHS_AHEAD)
+        db.session.commit()
+        return created
+
+    @staticmethod
+    def convert_unpartitioned_table():
+        """
+        Mengonversi user_activities lama (tabel biasa, sebelum dipartisi) menjadi tabel terpartisi, lalu commit.
+        Tabel lama di-rename, induk terpartisi dibuat dari model beserta partisi yang mencakup seluruh data lama,
+        data disalin, sequence id dilanjutkan, dan tabel lama di-DROP; semuanya dalam satu transaksi.
+        Baris lama tanpa timestamp ditempatkan di awal bulan terlama. Tidak melakukan apa-apa jika tabel belum ada
+        atau sudah terpartisi. Harus dijalankan sebelum create_all (yang melewati tabel yang sudah ada).
+        """
+        relkind = db.session.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table_name)"), {"table_name": ACTIVITIES_TABLE}
+        ).scalar()
+        if relkind is None or relkind == 'p':
+            db.session.rollback()
+            return 0
+
+        try:
+            db.session.execute(text(f"LOCK TABLE {ACTIVITIES_TABLE} IN ACCESS EXCLUSIVE MODE"))
+            db.session.execute(text(f"ALTER TABLE {ACTIVITIES_TABLE} RENAME TO {LEGACY_ACTIVITIES_TABLE}"))
+            # Nama index (termasuk primary key) dan sequence berlaku per skema; bebaskan untuk tabel baru
+            index_names = db.session.execute(
+                text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table_name"),
+                {"table_name": LEGACY_ACTIVITIES_TABLE}
+            ).scalars().all()
+            for index_name in index_names:
+                db.session.execute(text(f'ALTER INDEX "{index_name}" RENAME TO "{index_name}_legacy"'))
+            sequence_name = db.session.execute(
+                text("SELECT pg_get_serial_sequence(:table_name, 'id')"), {"table_name": LEGACY_ACTIVITIES_TABLE}
+            ).scalar()
+            if sequence_name:
+                db.session.execute(text(f"ALTER SEQUENCE {sequence_name} RENAME TO {LEGACY_ACTIVITIES_TABLE}_id_seq"))
+
+            UserActivity.__table__.create(db.session.connection())
+
+            oldest, newest = db.session.execute(
+                text(f"SELECT min(timestamp), max(timestamp) FROM {LEGACY_ACTIVITIES_TABLE}")
+            ).one()
+            now = datetime.now(timezone.utc)
+            current = month_start(now)
+            oldest_month = month_start(oldest) if oldest else current
+            newest_month = month_start(newest) if newest else current
+            months_behind = max(0, (current.year - oldest_month.year) * 12 + current.month - oldest_month.month)
+            months_ahead = max(
+                ActivityRollupService.PARTITION_MONTHS_AHEAD,
+                (newest_month.year - current.year) * 12 + newest_month.month - current.month
+            )
+            ensure_monthly_partitions(ACTIVITIES_TABLE, months_ahead=months_ahead, months_behind=months_behind, reference=now)
+
+            copied = db.session.execute(text(
+                f"INSERT INTO {ACTIVITIES_TABLE} (id, user_id, activity_type, related_id, related_type, details, timestamp) "
+                f"SELECT id, user_id, activity_type, related_id, related_type, details, COALESCE(timestamp, :oldest_month) "
+                f"FROM {LEGACY_ACTIVITIES_TABLE}"
+            ), {"oldest_month": datetime.combine(oldest_month, dt_time.min, tzinfo=timezone.utc)}).rowcount
+            db.session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{ACTIVITIES_TABLE}', 'id'), "
+                f"COALESCE((SELECT max(id) FROM {ACTIVITIES_TABLE}), 1), "
+                f"(SELECT count(*) > 0 FROM {ACTIVITIES_TABLE}))"
+            ))
+            db.session.execute(text(f"DROP TABLE {LEGACY_ACTIVITIES_TABLE}"))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        logger.info(f"Tabel {ACTIVITIES_TABLE} dikonversi menjadi tabel terpartisi: {copied} baris disalin.")
+        return copied
+
+    @staticmethod
+    def apply_retention(retention_months=None):
+        """
+        Menghapus partisi user_activities yang lebih tua dari ACTIVITY_RETENTION_MONTHS bulan (DROP, bukan DELETE).
+        Rollup harian tidak ikut dihapus.
+        """
+        retention_months = retention_months or current_app.config['ACTIVITY_RETENTION_MONTHS']
+        cutoff = add_months(month_start(datetime.now(timezone.utc)), -retention_months)
+        dropped = drop_monthly_partitions_before(ACTIVITIES_TABLE, cutoff)
+        db.session.commit()
+        return dropped
+
+    @staticmethod
+    def rollup_day(day):
+        """
+        Menghitung ulang rollup satu hari (UTC) dari event mentah: hapus baris hari itu lalu INSERT ... SELECT
+        teragregasi, dalam satu transaksi (idempoten, pembaca melihat hasil lama sampai commit).
+        Filter rentang timestamp membatasi pembacaan ke satu partisi.
+        """
+        start = datetime.combine(day, dt_time.min, tzinfo=timezone.utc)
+        end = start + timedelta(days=1)
+        in_day = (UserActivity.timestamp >= start, UserActivity.timestamp < end)
+        day_value = literal(day, UserActivityDaily.day.type)
+
+        user_rollup = select(day_value, UserActivity.user_id, UserActivity.activity_type, func.count())\
+            .where(*in_day)\
+            .group_by(UserActivity.user_id, UserActivity.activity_type)
+        product_rollup = select(
+            day_value,
+            UserActivity.related_id,
+            UserActivity.activity_type,
+            func.count(),
+            func.count(distinct(UserActivity.user_id))
+        ).where(*in_day, UserActivity.related_type == 'product', UserActivity.related_id.isnot(None))\
+            .group_by(UserActivity.related_id, UserActivity.activity_type)
+
+        try:
+            db.session.execute(delete(UserActivityDaily).where(UserActivityDaily.day == day))
+            db.session.execute(delete(ProductActivityDaily).where(ProductActivityDaily.day == day))
+            users = db.session.execute(insert(UserActivityDaily).from_select(
+                ['day', 'user_id', 'activity_type', 'event_count'], user_rollup
+            )).rowcount
+            products = db.session.execute(insert(ProductActivityDaily).from_select(
+                ['day', 'product_id', 'activity_type', 'event_count', 'unique_users'], product_rollup
+            )).rowcount
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        logger.info(f"Rollup aktivitas {day.isoformat()}: {users} baris pengguna, {products} baris produk.")
+        return users, products
+
+    @staticmethod
+    def rollup_recent(days=None):
+        """
+        Rollup untuk beberapa hari terakhir termasuk hari ini (hari berjalan dihitung ulang setiap job,
+        hari kemarin sekali lagi untuk event yang terlambat ditulis).
+        """
+        days = days or current_app.config['ACTIVITY_ROLLUP_LOOKBACK_DAYS']
+        today = datetime.now(timezone.utc).date()
+        for offset in range(days - 1, -1, -1):
+            ActivityRollupService.rollup_day(today - timedelta(days=offset))
+
+    @staticmethod
+    def rollup_range(start_day, end_day):
+        """
+        Backfill rollup untuk rentang hari [start_day, end_day].
+        """
+        day = start_day
+        while day <= end_day:
+            ActivityRollupService.rollup_day(day)
+            day += timedelta(days=1)
+
+    @staticmethod
+    def daily_active_users(start_day, end_day):
+        """
+        Jumlah pengguna aktif dan event per hari dari rollup (tanpa membaca event mentah).
+        """
+        rows = db.session.execute(
+            select(
+                UserActivityDaily.day,
+                func.count(distinct(UserActivityDaily.user_id)).label('active_users'),
+                func.sum(UserActivityDaily.event_count).label('events')
+            )
+            .where(UserActivityDaily.day >= start_day, UserActivityDaily.day <= end_day)
+            .group_by(UserActivityDaily.day)
+            .order_by(UserActivityDaily.day)
+        ).all()
+        return [{"day": row.day.isoformat(), "active_users": row.active_users, "events": int(row.events)} for row in rows]
+
+    @staticmethod
+    def product_daily_stats(product_id, start_day, end_day):
+        """
+        Statistik harian satu produk per jenis aktivitas dari rollup.
+        """
+        rows = db.session.execute(
+            select(
+                ProductActivityDaily.day,
+                ProductActivityDaily.activity_type,
+                ProductActivityDaily.event_count,
+                ProductActivityDaily.unique_users
+            )
+            .where(
+                ProductActivityDaily.product_id == product_id,
+                ProductActivityDaily.day >= start_day,
+                ProductActivityDaily.day <= end_day
+            )
+            .order_by(ProductActivityDaily.day, ProductActivityDaily.activity_type)
+        ).all()
+        return [{
+            "day": row.day.isoformat(),
+            "activity_type": row.activity_type,
+            "events": row.event_count,
+            "unique_users": row.unique_users
+        } for row in rows]
@@ -1,15 +1,85 @@
 import logging
+import threading
 from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import insert
 from app import db
 from app.models.user import UserActivity
+from app.utils.activity_sink import ActivitySink
+from app.services.trending_service import TrendingService
 
 logger = logging.getLogger(__name__)
 
+# Sink aktivitas per proses (dibuat saat pertama dipakai): event ditulis batch oleh thread latar
+# lewat koneksi sendiri, sehingga request tidak menunggu INSERT/commit dan sesi request tidak ikut di-commit.
+_activity_sink = None
+_activity_sink_lock = threading.Lock()
+
 class ActivityService:
+    @staticmethod
+    def _get_sink():
+        global _activity_sink
+        if _activity_sink is None:
+            with _activity_sink_lock:
+                if _activity_sink is None:
+                    config = current_app.config
+                    engine = db.engine
+                    _activity_sink = ActivitySink(
+                        write_batch=lambda rows: ActivityService._write_rows(engine, rows),
+                        max_events=config['ACTIVITY_BUFFER_MAX_EVENTS'],
+                        batch_size=config['ACTIVITY_FLUSH_BATCH_SIZE'],
+                        flush_interval=config['ACTIVITY_FLUSH_INTERVAL_MS'] / 1000.0,
+                        max_retries=config['ACTIVITY_WRITE_MAX_RETRIES'],
+                        retry_backoff=config['ACTIVITY_WRITE_RETRY_BACKOFF_MS'] / 1000.0
+                    )
+        return _activity_sink
+
+    @staticmethod
+    def _write_rows(engine, rows):
+        """
+        Menulis row aktivitas dengan satu INSERT multi-baris dalam transaksi terpisah dari sesi request.
+        """
+        with engine.begin() as connection:
+            connection.execute(insert(UserActivity.__table__), rows)
+
+    @staticmethod
+    def _record_trending(rows):
+        viewed = [row['related_id'] for row in rows if row['activity_type'] == 'view_product' and row['related_type'] == 'product' and row['related_id']]
+        if viewed:
+            TrendingService.record_views(viewed, rows[0]['timestamp'])
+
+    @staticmethod
+    def _enqueue(rows):
+        ActivityService._record_trending(rows)
+        if not current_app.config['ACTIVITY_ASYNC_LOGGING']:
+            try:
+                ActivityService._write_rows(db.engine, rows)
+            except Exception as e:
+                logger.error(f"Gagal mencatat {len(rows)} aktivitas: {e}")
+            return
+        sink = ActivityService._get_sink()
+        for row in rows:
+            if not sink.emit(row):
+                logger.warning(f"Buffer aktivitas penuh, aktivitas {row['activity_type']} user {row['user_id']} dibuang.")
+
+    @staticmethod
+    def flush(timeout=None):
+        """
+        Menunggu semua aktivitas di buffer proses ini tertulis (untuk shutdown, job, dan pengujian).
+        """
+        if _activity_sink is None:
+            return True
+        return _activity_sink.flush(timeout)
+
+    @staticmethod
+    def sink_stats():
+        return ActivityService._get_sink().stats()
+
     @staticmethod
     def log_user_activity(user_id, activity_type, related_type=None, related_id=None, details=None):
         """
-        Mencatat aktivitas pengguna ke database.
+        Mencatat aktivitas pengguna. Event dimasukkan ke buffer dan ditulis asinkron (ACTIVITY_ASYNC_LOGGING),
+        timestamp diambil saat pemanggilan. Tidak menyentuh sesi database request.
         Args:
             user_id (int): ID pengguna yang melakukan aktivitas.
             activity_type (str): Jenis aktivitas (misal: 'login', 'view_product', 'add_to_cart', 'purchase').
@@ -17,18 +87,41 @@ class ActivityService:
             related_id (int, optional): ID objek terkait. Default None.
             details (dict, optional): Detail tambahan dalam format JSON (misal: {'quantity': 2, 'price': 150000}). Default None.
         """
-        try:
-            new_activity = UserActivity(
-                user_id=user_id,
-                activity_type=activity_type,
-                related_type=related_type,
-                related_id=related_id,
-                details=details,
-                timestamp=datetime.now(timezone.utc)
-            )
-            db.session.add(new_activity)
-            db.session.commit()
-            logger.info(f"Aktivitas dicatat: User {user_id} - {activity_type}")
-        except Exception as e:
-            db.session.rollback()
-            logger.error(f"Gagal mencatat aktivitas untuk user {user_id}: {e}")
\ No newline at end of file
+        ActivityService._enqueue([{
+            "user_id": user_id,
+            "activity_type": activity_type,
+            "related_type": related_type,
+            "related_id": related_id,
+            "details": details,
+            "timestamp": datetime.now(timezone.utc)
+        }])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Aktivitas dicatat: User {user_id} - {activity_type}")
+
+    @staticmethod
+    def log_user_activities(user_id, activities, in_transaction=False):
+        """
+        Mencatat beberapa aktivitas pengguna sekaligus.
+        Args:
+            user_id (int): ID pengguna yang melakukan aktivitas.
+            activities (list): Daftar dict dengan key activity_type dan opsional related_type, related_id, details.
+            in_transaction (bool): False (default) untuk menulis asinkron lewat buffer seperti log_user_activity;
+                True untuk menulis di dalam transaksi pemanggil (pemanggil yang commit/rollback).
+                Counter trending diperbarui pada kedua jalur.
+        """
+        if not activities:
+            return
+        now = datetime.now(timezone.utc)
+        rows = [{
+            "user_id": user_id,
+            "activity_type": activity['activity_type'],
+            "related_type": activity.get('related_type'),
+            "related_id": activity.get('related_id'),
+            "details": activity.get('details'),
+            "timestamp": now
+        } for activity in activities]
+        if in_transaction:
+            db.session.execute(insert(UserActivity), rows)
+            ActivityService._record_trending(rows)
+            return
+        ActivityService._enqueue(rows)
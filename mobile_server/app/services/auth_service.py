@@ -1,30 +1,115 @@
-import hashlib
+import logging
 import secrets
+import threading
 from datetime import datetime, timedelta, timezone
 from flask import current_app, request, jsonify
+from sqlalchemy import select, delete, text
 
 from app import db
 from app.models.user import User, Session
+from app.utils.ttl_cache import TTLCache
+from app.utils.db_routing import reads_from_replica, primary_reads
+from app.utils.password_hashing import ScryptHasher, LegacySha256Hasher, PasswordHasher, HashingPool
+
+logger = logging.getLogger(__name__)
+
+# Cache verifikasi token per proses: token -> (user_id, role, expiry_time), atau None untuk token tidak valid.
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+# Hasher password dan pool thread terbatas untuk hashing (per proses), dibuat saat pertama dipakai.
+_password_hasher = None
+_hashing_pool = None
+_hashing_lock = threading.Lock()
+
+
+class PrincipalUserMissing(Exception):
+    """
+    User milik AuthPrincipal sudah dihapus sementara tokennya masih ada di cache verifikasi.
+    token_required menjawabnya dengan 401.
+    """
+
+
+class AuthPrincipal:
+    """
+    Pengguna terotentikasi untuk g.current_user. id dan role tersedia tanpa query;
+    atribut lain (email, name, ...) memuat objek User dari database saat pertama kali diakses.
+    Raises PrincipalUserMissing jika user tersebut sudah tidak ada.
+    """
+    def __init__(self, user_id, role, expiry_time):
+        self.id = user_id
+        self.role = role
+        self.expiry_time = expiry_time
+        self._user = None
+
+    @property
+    def user(self):
+        if self._user is None:
+            self._user = db.session.get(User, self.id)
+            if self._user is None:
+                raise PrincipalUserMissing(f"User {self.id} tidak ditemukan")
+        return self._user
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __repr__(self):
+        return f"<AuthPrincipal User {self.id} ({self.role})>"
 
 class AuthService:
     @staticmethod
-    def _hash_password_sha256_static(password_string):
+    def _get_password_hashing():
+        global _password_hasher, _hashing_pool
+        if _hashing_pool is None:
+            with _hashing_lock:
+                if _hashing_pool is None:
+                    config = current_app.config
+                    _password_hasher = PasswordHasher([
+                        ScryptHasher(n=config['SCRYPT_N'], r=config['SCRYPT_R'], p=config['SCRYPT_P']),
+                        LegacySha256Hasher(config['STATIC_SALT'])
+                    ])
+                    _hashing_pool = HashingPool(config['PASSWORD_HASH_WORKERS'], config['PASSWORD_HASH_MAX_QUEUE'])
+        return _password_hasher, _hashing_pool
+
+    @staticmethod
+    def hash_password(password):
         """
-        Menghitung hash SHA-256 dari password_string dengan static salt.
+        Menghitung hash password dengan skema default (scrypt) di pool hashing.
+        Raises:
+            PasswordHashingBusy: antrean pool penuh atau melebihi PASSWORD_HASH_TIMEOUT_SECONDS.
         """
-        static_salt = current_app.config['STATIC_SALT']
-        string_to_hash = password_string + static_salt
-        return hashlib.sha256(string_to_hash.encode('utf-8')).hexdigest()
+        hasher, pool = AuthService._get_password_hashing()
+        return pool.run(hasher.hash, password, timeout=current_app.config['PASSWORD_HASH_TIMEOUT_SECONDS'])
+
+    @staticmethod
+    def verify_password(password, stored_hash):
+        """
+        Memverifikasi password terhadap hash tersimpan (scrypt atau SHA-256 lama) di pool hashing.
+        Returns:
+            (cocok, perlu_rehash)
+        Raises:
+            PasswordHashingBusy: antrean pool penuh atau melebihi PASSWORD_HASH_TIMEOUT_SECONDS.
+        """
+        hasher, pool = AuthService._get_password_hashing()
+        return pool.run(hasher.verify, password, stored_hash, timeout=current_app.config['PASSWORD_HASH_TIMEOUT_SECONDS'])
+
+    @staticmethod
+    def password_hashing_stats():
+        return AuthService._get_password_hashing()[1].stats()
 
     @staticmethod
     def register_user(email, password, name=None, role='pembeli'):
         """
-        Mendaftarkan pengguna baru dengan menghash password menggunakan SHA-256 + static salt.
+        Mendaftarkan pengguna baru dengan menghash password menggunakan scrypt.
+        Raises:
+            PasswordHashingBusy: antrean pool hashing penuh atau hashing melebihi batas waktu.
         """
         if User.query.filter_by(email=email).first():
             return None, "Email sudah terdaftar"
 
-        password_hash = AuthService._hash_password_sha256_static(password)
+        password_hash = AuthService.hash_password(password)
 
         new_user = User(
             email=email,
@@ -44,64 +129,168 @@ class AuthService:
 
     @staticmethod
     def login_user(email, password, client_type):
+        """
+        Login dengan email dan password. Hash format lama (SHA-256) atau parameter scrypt lama
+        diganti dengan hash baru dalam transaksi yang sama dengan pembuatan sesi.
+        Raises:
+            PasswordHashingBusy: antrean pool hashing penuh atau hashing melebihi batas waktu.
+        """
+        if client_type != "mobile":
+            return None, "Jenis klien tidak didukung atau tidak valid untuk endpoint ini."
+
         # Cari user di DB
         user = User.query.filter_by(email=email).first()
 
         if not user:
             return None, "Kredensial salah"
 
-        received_password_hash = AuthService._hash_password_sha256_static(password)
+        password_matches, needs_rehash = AuthService.verify_password(password, user.password_hash)
+        if not password_matches:
+            return None, "Kredensial salah"
+
+        new_password_hash = AuthService.hash_password(password) if needs_rehash else None
 
-        if received_password_hash == user.password_hash:
-            # Otentikasi berhasil
-            if client_type == "mobile":
-                # Hapus token lama untuk user ini jika ada (opsional, untuk memastikan hanya 1 token aktif per user)
-                Session.query.filter_by(user_id=user.id).delete()
-                db.session.commit()
+        # Generate token acak yang aman
+        token = secrets.token_urlsafe(64)
+        user_id, user_role = user.id, user.role
 
-                # Generate token acak yang aman
-                token = secrets.token_urlsafe(64)
+        expiry_time = datetime.now(timezone.utc) + timedelta(days=current_app.config['MOBILE_TOKEN_EXPIRY_DAYS'])
 
-                expiry_time = datetime.now(timezone.utc) + timedelta(days=current_app.config['MOBILE_TOKEN_EXPIRY_DAYS'])
+        # Hapus token lama untuk user ini (hanya 1 token aktif per user) dan buat sesi baru dalam satu transaksi
+        try:
+            if new_password_hash:
+                user.password_hash = new_password_hash
+            db.session.execute(delete(Session).where(Session.user_id == user_id))
+            db.session.add(Session(
+                user_id=user_id,
+                user_role=user_role,
+                token=token,
+                expiry_time=expiry_time,
+                created_at=datetime.now(timezone.utc)
+            ))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error saat membuat sesi mobile: {e}")
+            return None, "Gagal membuat sesi"
 
-                new_session = Session(
-                    user_id=user.id,
-                    user_role=user.role,
-                    token=token,
-                    expiry_time=expiry_time,
-                    created_at=datetime.now(timezone.utc)
-                )
-                db.session.add(new_session)
-                try:
-                    db.session.commit()
-                    return {"user": user, "token": token, "role": user.role}, None
-                except Exception as e:
-                    db.session.rollback()
-                    current_app.logger.error(f"Error saat membuat sesi mobile: {e}")
-                    return None, "Gagal membuat sesi"
-            else:
-                return None, "Jenis klien tidak didukung atau tidak valid untuk endpoint ini."
-        else:
-            return None, "Kredensial salah"
+        if new_password_hash:
+            logger.info(f"Hash password user {user_id} diperbarui ke skema scrypt.")
+        AuthService.invalidate_user_tokens(user_id)
+        return {"user": user, "token": token, "role": user_role}, None
+
+    @staticmethod
+    def _get_token_cache():
+        global _token_cache
+        if _token_cache is None:
+            with _token_cache_lock:
+                if _token_cache is None:
+                    _token_cache = TTLCache(
+                        maxsize=current_app.config['AUTH_TOKEN_CACHE_SIZE'],
+                        ttl=current_app.config['AUTH_TOKEN_CACHE_TTL_SECONDS'],
+                        negative_ttl=current_app.config['AUTH_NEGATIVE_CACHE_TTL_SECONDS']
+                    )
+        return _token_cache
 
     @staticmethod
     def verify_auth_token(token):
         """
-        Memverifikasi token otentikasi dan mengembalikan informasi pengguna jika valid.
+        Memverifikasi token otentikasi dan mengembalikan AuthPrincipal jika valid, None jika tidak.
+        Hasil (termasuk token tidak valid) di-cache per proses selama AUTH_TOKEN_CACHE_TTL_SECONDS
+        (dan tidak melewati expiry_time sesi), sehingga token yang sering dipakai tidak memerlukan query.
         """
-        session = Session.query.filter_by(token=token).first()
+        cache = AuthService._get_token_cache()
+        now = datetime.now(timezone.utc)
+        entry = cache.get(token)
+        if TTLCache.is_missing(entry):
+            query = select(Session.user_id, Session.expiry_time, User.role)\
+                .join(User, User.id == Session.user_id)\
+                .where(Session.token == token)
+            row = db.session.execute(query).first()
+            if not row and reads_from_replica():
+                # Sesi dari login yang baru saja terjadi mungkin belum sampai di replica
+                with primary_reads():
+                    row = db.session.execute(query).first()
 
-        current_app.logger.debug(f"Verify token: {token}")
-        current_app.logger.debug(f"Session found: {session}")
-        if session:
-            current_app.logger.debug(f"Session expiry_time: {session.expiry_time}")
-            current_app.logger.debug(f"Current UTC time (aware): {datetime.now(timezone.utc)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Verifikasi token {token[:8]}...: sesi {'ditemukan' if row else 'tidak ditemukan'}")
 
-        if not session or session.expiry_time is None or session.expiry_time < datetime.now(timezone.utc):
-            return None # Token tidak valid atau kadaluwarsa
+            if not row or row.expiry_time is None or row.expiry_time < now:
+                cache.set(token, None)
+                return None # Token tidak valid atau kadaluwarsa
 
-        user = User.query.get(session.user_id)
-        if not user:
+            entry = (row.user_id, row.role, row.expiry_time)
+            ttl = min(current_app.config['AUTH_TOKEN_CACHE_TTL_SECONDS'], (row.expiry_time - now).total_seconds())
+            cache.set(token, entry, ttl=ttl)
+
+        if entry is None:
             return None
+        user_id, role, expiry_time = entry
+        if expiry_time < now:
+            cache.delete(token)
+            return None
+        # Principal baru per request: objek User yang dimuat lazy terikat ke sesi database request ini
+        return AuthPrincipal(user_id, role, expiry_time)
 
-        return user
+    @staticmethod
+    def invalidate_token(token):
+        """
+        Menghapus token dari cache verifikasi proses ini (dipanggil saat logout).
+        """
+        AuthService._get_token_cache().delete(token)
+
+    @staticmethod
+    def invalidate_user_tokens(user_id):
+        """
+        Menghapus semua token milik user dari cache verifikasi proses ini (login ulang, perubahan peran).
+        Proses worker lain tetap bisa memakai entri lama paling lama AUTH_TOKEN_CACHE_TTL_SECONDS (beberapa detik).
+        """
+        return AuthService._get_token_cache().delete_where(
+            lambda token, entry: entry is not None and entry[0] == user_id
+        )
+
+    @staticmethod
+    def logout_user(token):
+        """
+        Menghapus sesi untuk token dan mengeluarkannya dari cache. True jika sesi ditemukan.
+        """
+        try:
+            deleted = Session.query.filter_by(token=token).delete()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error saat logout: {e}")
+            return False
+        AuthService.invalidate_token(token)
+        return deleted > 0
+
+    @staticmethod
+    def token_cache_stats():
+        return AuthService._get_token_cache().stats()
+
+    @staticmethod
+    def purge_expired_sessions(batch_size=None, max_batches=100):
+        """
+        Menghapus sesi yang sudah kadaluwarsa per batch (range scan idx_sessions_expiry), commit per batch
+        agar lock dan WAL per transaksi tetap kecil. SKIP LOCKED mencegah reaper saling menunggu.
+        """
+        batch_size = batch_size or current_app.config['SESSION_REAPER_BATCH_SIZE']
+        total = 0
+        for _ in range(max_batches):
+            deleted = db.session.execute(text("""
+                DELETE FROM sessions
+                WHERE id IN (
+                    SELECT id FROM sessions
+                    WHERE expiry_time < now()
+                    ORDER BY expiry_time
+                    LIMIT :batch_size
+                    FOR UPDATE SKIP LOCKED
+                )
+            """), {"batch_size": batch_size}).rowcount
+            db.session.commit()
+            total += deleted
+            if deleted < batch_size:
+                break
+        if total:
+            logger.info(f"{total} sesi kadaluwarsa dihapus.")
+        return total
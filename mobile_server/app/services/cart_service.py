@@ -0,0 +1,202 @@
+import logging
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import select, delete, func, literal
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.models.cart import Cart, CartItem
+from app.models.product import Product, ProductCard
+from app.services.activity_service import ActivityService
+
+logger = logging.getLogger(__name__)
+
+CART_OP_ADD = 'add'
+CART_OP_SET = 'set'
+CART_OP_REMOVE = 'remove'
+CART_OPERATIONS = (CART_OP_ADD, CART_OP_SET, CART_OP_REMOVE)
+
+# Jenis aktivitas per operasi; add_to_cart sudah ditampilkan oleh endpoint /api/users/activities.
+_ACTIVITY_TYPES = {
+    CART_OP_ADD: 'add_to_cart',
+    CART_OP_SET: 'update_cart_item',
+    CART_OP_REMOVE: 'remove_from_cart',
+}
+
+
+class CartService:
+    @staticmethod
+    def coalesce_operations(operations):
+        """
+        Memadatkan daftar operasi keranjang menjadi satu perubahan akhir per produk.
+        Args:
+            operations (list): Dict dengan key op ('add'/'set'/'remove'), product_id, dan quantity.
+        Returns:
+            dict: product_id -> (mode, quantity). mode 'add' = tambah ke jumlah yang ada,
+            'set' = ganti jumlah (0 berarti hapus).
+        """
+        changes = {}
+        for operation in operations:
+            product_id = operation['product_id']
+            quantity = operation.get('quantity', 1)
+            current = changes.get(product_id)
+            if operation['op'] == CART_OP_ADD:
+                if current is None:
+                    changes[product_id] = (CART_OP_ADD, quantity)
+                else:
+                    changes[product_id] = (current[0], current[1] + quantity)
+            elif operation['op'] == CART_OP_SET:
+                changes[product_id] = (CART_OP_SET, quantity)
+            else:
+                changes[product_id] = (CART_OP_SET, 0)
+        return changes
+
+    @staticmethod
+    def _upsert_items(cart_id, items, accumulate):
+        """
+        Upsert cart_items untuk {product_id: quantity} dengan satu INSERT ... SELECT dari products
+        (harga saat ditambahkan diambil dari katalog, produk yang tidak ada terlewati).
+        accumulate=True menambah jumlah yang sudah ada, False menggantinya.
+        Mengembalikan product_id yang berhasil ditulis.
+        """
+        if not items:
+            return set()
+        max_quantity = current_app.config['MAX_CART_ITEM_QUANTITY']
+        requested = select(
+            func.unnest(list(items)).label('product_id'),
+            func.unnest(list(items.values())).label('quantity')
+        ).subquery('requested')
+
+        source = select(
+            literal(cart_id),
+            Product.id,
+            func.least(requested.c.quantity, max_quantity),
+            Product.price,
+            func.now()
+        ).join(requested, requested.c.product_id == Product.id).order_by(Product.id)
+
+        table = CartItem.__table__
+        stmt = insert(table).from_select(['cart_id', 'product_id', 'quantity', 'price_at_add', 'added_at'], source)
+        quantity = func.least(table.c.quantity + stmt.excluded.quantity, max_quantity) if accumulate else stmt.excluded.quantity
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['cart_id', 'product_id'],
+            set_={'quantity': quantity}
+        ).returning(table.c.product_id)
+        return set(db.session.execute(stmt).scalars().all())
+
+    @staticmethod
+    def apply_operations(user_id, operations):
+        """
+        Menerapkan operasi keranjang dalam satu transaksi: keranjang dibuat jika belum ada, operasi
+        dipadatkan per produk menjadi paling banyak dua upsert dan satu DELETE, dan aktivitas dicatat
+        dengan satu INSERT multi-baris di commit yang sama.
+        Returns:
+            (list product_id yang tidak ditemukan, None) atau (None, pesan error).
+        """
+        changes = CartService.coalesce_operations(operations)
+        added = {product_id: quantity for product_id, (mode, quantity) in changes.items() if mode == CART_OP_ADD and quantity > 0}
+        replaced = {product_id: quantity for product_id, (mode, quantity) in changes.items() if mode == CART_OP_SET and quantity > 0}
+        removed = sorted(product_id for product_id, (mode, quantity) in changes.items() if mode == CART_OP_SET and quantity <= 0)
+
+        try:
+            cart_stmt = insert(Cart.__table__).values(user_id=user_id)
+            cart_stmt = cart_stmt.on_conflict_do_update(
+                index_elements=['user_id'],
+                set_={'updated_at': func.now()}
+            ).returning(Cart.__table__.c.id)
+            cart_id = db.session.execute(cart_stmt).scalar()
+
+            written = CartService._upsert_items(cart_id, added, accumulate=True)
+            written |= CartService._upsert_items(cart_id, replaced, accumulate=False)
+            if removed:
+                db.session.execute(
+                    delete(CartItem).where(CartItem.cart_id == cart_id, CartItem.product_id.in_(removed))
+                )
+
+            not_found_ids = sorted((set(added) | set(replaced)) - written)
+            ActivityService.log_user_activities(user_id, [
+                {
+                    "activity_type": _ACTIVITY_TYPES[operation['op']],
+                    "related_type": 'product',
+                    "related_id": operation['product_id'],
+                    "details": {"quantity": operation['quantity']} if operation['op'] != CART_OP_REMOVE else None
+                }
+                for operation in operations if operation['product_id'] not in not_found_ids
+            ], in_transaction=True)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Gagal memperbarui keranjang user {user_id}: {e}")
+            return None, "Gagal memperbarui keranjang"
+
+        return not_found_ids, None
+
+    @staticmethod
+    def clear_cart(user_id):
+        """
+        Mengosongkan keranjang user dengan satu DELETE.
+        """
+        try:
+            cleared = db.session.execute(
+                delete(CartItem).where(CartItem.cart_id.in_(select(Cart.id).where(Cart.user_id == user_id)))
+            ).rowcount
+            db.session.commit()
+            return cleared
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Gagal mengosongkan keranjang user {user_id}: {e}")
+            return None
+
+    @staticmethod
+    def get_cart(user_id):
+        """
+        Membaca isi keranjang beserta nama, harga terkini, stok, dan gambar utama produk
+        dengan satu query (cart_items JOIN carts JOIN product_cards).
+        """
+        rows = db.session.execute(
+            select(
+                CartItem.product_id,
+                CartItem.quantity,
+                CartItem.price_at_add,
+                CartItem.added_at,
+                ProductCard.name,
+                ProductCard.price,
+                ProductCard.stock,
+                ProductCard.main_image_url
+            )
+            .join(Cart, Cart.id == CartItem.cart_id)
+            .outerjoin(ProductCard, ProductCard.product_id == CartItem.product_id)
+            .where(Cart.user_id == user_id)
+            .order_by(CartItem.added_at, CartItem.id)
+        ).all()
+
+        items = []
+        total_amount = Decimal('0')
+        total_quantity = 0
+        for row in rows:
+            price = row.price if row.price is not None else row.price_at_add
+            stock = row.stock or 0
+            subtotal = price * row.quantity
+            available = stock >= row.quantity
+            if available:
+                total_amount += subtotal
+                total_quantity += row.quantity
+            items.append({
+                "product_id": row.product_id,
+                "name": row.name,
+                "image_url": row.main_image_url,
+                "quantity": row.quantity,
+                "price": price,
+                "price_at_add": row.price_at_add,
+                "price_changed": price != row.price_at_add,
+                "stock": stock,
+                "available": available,
+                "subtotal": subtotal,
+            })
+
+        return {
+            "items": items,
+            "total_items": len(items),
+            "total_quantity": total_quantity,
+            "total_amount": total_amount,
+        }
@@ -0,0 +1,40 @@
+import logging
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.models.product import CatalogVersion
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_ID = 1
+
+
+class CatalogService:
+    @staticmethod
+    def get_version():
+        """
+        Mengembalikan (version, updated_at) katalog saat ini. Satu lookup primary key.
+        Jika baris belum ada, dianggap versi 0 tanpa waktu perubahan.
+        """
+        row = db.session.execute(
+            select(CatalogVersion.version, CatalogVersion.updated_at).where(CatalogVersion.id == CATALOG_VERSION_ID)
+        ).first()
+        if not row:
+            return 0, None
+        return row.version, row.updated_at
+
+    @staticmethod
+    def bump_version():
+        """
+        Menaikkan versi katalog di dalam transaksi pemanggil (tanpa commit).
+        """
+        table = CatalogVersion.__table__
+        stmt = insert(table).values(id=CATALOG_VERSION_ID, version=1, updated_at=func.now())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['id'],
+            set_={'version': table.c.version + 1, 'updated_at': func.now()}
+        ).returning(table.c.version)
+        version = db.session.execute(stmt).scalar()
+        logger.debug(f"Versi katalog dinaikkan menjadi {version}.")
+        return version
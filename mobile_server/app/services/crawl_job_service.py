@@ -0,0 +1,346 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import select, update, func, and_, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app import db
+from app.models.crawler import CrawlJob
+
+logger = logging.getLogger(__name__)
+
+# Job crawling yang dipersist di crawl_jobs:
+# - API/scheduler hanya memasukkan job 'queued' (submit); seed yang sama dengan job aktif digabung ke job tersebut
+#   lewat unique index parsial uq_crawl_jobs_active_seed
+# - proses crawler (worker.py, atau run.py saat development) mengklaim job 'queued' secara berkala (dispatch)
+#   dan menjalankannya di executor berukuran CRAWL_MAX_CONCURRENT_JOBS, masing-masing di app context sendiri
+# - pembatalan: job 'queued' langsung 'cancelled'; job 'running' berhenti sebelum URL berikutnya
+# - shutdown worker: job yang sedang berjalan berhenti setelah URL saat ini dan kembali 'queued'
+# - job 'running' memegang lease (lease_expires_at) yang diperpanjang setiap dispatch oleh proses pemiliknya;
+#   job yang lease-nya kedaluwarsa (proses mati/macet) diantre ulang, sampai CRAWL_JOB_MAX_ATTEMPTS percobaan
+
+_executor = None
+_running_jobs = set()
+_executor_lock = threading.Lock()
+
+
+class CrawlJobQueueFull(Exception):
+    """
+    Jumlah job 'queued' sudah mencapai CRAWL_MAX_QUEUED_JOBS.
+    """
+
+
+def crawl_job_to_dict(job):
+    progress = min(job.urls_processed / job.crawling_limit, 1.0) if job.crawling_limit else None
+    finished_or_now = job.finished_at or datetime.now(timezone.utc)
+    return {
+        "id": job.id,
+        "seed_url": job.seed_url,
+        "crawling_limit": job.crawling_limit,
+        "status": job.status,
+        "source": job.source,
+        "requested_by": job.requested_by,
+        "cancel_requested": job.cancel_requested,
+        "urls_processed": job.urls_processed,
+        "products_ingested": job.products_ingested,
+        "progress": round(progress, 3) if progress is not None else None,
+        "attempts": job.attempts,
+        "error_message": job.error_message,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "duration_seconds": round((finished_or_now - job.started_at).total_seconds(), 1) if job.started_at else None,
+    }
+
+
+class CrawlJobService:
+    @staticmethod
+    def submit(seed_url, crawling_limit, source='api', requested_by=None):
+        """
+        Memasukkan job crawling ke antrean, atau mengembalikan job aktif (queued/running) dengan seed yang sama.
+        Returns:
+            (job dict, created(bool))
+        Raises:
+            CrawlJobQueueFull: antrean job sudah penuh.
+        """
+        queued = db.session.execute(
+            select(func.count()).select_from(CrawlJob).where(CrawlJob.status == 'queued')
+        ).scalar()
+        if queued >= current_app.config['CRAWL_MAX_QUEUED_JOBS']:
+            existing = CrawlJobService._active_job_for_seed(seed_url)
+            if existing is not None:
+                return crawl_job_to_dict(existing), False
+            raise CrawlJobQueueFull()
+
+        # Dua percobaan: job aktif yang bentrok bisa saja selesai di antara INSERT dan SELECT
+        for _ in range(2):
+            now = datetime.now(timezone.utc)
+            job_id = db.session.execute(
+                pg_insert(CrawlJob).values(
+                    seed_url=seed_url,
+                    crawling_limit=crawling_limit,
+                    status='queued',
+                    source=source,
+                    requested_by=requested_by,
+                    cancel_requested=False,
+                    urls_processed=0,
+                    products_ingested=0,
+                    attempts=0,
+                    created_at=now,
+                    updated_at=now
+                ).on_conflict_do_nothing(
+                    index_elements=[CrawlJob.seed_url],
+                    index_where=CrawlJob.status.in_(CrawlJob.ACTIVE_STATUSES)
+                ).returning(CrawlJob.id)
+            ).scalar()
+            db.session.commit()
+
+            if job_id is not None:
+                logger.info(f"Job crawl {job_id} masuk antrean: {seed_url} (batas {crawling_limit} URL, sumber {source}).")
+                return crawl_job_to_dict(db.session.get(CrawlJob, job_id)), True
+
+            existing = CrawlJobService._active_job_for_seed(seed_url)
+            if existing is not None:
+                logger.info(f"Permintaan crawl {seed_url} digabung ke job aktif {existing.id}.")
+                return crawl_job_to_dict(existing), False
+        raise RuntimeError(f"Gagal memasukkan job crawl untuk {seed_url}")
+
+    @staticmethod
+    def _active_job_for_seed(seed_url):
+        return db.session.execute(
+            select(CrawlJob).where(CrawlJob.seed_url == seed_url, CrawlJob.status.in_(CrawlJob.ACTIVE_STATUSES))
+        ).scalar()
+
+    @staticmethod
+    def get_job(job_id):
+        job = db.session.get(CrawlJob, job_id)
+        return crawl_job_to_dict(job) if job else None
+
+    @staticmethod
+    def list_jobs(status=None, page=1, per_page=20):
+        """
+        Riwayat job terbaru lebih dulu, opsional difilter status.
+        """
+        query = CrawlJob.query
+        if status:
+            query = query.filter(CrawlJob.status == status)
+        pagination = query.order_by(CrawlJob.created_at.desc(), CrawlJob.id.desc()).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+        return [crawl_job_to_dict(job) for job in pagination.items], pagination
+
+    @staticmethod
+    def cancel(job_id):
+        """
+        Membatalkan job: 'queued' langsung menjadi 'cancelled', 'running' ditandai dan berhenti sebelum URL berikutnya.
+        Returns:
+            (job dict, None); (None, pesan error) jika job tidak ada; (job dict, pesan error) jika sudah selesai
+            atau pembatalannya sudah diminta.
+        """
+        now = datetime.now(timezone.utc)
+        cancelled = db.session.execute(
+            update(CrawlJob)
+            .where(CrawlJob.id == job_id, CrawlJob.status == 'queued')
+            .values(status='cancelled', cancel_requested=True, finished_at=now, updated_at=now)
+        ).rowcount
+        if not cancelled:
+            cancelled = db.session.execute(
+                update(CrawlJob)
+                .where(CrawlJob.id == job_id, CrawlJob.status == 'running', CrawlJob.cancel_requested.is_(False))
+                .values(cancel_requested=True, updated_at=now)
+            ).rowcount
+        db.session.commit()
+
+        job = db.session.get(CrawlJob, job_id)
+        if job is None:
+            return None, "Job crawling tidak ditemukan"
+        if not cancelled:
+            if job.status == 'running':
+                return crawl_job_to_dict(job), "Pembatalan job crawling sudah diminta"
+            return crawl_job_to_dict(job), f"Job crawling sudah selesai (status: {job.status})"
+        logger.info(f"Pembatalan job crawl {job_id} diminta (status: {job.status}).")
+        return crawl_job_to_dict(job), None
+
+    # --- Eksekusi (hanya di proses crawler) ---
+
+    @staticmethod
+    def _get_executor():
+        global _executor
+        if _executor is None:
+            with _executor_lock:
+                if _executor is None:
+                    _executor = ThreadPoolExecutor(
+                        max_workers=current_app.config['CRAWL_MAX_CONCURRENT_JOBS'], thread_name_prefix='crawl-job'
+                    )
+        return _executor
+
+    @staticmethod
+    def _lease_expiry(now):
+        return now + timedelta(seconds=current_app.config['CRAWL_JOB_LEASE_SECONDS'])
+
+    @staticmethod
+    def _renew_leases(job_ids):
+        """
+        Memperpanjang lease job 'running' milik proses ini (heartbeat), lalu commit.
+        """
+        if not job_ids:
+            return 0
+        now = datetime.now(timezone.utc)
+        renewed = db.session.execute(
+            update(CrawlJob).where(CrawlJob.id.in_(job_ids), CrawlJob.status == 'running')
+            .values(lease_expires_at=CrawlJobService._lease_expiry(now))
+        ).rowcount
+        db.session.commit()
+        return renewed
+
+    @staticmethod
+    def requeue_interrupted():
+        """
+        Memulihkan job 'running' yang lease-nya kedaluwarsa (proses crawler pemiliknya mati atau macet): kembali ke
+        'queued', menjadi 'cancelled' jika pembatalan sudah diminta, atau 'failed' jika sudah dicoba
+        CRAWL_JOB_MAX_ATTEMPTS kali. Job yang lease-nya masih diperpanjang proses lain tidak disentuh.
+        Dipanggil saat worker crawler mulai (bersama CrawlerService.release_stale_leases()) dan oleh dispatch.
+        """
+        now = datetime.now(timezone.utc)
+        max_attempts = current_app.config['CRAWL_JOB_MAX_ATTEMPTS']
+        expired = and_(
+            CrawlJob.status == 'running',
+            or_(CrawlJob.lease_expires_at.is_(None), CrawlJob.lease_expires_at < now)
+        )
+        cancelled = db.session.execute(
+            update(CrawlJob).where(expired, CrawlJob.cancel_requested.is_(True))
+            .values(status='cancelled', lease_expires_at=None, finished_at=now, updated_at=now)
+        ).rowcount
+        failed = db.session.execute(
+            update(CrawlJob).where(expired, CrawlJob.attempts >= max_attempts)
+            .values(
+                status='failed', lease_expires_at=None, finished_at=now, updated_at=now,
+                error_message=f"Job crawling terputus {max_attempts} kali, tidak diantre ulang"
+            )
+        ).rowcount
+        requeued = db.session.execute(
+            update(CrawlJob).where(expired).values(status='queued', lease_expires_at=None, updated_at=now)
+        ).rowcount
+        db.session.commit()
+        if requeued or cancelled or failed:
+            logger.info(f"Job crawl terputus: {requeued} kembali ke antrean, {cancelled} dibatalkan, {failed} gagal.")
+        return requeued
+
+    @staticmethod
+    def dispatch(app):
+        """
+        Mengklaim job 'queued' tertua sebanyak slot executor yang kosong dan menjalankannya. Dipanggil berkala
+        oleh scheduler proses crawler; klaim memakai FOR UPDATE SKIP LOCKED sehingga aman jika terpanggil bersamaan.
+        Sekaligus memperpanjang lease job yang sedang berjalan di proses ini dan memulihkan job yang lease-nya habis.
+        """
+        from app.services.crawler_service import CrawlerService
+
+        with _executor_lock:
+            running_jobs = list(_running_jobs)
+        CrawlJobService._renew_leases(running_jobs)
+        CrawlJobService.requeue_interrupted()
+
+        if CrawlerService.stop_requested():
+            return []
+        free_slots = app.config['CRAWL_MAX_CONCURRENT_JOBS'] - len(running_jobs)
+        if free_slots <= 0:
+            return []
+
+        candidates = (
+            select(CrawlJob.id).where(CrawlJob.status == 'queued')
+            .order_by(CrawlJob.created_at, CrawlJob.id).limit(free_slots)
+            .with_for_update(skip_locked=True).scalar_subquery()
+        )
+        now = datetime.now(timezone.utc)
+        claimed = db.session.execute(
+            update(CrawlJob).where(CrawlJob.id.in_(candidates))
+            .values(
+                status='running', started_at=now, updated_at=now, attempts=CrawlJob.attempts + 1,
+                lease_expires_at=CrawlJobService._lease_expiry(now)
+            )
+            .returning(CrawlJob.id)
+        ).scalars().all()
+        db.session.commit()
+
+        executor = CrawlJobService._get_executor()
+        for job_id in claimed:
+            with _executor_lock:
+                _running_jobs.add(job_id)
+            executor.submit(CrawlJobService._run_job, app, job_id)
+        if claimed:
+            logger.info(f"Job crawl dijalankan: {claimed}")
+        return claimed
+
+    @staticmethod
+    def _run_job(app, job_id):
+        from app.services.crawler_service import CrawlerService
+
+        try:
+            with app.app_context():
+                job = db.session.get(CrawlJob, job_id)
+                seed_url, crawling_limit = job.seed_url, job.crawling_limit
+                db.session.commit()
+
+                def should_stop():
+                    return bool(db.session.execute(
+                        select(CrawlJob.cancel_requested).where(CrawlJob.id == job_id)
+                    ).scalar())
+
+                def on_progress(urls_processed, products_ingested):
+                    # Ikut commit URL yang baru selesai di CrawlerService
+                    db.session.execute(
+                        update(CrawlJob).where(CrawlJob.id == job_id).values(
+                            urls_processed=urls_processed, products_ingested=products_ingested,
+                            updated_at=datetime.now(timezone.utc)
+                        )
+                    )
+
+                try:
+                    result = CrawlerService.start_jakmall_scraping_selenium(
+                        seed_url, crawling_limit, should_stop=should_stop, on_progress=on_progress
+                    )
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Job crawl {job_id} gagal: {e}")
+                    result = {"status": "failed", "message": str(e), "total_urls_processed": 0, "total_products_ingested": 0}
+                CrawlJobService._finish_job(job_id, result)
+        finally:
+            with _executor_lock:
+                _running_jobs.discard(job_id)
+
+    @staticmethod
+    def _finish_job(job_id, result):
+        from app.services.crawler_service import CrawlerService
+
+        job = db.session.get(CrawlJob, job_id)
+        now = datetime.now(timezone.utc)
+        if result['status'] == 'stopped' and not job.cancel_requested and CrawlerService.stop_requested():
+            # Shutdown worker: dilanjutkan saat worker berikutnya mulai; tidak dihitung sebagai percobaan gagal
+            job.status = 'queued'
+            job.attempts = max(job.attempts - 1, 0)
+        else:
+            if job.cancel_requested:
+                job.status = 'cancelled'
+            else:
+                job.status = 'failed' if result['status'] == 'failed' else 'completed'
+            job.finished_at = now
+        job.lease_expires_at = None
+        job.urls_processed = max(job.urls_processed, result['total_urls_processed'])
+        job.products_ingested = max(job.products_ingested, result['total_products_ingested'])
+        job.error_message = result['message'] if result['status'] == 'failed' else None
+        job.updated_at = now
+        db.session.commit()
+        logger.info(f"Job crawl {job_id} {job.status}: {job.urls_processed} URL, {job.products_ingested} produk.")
+
+    @staticmethod
+    def shutdown(wait=True):
+        """
+        Menunggu job yang sedang berjalan berhenti (setelah CrawlerService.request_stop()) saat worker keluar.
+        """
+        global _executor
+        with _executor_lock:
+            executor, _executor = _executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -1,32 +1,60 @@
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse, parse_qs
 from urllib.robotparser import RobotFileParser 
 import time
 import logging
 import re
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from datetime import datetime, timezone
 import json
 import random 
+import threading
 from flask import current_app 
 
 from app import db
 from app.models.crawler import CrawlQueue
 from app.models.product import ProductStaging, Product, Category, Brand, ProductImage, Inventory 
+from app.services.product_card_service import ProductCardService
+from app.services.price_history_service import PriceHistoryService
+from sqlalchemy import update
 from sqlalchemy.exc import IntegrityError 
 
 
 logger = logging.getLogger(__name__)
 
+# requests, BeautifulSoup, dan Selenium diimpor di dalam method yang memakainya: worker API yang hanya
+# memuat modul ini (blueprint crawler, jobs) tidak menanggung waktu import dan memori library tersebut.
+
 ROBOTS_PARSERS = {}
 
+# Di-set saat proses worker diminta berhenti: loop crawling berhenti di antara URL dan
+# entri antrian yang sedang dikerjakan dikembalikan ke 'pending'.
+_stop_event = threading.Event()
+
 class CrawlerService:
+    @staticmethod
+    def request_stop():
+        """
+        Meminta crawling yang sedang berjalan berhenti setelah URL yang sedang diproses selesai.
+        """
+        _stop_event.set()
+
+    @staticmethod
+    def stop_requested():
+        return _stop_event.is_set()
+
+    @staticmethod
+    def release_stale_leases():
+        """
+        Mengembalikan entri antrian 'in_progress' milik proses crawler yang mati tanpa sempat membereskannya
+        ke 'pending'. Dipanggil saat worker crawler mulai (hanya ada satu worker crawler).
+        """
+        released = db.session.execute(
+            update(CrawlQueue).where(CrawlQueue.status == 'in_progress').values(status='pending')
+        ).rowcount
+        db.session.commit()
+        if released:
+            logger.info(f"{released} entri antrian crawling 'in_progress' dikembalikan ke 'pending'.")
+        return released
+
     @staticmethod
     def _get_robot_parser(url):
         parsed_url = urlparse(url)
@@ -52,6 +80,8 @@ class CrawlerService:
 
     @staticmethod
     def fetch_html(url):
+        import requests
+
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
@@ -76,6 +106,8 @@ class CrawlerService:
 
     @staticmethod
     def scrape_jakmall_product_list_page(html_content, base_url):
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(html_content, 'html.parser')
         products_data = []
 
@@ -139,6 +171,8 @@ class CrawlerService:
 
     @staticmethod
     def _extract_jakmall_pagination_links(html_content, current_url):
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(html_content, 'html.parser')
         pagination_links = set()
 
@@ -268,6 +302,8 @@ class CrawlerService:
         Mengirim POST request ke endpoint lokal di mobile client
         untuk memberitahu/mengirim data produk baru (batch).
         """
+        import requests
+
         mobile_client_endpoint = "http://10.0.2.2:8080/api/new_product_batch" # Endpoint bisa berbeda untuk batch
 
         if not new_products_data_list:
@@ -295,7 +331,22 @@ class CrawlerService:
             logger.error(f"Error tak terduga saat menyiapkan/mengirim notifikasi batch ke mobile: {e}")
 
     @staticmethod
-    def start_jakmall_scraping_selenium(seed_url_query_param, crawling_limit=50):
+    def start_jakmall_scraping_selenium(seed_url_query_param, crawling_limit=50, should_stop=None, on_progress=None):
+        """
+        Menjalankan crawling Jakmall dengan Selenium dari seed URL sampai crawling_limit URL diproses.
+        Args:
+            should_stop (callable): Dicek sebelum setiap URL selain sinyal shutdown worker; True = berhenti.
+            on_progress (callable): Dipanggil (urls_processed, products_ingested) setelah setiap URL, sebelum commit URL tersebut.
+        Returns:
+            dict dengan status ('completed', 'stopped', 'failed'), message, total_urls_processed, total_products_ingested.
+        """
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import TimeoutException
+
         logger.info(f"Memulai scraping Jakmall dari {seed_url_query_param} dengan batas {crawling_limit} URL.")
 
         chrome_options = Options()
@@ -332,7 +383,16 @@ class CrawlerService:
             max_stock_config = current_app.config['MAX_STOCK_RANDOM']
 
 
+            stopped = False
             while processed_urls_count < crawling_limit:
+                if _stop_event.is_set():
+                    logger.info("Crawling dihentikan karena worker sedang shutdown.")
+                    stopped = True
+                    break
+                if should_stop is not None and should_stop():
+                    logger.info("Crawling dihentikan atas permintaan pembatalan.")
+                    stopped = True
+                    break
                 current_queue_entry = CrawlQueue.query.filter_by(status='pending').order_by(CrawlQueue.added_at.asc()).first()
                 if not current_queue_entry:
                     logger.info("Antrian crawling kosong. Selesai.")
@@ -398,6 +458,24 @@ class CrawlerService:
                 
                 logger.info(f"Selesai memproses {len(products_on_page)} produk dari {current_url}. {len(products_ingested_on_this_page)} produk baru/diperbarui masuk sesi DB dari halaman ini.")
 
+                # Perbarui read model product_cards dan catat observasi harga/stok untuk produk di halaman ini
+                # (satu batch per halaman, ikut commit sesi yang sama). Masing-masing di savepoint sendiri: jika gagal,
+                # hanya penulisan itu yang dibatalkan, produk/staging/antrean halaman ini tetap di-commit.
+                # Produk yang refresh kartunya gagal dicatat ke antrean refresh ulang (job card_refresh_retry_job)
+                db.session.flush()
+                page_product_ids = [product.id for product in products_ingested_on_this_page]
+                try:
+                    with db.session.begin_nested():
+                        ProductCardService.refresh_cards(page_product_ids)
+                except Exception as e:
+                    logger.error(f"Gagal memperbarui product_cards untuk halaman {current_url}, produk masuk antrean refresh ulang: {e}")
+                    ProductCardService.queue_refresh(page_product_ids, str(e))
+                try:
+                    with db.session.begin_nested():
+                        PriceHistoryService.record_observations(page_product_ids)
+                except Exception as e:
+                    logger.error(f"Gagal mencatat riwayat harga/stok untuk halaman {current_url}: {e}")
+
 
                 pagination_links = CrawlerService._extract_jakmall_pagination_links(html_content, current_url)
                 for page_link in pagination_links:
@@ -414,8 +492,10 @@ class CrawlerService:
                             logger.error(f"Gagal menambahkan link pagination '{page_link}' ke antrian: {e}")
                 
                 current_queue_entry.status = 'completed'
-                db.session.commit()
                 processed_urls_count += 1
+                if on_progress is not None:
+                    on_progress(processed_urls_count, total_products_ingested)
+                db.session.commit()
 
             try:
                 db.session.commit() 
@@ -426,12 +506,12 @@ class CrawlerService:
                 logger.error(f"Gagal meng-commit semua produk/URL dari sesi ini atau mengirim notifikasi: {e}")
 
             logger.info(f"Selesai scraping Jakmall. Total {processed_urls_count} URL diproses dalam sesi ini. Total {total_products_ingested} produk berhasil diimpor ke katalog utama.")
-            return {"message": "Scraping Jakmall selesai", "total_urls_processed": processed_urls_count, "total_products_ingested": total_products_ingested}
+            return {"status": "stopped" if stopped else "completed", "message": "Scraping Jakmall selesai", "total_urls_processed": processed_urls_count, "total_products_ingested": total_products_ingested}
 
         except Exception as e:
             db.session.rollback()
             logger.error(f"Error fatal saat menjalankan scraping Jakmall: {e}")
-            return {"message": f"Scraping Jakmall gagal: {e}", "total_urls_processed": 0, "total_products_ingested": 0}
+            return {"status": "failed", "message": f"Scraping Jakmall gagal: {e}", "total_urls_processed": processed_urls_count, "total_products_ingested": total_products_ingested}
         finally:
             if driver:
                 driver.quit()
@@ -0,0 +1,193 @@
+import logging
+from bisect import bisect_right
+from collections import Counter
+from flask import current_app
+from sqlalchemy import select, delete, func, case
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.models.product import ProductCard, ProductFacetCount, Category, Brand
+
+logger = logging.getLogger(__name__)
+
+SCOPE_ALL = 'all'
+FACET_DIMENSIONS = ('category', 'brand', 'price')
+
+
+class FacetService:
+    REBUILD_BATCH_SIZE = 5000
+
+    @staticmethod
+    def _price_buckets():
+        return current_app.config['PRICE_FACET_BUCKETS']
+
+    @staticmethod
+    def price_bucket(price, buckets):
+        if price is None:
+            return 0
+        return max(bisect_right(buckets, float(price)) - 1, 0)
+
+    @staticmethod
+    def _contributions(category_id, brand_id, price, buckets):
+        """
+        Daftar key (scope_type, scope_id, facet_type, facet_value) yang dihitung untuk satu produk.
+        """
+        facets = [('price', FacetService.price_bucket(price, buckets))]
+        if category_id is not None:
+            facets.append(('category', category_id))
+        if brand_id is not None:
+            facets.append(('brand', brand_id))
+
+        scopes = [(SCOPE_ALL, 0)]
+        if category_id is not None:
+            scopes.append(('category', category_id))
+        if brand_id is not None:
+            scopes.append(('brand', brand_id))
+
+        return [scope + facet for scope in scopes for facet in facets]
+
+    @staticmethod
+    def apply_card_changes(old_cards, new_cards):
+        """
+        Memperbarui product_facet_counts secara inkremental dari perubahan product_cards.
+        Args:
+            old_cards (dict): product_id -> row (category_id, brand_id, price) sebelum perubahan.
+            new_cards (dict): product_id -> row yang sama setelah perubahan (produk terhapus tidak ada).
+        Dijalankan di dalam transaksi pemanggil (tanpa commit).
+        """
+        buckets = FacetService._price_buckets()
+        delta = Counter()
+        for product_id in set(old_cards) | set(new_cards):
+            old = old_cards.get(product_id)
+            new = new_cards.get(product_id)
+            if old is not None:
+                for key in FacetService._contributions(old.category_id, old.brand_id, old.price, buckets):
+                    delta[key] -= 1
+            if new is not None:
+                for key in FacetService._contributions(new.category_id, new.brand_id, new.price, buckets):
+                    delta[key] += 1
+
+        changes = sorted((key, value) for key, value in delta.items() if value != 0)
+        if not changes:
+            return 0
+
+        # Urutan key yang konsisten mencegah deadlock antar transaksi ingest yang berjalan bersamaan.
+        table = ProductFacetCount.__table__
+        stmt = insert(table).values([
+            {'scope_type': key[0], 'scope_id': key[1], 'facet_type': key[2], 'facet_value': key[3], 'count': value}
+            for key, value in changes
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['scope_type', 'scope_id', 'facet_type', 'facet_value'],
+            set_={'count': table.c.count + stmt.excluded.count}
+        )
+        db.session.execute(stmt)
+        return len(changes)
+
+    @staticmethod
+    def rebuild():
+        """
+        Menghitung ulang seluruh product_facet_counts dari product_cards (backfill/perbaikan), lalu commit.
+        """
+        buckets = FacetService._price_buckets()
+        counts = Counter()
+        rows = db.session.execute(
+            select(ProductCard.category_id, ProductCard.brand_id, ProductCard.price)
+            .execution_options(yield_per=FacetService.REBUILD_BATCH_SIZE)
+        )
+        for row in rows:
+            counts.update(FacetService._contributions(row.category_id, row.brand_id, row.price, buckets))
+
+        db.session.execute(delete(ProductFacetCount))
+        items = sorted(counts.items())
+        for start in range(0, len(items), FacetService.REBUILD_BATCH_SIZE):
+            db.session.execute(insert(ProductFacetCount.__table__), [
+                {'scope_type': key[0], 'scope_id': key[1], 'facet_type': key[2], 'facet_value': key[3], 'count': value}
+                for key, value in items[start:start + FacetService.REBUILD_BATCH_SIZE]
+            ])
+        db.session.commit()
+        logger.info(f"Rebuild product_facet_counts selesai: {len(items)} baris agregat.")
+        return len(items)
+
+    @staticmethod
+    def get_precomputed_counts(scope_type, scope_id):
+        """
+        Membaca facet dari agregat yang sudah dihitung (satu query primary key range).
+        Mengembalikan dict facet_type -> list (facet_value, count).
+        """
+        rows = db.session.execute(
+            select(ProductFacetCount.facet_type, ProductFacetCount.facet_value, ProductFacetCount.count)
+            .where(
+                ProductFacetCount.scope_type == scope_type,
+                ProductFacetCount.scope_id == scope_id,
+                ProductFacetCount.count > 0
+            )
+        ).all()
+        counts = {dimension: [] for dimension in FACET_DIMENSIONS}
+        for row in rows:
+            counts[row.facet_type].append((row.facet_value, row.count))
+        return counts
+
+    @staticmethod
+    def get_live_counts(filters):
+        """
+        Menghitung facet langsung dari product_cards untuk kombinasi filter yang tidak dihitung di muka.
+        Args:
+            filters (list): Ekspresi filter SQLAlchemy atas kolom ProductCard.
+        """
+        buckets = FacetService._price_buckets()
+        price_bucket = case(
+            *[(ProductCard.price >= lower, index) for index, lower in reversed(list(enumerate(buckets)))],
+            else_=0
+        )
+        dimensions = {
+            'category': ProductCard.category_id,
+            'brand': ProductCard.brand_id,
+            'price': price_bucket,
+        }
+        counts = {}
+        for dimension, column in dimensions.items():
+            rows = db.session.execute(
+                select(column.label('facet_value'), func.count().label('count'))
+                .where(*filters)
+                .where(column.isnot(None))
+                .group_by(column)
+            ).all()
+            counts[dimension] = [(row.facet_value, row.count) for row in rows]
+        return counts
+
+    @staticmethod
+    def format_counts(counts):
+        """
+        Mengubah hasil hitung mentah menjadi respons API (nama kategori/merek dan rentang harga).
+        """
+        buckets = FacetService._price_buckets()
+
+        category_ids = [value for value, _ in counts['category']]
+        brand_ids = [value for value, _ in counts['brand']]
+        category_names = dict(db.session.execute(
+            select(Category.id, Category.name).where(Category.id.in_(category_ids))
+        ).all()) if category_ids else {}
+        brand_names = dict(db.session.execute(
+            select(Brand.id, Brand.name).where(Brand.id.in_(brand_ids))
+        ).all()) if brand_ids else {}
+
+        price_counts = dict(counts['price'])
+        price_ranges = []
+        for index, lower in enumerate(buckets):
+            upper = buckets[index + 1] if index + 1 < len(buckets) else None
+            price_ranges.append({"bucket": index, "min_price": lower, "max_price": upper, "count": price_counts.get(index, 0)})
+
+        by_count = lambda item: (-item["count"], item["name"] or '')
+        return {
+            "categories": sorted(
+                ({"id": value, "name": category_names.get(value), "count": count} for value, count in counts['category']),
+                key=by_count
+            ),
+            "brands": sorted(
+                ({"id": value, "name": brand_names.get(value), "count": count} for value, count in counts['brand']),
+                key=by_count
+            ),
+            "price_ranges": price_ranges,
+            "total_items": sum(price_counts.values()),
+        }
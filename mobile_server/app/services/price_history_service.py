@@ -0,0 +1,108 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, func, literal, insert
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from app import db
+from app.models.product import Product, ProductStaging, Inventory, ProductObservation
+from app.utils.partitions import ensure_monthly_partitions
+
+logger = logging.getLogger(__name__)
+
+OBSERVATIONS_TABLE = 'product_observations'
+
+# Resolusi downsampling yang didukung (nilai argumen date_trunc PostgreSQL).
+HISTORY_RESOLUTIONS = ('hour', 'day', 'week', 'month')
+
+
+class PriceHistoryService:
+    PARTITION_MONTHS_AHEAD = 3
+
+    @staticmethod
+    def ensure_partitions():
+        """
+        Memastikan partisi product_observations untuk bulan berjalan dan beberapa bulan ke depan ada, lalu commit.
+        """
+        created = ensure_monthly_partitions(OBSERVATIONS_TABLE, months_ahead=PriceHistoryService.PARTITION_MONTHS_AHEAD)
+        db.session.commit()
+        return created
+
+    @staticmethod
+    def record_observations(product_ids, observed_at=None):
+        """
+        Mencatat observasi harga/stok untuk beberapa produk dengan satu INSERT ... SELECT.
+        Harga diambil dari data staging terakhir (yang dilihat crawler) dan jatuh ke harga katalog jika tidak ada;
+        stok dari inventory. Dijalankan di savepoint di dalam transaksi pemanggil (tanpa commit),
+        sehingga kegagalan pencatatan riwayat tidak membatalkan ingest.
+        """
+        product_ids = sorted({product_id for product_id in product_ids if product_id is not None})
+        if not product_ids:
+            return 0
+
+        observed_at = observed_at or datetime.now(timezone.utc)
+        source = select(
+            Product.id,
+            literal(observed_at, ProductObservation.observed_at.type),
+            func.coalesce(ProductStaging.price, Product.price),
+            Inventory.quantity,
+        ).select_from(Product)\
+            .outerjoin(ProductStaging, ProductStaging.source_url == Product.source_url)\
+            .outerjoin(Inventory, Inventory.product_id == Product.id)\
+            .where(Product.id.in_(product_ids))
+
+        stmt = insert(ProductObservation).from_select(['product_id', 'observed_at', 'price', 'stock'], source)
+        try:
+            with db.session.begin_nested():
+                db.session.execute(stmt)
+        except Exception as e:
+            logger.error(f"Gagal mencatat observasi harga/stok untuk {len(product_ids)} produk: {e}")
+            return 0
+        return len(product_ids)
+
+    @staticmethod
+    def get_history(product_id, resolution, start, end):
+        """
+        Riwayat harga/stok satu produk yang di-downsample per bucket waktu (min/max/terakhir per bucket).
+        Filter rentang observed_at memungkinkan partition pruning; di dalam partisi dipakai primary key
+        (product_id, observed_at).
+        """
+        if resolution not in HISTORY_RESOLUTIONS:
+            raise ValueError(f"Resolusi tidak didukung. Gunakan salah satu dari: {', '.join(HISTORY_RESOLUTIONS)}.")
+
+        bucket = func.date_trunc(resolution, ProductObservation.observed_at).label('bucket')
+        latest_first = ProductObservation.observed_at.desc()
+        rows = db.session.execute(
+            select(
+                bucket,
+                func.min(ProductObservation.price).label('price_min'),
+                func.max(ProductObservation.price).label('price_max'),
+                func.array_agg(aggregate_order_by(ProductObservation.price, latest_first))[1].label('price_last'),
+                func.min(ProductObservation.stock).label('stock_min'),
+                func.max(ProductObservation.stock).label('stock_max'),
+                func.array_agg(aggregate_order_by(ProductObservation.stock, latest_first))[1].label('stock_last'),
+                func.count().label('samples'),
+            )
+            .where(
+                ProductObservation.product_id == product_id,
+                ProductObservation.observed_at >= start,
+                ProductObservation.observed_at < end
+            )
+            .group_by(bucket)
+            .order_by(bucket)
+        ).all()
+
+        return [{
+            "bucket": row.bucket.isoformat(),
+            "price_min": row.price_min,
+            "price_max": row.price_max,
+            "price_last": row.price_last,
+            "stock_min": row.stock_min,
+            "stock_max": row.stock_max,
+            "stock_last": row.stock_last,
+            "samples": row.samples,
+        } for row in rows]
+
+    @staticmethod
+    def default_range(days=90):
+        end = datetime.now(timezone.utc)
+        return end - timedelta(days=days), end
@@ -0,0 +1,248 @@
+import logging
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import select, update, delete, func, true, Float, Integer
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.models.product import Product, ProductStaging, Category, Brand, ProductImage, Inventory, ProductCard, ProductCardRefresh, SyncWatermark
+from app.services.catalog_service import CatalogService
+from app.services.facet_service import FacetService
+from app.services.sync_service import SyncService, CHANGE_STOCK
+
+logger = logging.getLogger(__name__)
+
+STOCK_SYNC_WATERMARK = 'stock_sync'
+
+# Kolom product_cards yang diisi ulang saat refresh (semua selain primary key).
+CARD_COLUMNS = [column.name for column in ProductCard.__table__.columns]
+CARD_UPDATE_COLUMNS = [name for name in CARD_COLUMNS if name != 'product_id']
+# Kolom yang dibandingkan sebelum/sesudah refresh untuk pembaruan inkremental turunan product_cards.
+CARD_SNAPSHOT_COLUMNS = tuple(getattr(ProductCard, name) for name in CARD_COLUMNS)
+
+
+class ProductCardService:
+    REBUILD_BATCH_SIZE = 1000
+
+    @staticmethod
+    def _card_source_select(product_ids):
+        """
+        SELECT yang menghasilkan baris product_cards dari tabel-tabel sumber untuk product_ids.
+        Urutan kolom mengikuti CARD_COLUMNS.
+        """
+        main_image = select(ProductImage.id, ProductImage.image_url, ProductImage.is_main)\
+            .where(ProductImage.product_id == Product.id)\
+            .order_by(ProductImage.is_main.desc(), ProductImage.id)\
+            .limit(1)\
+            .lateral('main_image')
+
+        rating = ProductStaging.additional_data['rating'].astext.cast(Float)
+        review_count = ProductStaging.additional_data['review_count'].astext.cast(Integer)
+
+        return select(
+            Product.id,
+            Product.name,
+            Product.description,
+            Product.price,
+            Product.source_url,
+            Product.category_id,
+            Category.name,
+            Category.description,
+            Product.brand_id,
+            Brand.name,
+            Brand.description,
+            main_image.c.id,
+            main_image.c.image_url,
+            main_image.c.is_main,
+            func.coalesce(Inventory.quantity, 0),
+            rating,
+            review_count,
+            Product.created_at,
+            Product.updated_at,
+        ).select_from(Product)\
+            .outerjoin(Category, Product.category_id == Category.id)\
+            .outerjoin(Brand, Product.brand_id == Brand.id)\
+            .outerjoin(Inventory, Inventory.product_id == Product.id)\
+            .outerjoin(main_image, true())\
+            .outerjoin(ProductStaging, ProductStaging.source_url == Product.source_url)\
+            .where(Product.id.in_(product_ids))
+
+    @staticmethod
+    def refresh_cards(product_ids):
+        """
+        Menyinkronkan baris product_cards untuk product_ids dengan kondisi terbaru di tabel sumber.
+        Dijalankan di dalam transaksi pemanggil (tanpa commit), jadi panggil setelah perubahan di-flush.
+        Produk yang sudah tidak ada akan dihapus dari product_cards. Agregat facet, log perubahan (delta-sync), dan versi katalog ikut diperbarui.
+        """
+        product_ids = sorted({product_id for product_id in product_ids if product_id is not None})
+        if not product_ids:
+            return 0
+
+        # Snapshot sebelum perubahan, untuk pembaruan facet dan log perubahan secara inkremental
+        old_cards = {
+            row.product_id: row for row in db.session.execute(
+                select(*CARD_SNAPSHOT_COLUMNS).where(ProductCard.product_id.in_(product_ids)).with_for_update()
+            )
+        }
+
+        upsert = insert(ProductCard.__table__).from_select(
+            CARD_COLUMNS, ProductCardService._card_source_select(product_ids)
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=['product_id'],
+            set_={name: upsert.excluded[name] for name in CARD_UPDATE_COLUMNS}
+        ).returning(*CARD_SNAPSHOT_COLUMNS)
+        new_cards = {row.product_id: row for row in db.session.execute(upsert)}
+
+        db.session.execute(
+            delete(ProductCard).where(
+                ProductCard.product_id.in_(product_ids),
+                ~ProductCard.product_id.in_(select(Product.id).where(Product.id.in_(product_ids)))
+            )
+        )
+        FacetService.apply_card_changes(old_cards, new_cards)
+        if SyncService.record_card_changes(old_cards, new_cards, CARD_UPDATE_COLUMNS):
+            CatalogService.bump_version()
+        logger.debug(f"product_cards diperbarui untuk {len(product_ids)} produk.")
+        return len(product_ids)
+
+    @staticmethod
+    def queue_refresh(product_ids, error=None):
+        """
+        Mencatat product_ids ke product_card_refresh_queue agar refresh_cards() dicoba ulang oleh job terjadwal
+        (refresh_queued). Dipakai saat refresh_cards() gagal tetapi perubahan sumbernya tetap di-commit.
+        Dijalankan di dalam transaksi pemanggil (tanpa commit).
+        """
+        product_ids = sorted({product_id for product_id in product_ids if product_id is not None})
+        if not product_ids:
+            return 0
+
+        table = ProductCardRefresh.__table__
+        stmt = insert(table).values([
+            {'product_id': product_id, 'queued_at': func.now(), 'attempts': 0, 'last_error': error}
+            for product_id in product_ids
+        ])
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['product_id'],
+            set_={'last_error': stmt.excluded.last_error}
+        ))
+        logger.warning(f"{len(product_ids)} produk masuk antrean refresh ulang product_cards.")
+        return len(product_ids)
+
+    @staticmethod
+    def refresh_queued(batch_size=None):
+        """
+        Menjalankan ulang refresh_cards() untuk produk di product_card_refresh_queue (terlama lebih dulu), lalu commit.
+        Produk yang berhasil dihapus dari antrean. Jika satu batch gagal, produk dicoba satu per satu agar satu
+        produk bermasalah tidak menahan yang lain; yang tetap gagal dinaikkan attempts-nya dan dicoba lagi nanti.
+        """
+        batch_size = batch_size or current_app.config['CARD_REFRESH_RETRY_BATCH_SIZE']
+        product_ids = db.session.execute(
+            select(ProductCardRefresh.product_id)
+            .order_by(ProductCardRefresh.queued_at, ProductCardRefresh.product_id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not product_ids:
+            db.session.rollback()
+            return 0
+
+        try:
+            with db.session.begin_nested():
+                ProductCardService.refresh_cards(product_ids)
+            refreshed, failed = product_ids, {}
+        except Exception as e:
+            logger.error(f"Refresh ulang product_cards untuk {len(product_ids)} produk gagal, dicoba per produk: {e}")
+            refreshed, failed = [], {}
+            for product_id in product_ids:
+                try:
+                    with db.session.begin_nested():
+                        ProductCardService.refresh_cards([product_id])
+                    refreshed.append(product_id)
+                except Exception as product_error:
+                    failed[product_id] = str(product_error)
+
+        if refreshed:
+            db.session.execute(delete(ProductCardRefresh).where(ProductCardRefresh.product_id.in_(refreshed)))
+        for product_id, error in failed.items():
+            db.session.execute(
+                update(ProductCardRefresh)
+                .where(ProductCardRefresh.product_id == product_id)
+                .values(attempts=ProductCardRefresh.attempts + 1, last_error=error)
+            )
+        db.session.commit()
+        if failed:
+            logger.error(f"Refresh ulang product_cards masih gagal untuk {len(failed)} produk: {sorted(failed)[:10]}")
+        logger.info(f"Refresh ulang product_cards: {len(refreshed)} produk berhasil, {len(failed)} gagal.")
+        return len(refreshed)
+
+    @staticmethod
+    def sync_stock(overlap_seconds=None):
+        """
+        Menyalin stok terbaru dari inventory ke product_cards untuk baris inventory yang berubah sejak watermark
+        sync_stock terakhir (tabel sync_watermarks), lalu commit. Reservasi/checkout hanya mengubah inventory
+        (satu baris panas per SKU) agar statement stok tetap sesingkat mungkin; read model disusulkan oleh job ini.
+        Jendela overlap_seconds di belakang watermark dibaca ulang agar baris yang commit terlambat (last_updated lebih
+        lama dari watermark) tetap tersusul; penyalinan idempoten karena hanya stok yang berbeda yang diperbarui.
+        Tanpa watermark (run pertama) seluruh inventory diperiksa.
+        """
+        if overlap_seconds is None:
+            overlap_seconds = current_app.config['STOCK_SYNC_OVERLAP_SECONDS']
+
+        # Dikunci agar dua worker tidak memajukan watermark yang sama secara bersamaan
+        watermark = db.session.execute(
+            select(SyncWatermark.position).where(SyncWatermark.name == STOCK_SYNC_WATERMARK).with_for_update()
+        ).scalar()
+        changed = Inventory.last_updated >= watermark - timedelta(seconds=overlap_seconds) if watermark else true()
+
+        # Dibaca sebelum UPDATE: baris yang commit sesudahnya bernilai lebih baru atau masih di dalam jendela overlap
+        new_watermark = db.session.execute(select(func.max(Inventory.last_updated)).where(changed)).scalar()
+        product_ids = db.session.execute(
+            update(ProductCard)
+            .where(
+                ProductCard.product_id == Inventory.product_id,
+                changed,
+                ProductCard.stock != Inventory.quantity
+            )
+            .values(stock=Inventory.quantity)
+            .returning(ProductCard.product_id)
+        ).scalars().all()
+
+        if product_ids:
+            SyncService.record_changes(product_ids, CHANGE_STOCK)
+            CatalogService.bump_version()
+        if new_watermark and (watermark is None or new_watermark > watermark):
+            stmt = insert(SyncWatermark.__table__).values(
+                name=STOCK_SYNC_WATERMARK, position=new_watermark, updated_at=func.now()
+            )
+            db.session.execute(stmt.on_conflict_do_update(
+                index_elements=['name'],
+                set_={'position': stmt.excluded.position, 'updated_at': func.now()}
+            ))
+        db.session.commit()
+        if product_ids:
+            logger.info(f"Stok product_cards disinkronkan untuk {len(product_ids)} produk.")
+        return len(product_ids)
+
+    @staticmethod
+    def rebuild_all(batch_size=None):
+        """
+        Membangun ulang seluruh product_cards dari tabel sumber, per batch dengan commit per batch.
+        Dipakai untuk backfill awal atau perbaikan jika read model tidak sinkron.
+        """
+        batch_size = batch_size or ProductCardService.REBUILD_BATCH_SIZE
+        total = 0
+        last_id = 0
+        while True:
+            product_ids = db.session.execute(
+                select(Product.id).where(Product.id > last_id).order_by(Product.id).limit(batch_size)
+            ).scalars().all()
+            if not product_ids:
+                break
+            ProductCardService.refresh_cards(product_ids)
+            db.session.commit()
+            total += len(product_ids)
+            last_id = product_ids[-1]
+
+        logger.info(f"Rebuild product_cards selesai: {total} produk.")
+        return total
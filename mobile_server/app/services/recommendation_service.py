@@ -0,0 +1,141 @@
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.models.product import Product, ProductCard, ProductNeighbor
+from app.models.user import UserActivity
+from app.schemas.product_serializer import product_card_columns
+
+logger = logging.getLogger(__name__)
+
+
+class RecommendationService:
+    EVENT_FETCH_SIZE = 100000
+    WRITE_BATCH_SIZE = 5000
+
+    @staticmethod
+    def _load_view_pairs(since):
+        """
+        Membaca pasangan unik (user_id, product_id) view_product sejak `since` secara streaming
+        (server-side cursor) ke dua array numpy.
+        """
+        import numpy as np
+
+        query = select(UserActivity.user_id, UserActivity.related_id)\
+            .where(
+                UserActivity.activity_type == 'view_product',
+                UserActivity.related_type == 'product',
+                UserActivity.related_id.isnot(None),
+                UserActivity.timestamp >= since
+            )\
+            .group_by(UserActivity.user_id, UserActivity.related_id)\
+            .execution_options(yield_per=RecommendationService.EVENT_FETCH_SIZE)
+
+        user_chunks, product_chunks = [], []
+        for rows in db.session.execute(query).partitions():
+            pairs = np.array(rows, dtype=np.int64)
+            user_chunks.append(pairs[:, 0])
+            product_chunks.append(pairs[:, 1])
+
+        if not user_chunks:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        return np.concatenate(user_chunks), np.concatenate(product_chunks)
+
+    @staticmethod
+    def _write_neighbors(batch):
+        """
+        Upsert satu batch baris product_neighbors dalam transaksinya sendiri.
+        """
+        stmt = insert(ProductNeighbor).values(batch)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['product_id'],
+            set_={'neighbor_ids': stmt.excluded.neighbor_ids, 'scores': stmt.excluded.scores, 'computed_at': stmt.excluded.computed_at}
+        ))
+        db.session.commit()
+        return len(batch)
+
+    @staticmethod
+    def build_neighbors():
+        """
+        Job offline: menghitung top-K produk serupa dari co-view view_product lalu menulis product_neighbors
+        per batch (upsert, commit per batch) dan menghapus baris dari build sebelumnya di akhir. Transaksi tulis
+        dibuat pendek karena transaksi penulis yang panjang menahan delta-sync (lihat SyncService); selama build
+        pembaca bisa melihat campuran baris lama dan baru, masing-masing tetap utuh per produk.
+        """
+        from app.utils.similarity import build_view_matrix, top_k_neighbors, group_neighbors
+
+        config = current_app.config
+        started = time.perf_counter()
+        since = datetime.now(timezone.utc) - timedelta(days=config['RECOMMENDATION_WINDOW_DAYS'])
+        user_ids, product_ids = RecommendationService._load_view_pairs(since)
+        loaded = time.perf_counter()
+
+        matrix, products = build_view_matrix(user_ids, product_ids, config['RECOMMENDATION_MAX_ITEMS_PER_USER'])
+        rows, neighbors, scores = top_k_neighbors(
+            matrix,
+            k=config['RECOMMENDATION_TOP_K'],
+            min_coviews=config['RECOMMENDATION_MIN_COVIEWS']
+        )
+        computed = time.perf_counter()
+
+        # Produk yang sudah dihapus sejak event dicatat tidak ditulis (FK ke products)
+        existing_ids = set(db.session.execute(select(Product.id)).scalars().all())
+        computed_at = datetime.now(timezone.utc)
+        db.session.rollback()  # Akhiri transaksi baca sebelum fase tulis
+        batch = []
+        total = 0
+        try:
+            for product_id, neighbor_ids, neighbor_scores in group_neighbors(products, rows, neighbors, scores):
+                if product_id not in existing_ids:
+                    continue
+                kept = [(neighbor_id, score) for neighbor_id, score in zip(neighbor_ids, neighbor_scores) if neighbor_id in existing_ids]
+                if not kept:
+                    continue
+                batch.append({
+                    "product_id": product_id,
+                    "neighbor_ids": [neighbor_id for neighbor_id, _ in kept],
+                    "scores": [score for _, score in kept],
+                    "computed_at": computed_at
+                })
+                if len(batch) >= RecommendationService.WRITE_BATCH_SIZE:
+                    total += RecommendationService._write_neighbors(batch)
+                    batch = []
+            if batch:
+                total += RecommendationService._write_neighbors(batch)
+            db.session.execute(delete(ProductNeighbor).where(ProductNeighbor.computed_at < computed_at))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        logger.info(
+            f"Rekomendasi co-view dibangun: {len(user_ids)} pasangan user-produk, {matrix.shape[0]} user, "
+            f"{total} produk dengan tetangga. Baca {loaded - started:.1f} s, hitung {computed - loaded:.1f} s, "
+            f"tulis {time.perf_counter() - computed:.1f} s."
+        )
+        return total
+
+    @staticmethod
+    def get_similar_products(product_id, limit, fields=None):
+        """
+        Produk serupa untuk product_id dalam satu query: lookup primary key product_neighbors,
+        unnest array tetangga, lalu join ke product_cards. Urutan mengikuti skor.
+        Returns:
+            list row: kolom kartu produk sesuai fields ditambah score.
+        """
+        neighbors = select(
+            func.unnest(ProductNeighbor.neighbor_ids).label('neighbor_id'),
+            func.unnest(ProductNeighbor.scores).label('score')
+        ).where(ProductNeighbor.product_id == product_id).subquery('neighbors')
+
+        rows = db.session.execute(
+            select(*product_card_columns(fields), neighbors.c.score)
+            .join(neighbors, neighbors.c.neighbor_id == ProductCard.product_id)
+            .order_by(neighbors.c.score.desc(), ProductCard.product_id)
+            .limit(limit)
+        ).all()
+        return rows
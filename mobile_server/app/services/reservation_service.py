@@ -0,0 +1,238 @@
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import text, select, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app import db
+from app.models.order import Order, OrderItem, StockReservation
+from app.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+# Kurangi stok dan buat reservasi dalam SATU statement: UPDATE bersyarat (tanpa read-modify-write)
+# mengunci baris inventory hanya selama statement + commit, dan gagal tanpa efek jika stok kurang.
+_RESERVE_SQL = text("""
+    WITH decremented AS (
+        UPDATE inventory
+        SET quantity = quantity - :quantity, last_updated = now()
+        WHERE product_id = :product_id AND quantity >= :quantity
+        RETURNING product_id
+    )
+    INSERT INTO stock_reservations (user_id, product_id, quantity, status, expires_at, created_at)
+    SELECT :user_id, product_id, :quantity, 'active', :expires_at, now() FROM decremented
+    RETURNING id, expires_at
+""")
+
+_RELEASE_SQL = text("""
+    WITH released AS (
+        UPDATE stock_reservations
+        SET status = 'released'
+        WHERE id = :reservation_id AND user_id = :user_id AND status = 'active'
+        RETURNING product_id, quantity
+    )
+    UPDATE inventory
+    SET quantity = inventory.quantity + released.quantity, last_updated = now()
+    FROM released
+    WHERE inventory.product_id = released.product_id
+    RETURNING inventory.product_id
+""")
+
+# Reservasi kadaluwarsa diproses per batch. SKIP LOCKED mencegah beberapa reaper saling menunggu,
+# dan stok dikembalikan dengan satu UPDATE per produk (bukan per reservasi).
+_EXPIRE_SQL = text("""
+    WITH candidates AS (
+        SELECT id FROM stock_reservations
+        WHERE status = 'active' AND expires_at < now()
+        ORDER BY expires_at
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    ), expired AS (
+        UPDATE stock_reservations AS reservation
+        SET status = 'expired'
+        FROM candidates
+        WHERE reservation.id = candidates.id
+        RETURNING reservation.product_id, reservation.quantity
+    ), per_product AS (
+        SELECT product_id, SUM(quantity) AS quantity, COUNT(*) AS reservations
+        FROM expired
+        GROUP BY product_id
+    ), restocked AS (
+        UPDATE inventory
+        SET quantity = inventory.quantity + per_product.quantity, last_updated = now()
+        FROM per_product
+        WHERE inventory.product_id = per_product.product_id
+        RETURNING inventory.product_id
+    )
+    SELECT COALESCE(SUM(reservations), 0) FROM per_product
+""")
+
+
+class ReservationService:
+    @staticmethod
+    def reserve_stock(user_id, product_id, quantity):
+        """
+        Mereservasi stok secara atomik. Stok langsung dikurangi dan kembali otomatis jika
+        reservasi tidak di-checkout sebelum RESERVATION_TTL_SECONDS.
+        Returns:
+            (dict reservasi, None) jika berhasil, (None, pesan error) jika stok tidak mencukupi.
+        """
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=current_app.config['RESERVATION_TTL_SECONDS'])
+        try:
+            row = db.session.execute(_RESERVE_SQL, {
+                "user_id": user_id,
+                "product_id": product_id,
+                "quantity": quantity,
+                "expires_at": expires_at
+            }).first()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Gagal mereservasi stok produk {product_id} untuk user {user_id}: {e}")
+            return None, "Gagal mereservasi stok"
+
+        if not row:
+            return None, "Stok tidak mencukupi"
+        return {"reservation_id": row.id, "product_id": product_id, "quantity": quantity, "expires_at": row.expires_at}, None
+
+    @staticmethod
+    def release_reservation(user_id, reservation_id):
+        """
+        Melepas reservasi aktif milik user dan mengembalikan stoknya. True jika ada yang dilepas.
+        """
+        try:
+            released = db.session.execute(_RELEASE_SQL, {"reservation_id": reservation_id, "user_id": user_id}).first()
+            db.session.commit()
+            return released is not None
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Gagal melepas reservasi {reservation_id}: {e}")
+            return False
+
+    @staticmethod
+    def release_expired_reservations(batch_size=None, max_batches=100):
+        """
+        Mengembalikan stok dari reservasi yang kadaluwarsa, per batch dengan commit per batch.
+        Dipanggil oleh job terjadwal.
+        """
+        batch_size = batch_size or current_app.config['RESERVATION_EXPIRY_BATCH_SIZE']
+        total = 0
+        for _ in range(max_batches):
+            expired = db.session.execute(_EXPIRE_SQL, {"batch_size": batch_size}).scalar() or 0
+            db.session.commit()
+            total += expired
+            if expired < batch_size:
+                break
+        if total:
+            logger.info(f"{total} reservasi kadaluwarsa dikembalikan ke stok.")
+        return total
+
+    @staticmethod
+    def _order_summary(order_id):
+        order = db.session.get(Order, order_id)
+        items = OrderItem.query.filter_by(order_id=order_id).order_by(OrderItem.id).all()
+        return {
+            "order_id": order.id,
+            "status": order.status,
+            "total_amount": order.total_amount,
+            "order_date": order.order_date.isoformat() if order.order_date else None,
+            "shipping_address": order.shipping_address,
+            "payment_method": order.payment_method,
+            "items": [{
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "price_at_purchase": item.price_at_purchase
+            } for item in items]
+        }
+
+    @staticmethod
+    def get_order(user_id, order_id):
+        order = Order.query.filter_by(id=order_id, user_id=user_id).first()
+        if not order:
+            return None
+        return ReservationService._order_summary(order.id)
+
+    @staticmethod
+    def create_order(user_id, reservation_ids, shipping_address, payment_method, idempotency_key):
+        """
+        Membuat order dari reservasi aktif milik user secara idempoten.
+        Permintaan ulang dengan idempotency_key yang sama mengembalikan order yang sudah dibuat
+        (unique constraint (user_id, idempotency_key) + ON CONFLICT DO NOTHING), tanpa memakai stok lagi.
+        Returns:
+            (order dict, created(bool), None) atau (None, False, pesan error).
+        """
+        reservation_ids = list(OrderedDict.fromkeys(reservation_ids))
+        if not reservation_ids:
+            return None, False, "Tidak ada reservasi untuk di-checkout"
+        try:
+            order_id = None
+            # Dua percobaan: baris yang bentrok bisa hilang sebelum terbaca (transaksi lain di-rollback/dihapus)
+            for _ in range(2):
+                stmt = pg_insert(Order).values(
+                    user_id=user_id,
+                    total_amount=0,
+                    status='pending',
+                    shipping_address=shipping_address,
+                    payment_method=payment_method,
+                    idempotency_key=idempotency_key,
+                    order_date=datetime.now(timezone.utc),
+                    created_at=datetime.now(timezone.utc),
+                    updated_at=datetime.now(timezone.utc)
+                ).on_conflict_do_nothing(constraint='uq_orders_user_idempotency').returning(Order.id)
+                order_id = db.session.execute(stmt).scalar()
+                if order_id is not None:
+                    break
+
+                # Replay: order dengan key ini sudah pernah dibuat (dan sudah di-commit).
+                db.session.rollback()
+                existing = Order.query.filter_by(user_id=user_id, idempotency_key=idempotency_key).first()
+                if existing is not None:
+                    return ReservationService._order_summary(existing.id), False, None
+
+            if order_id is None:
+                logger.warning(f"Konflik Idempotency-Key untuk user {user_id}: order bentrok tidak ditemukan.")
+                return None, False, "Idempotency-Key sedang dipakai permintaan lain, coba lagi"
+
+            consumed = db.session.execute(
+                update(StockReservation)
+                .where(
+                    StockReservation.id.in_(reservation_ids),
+                    StockReservation.user_id == user_id,
+                    StockReservation.status == 'active',
+                    StockReservation.expires_at > datetime.now(timezone.utc)
+                )
+                .values(status='consumed', order_id=order_id)
+                .returning(StockReservation.product_id, StockReservation.quantity)
+            ).all()
+
+            if len(consumed) != len(reservation_ids):
+                db.session.rollback()
+                return None, False, "Reservasi tidak ditemukan, bukan milik Anda, atau sudah kadaluwarsa"
+
+            quantities = OrderedDict()
+            for row in consumed:
+                quantities[row.product_id] = quantities.get(row.product_id, 0) + row.quantity
+
+            prices = dict(db.session.execute(
+                select(Product.id, Product.price).where(Product.id.in_(list(quantities)))
+            ).all())
+
+            db.session.execute(insert(OrderItem), [{
+                "order_id": order_id,
+                "product_id": product_id,
+                "quantity": quantity,
+                "price_at_purchase": prices[product_id]
+            } for product_id, quantity in quantities.items()])
+
+            total_amount = sum((prices[product_id] * quantity for product_id, quantity in quantities.items()), Decimal('0'))
+            db.session.execute(update(Order).where(Order.id == order_id).values(total_amount=total_amount))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Gagal membuat order untuk user {user_id}: {e}")
+            return None, False, "Gagal membuat order"
+
+        logger.info(f"Order {order_id} dibuat untuk user {user_id} ({len(reservation_ids)} reservasi).")
+        return ReservationService._order_summary(order_id), True, None
@@ -0,0 +1,181 @@
+import logging
+from sqlalchemy import select, func, insert, and_, tuple_, BigInteger, Text
+from sqlalchemy.dialects.postgresql import array
+
+from app import db
+from app.models.product import ProductCard, ProductChange
+from app.schemas.product_serializer import PRODUCT_CARD_COLUMNS, dump_product_card_row
+from app.utils.request_metrics import serialization_span
+
+logger = logging.getLogger(__name__)
+
+CHANGE_INSERTED = 'inserted'
+CHANGE_UPDATED = 'updated'
+CHANGE_PRICE = 'price_changed'
+CHANGE_STOCK = 'stock_changed'
+CHANGE_DELETED = 'deleted'
+
+# Kolom yang perubahannya dicatat sebagai jenis perubahan tersendiri; kolom lain dicatat sebagai 'updated'.
+_DEDICATED_CHANGE_COLUMNS = {'price': CHANGE_PRICE, 'stock': CHANGE_STOCK}
+
+# Posisi dalam log perubahan = (txid, id). id BIGSERIAL dibagikan sebelum commit, bukan menurut urutan commit:
+# transaksi panjang (satu halaman crawler) bisa meng-commit id kecil setelah klien menerima token yang lebih besar.
+# Karena itu entri hanya dibaca jika txid-nya di bawah xmin snapshot (semua transaksi yang belum selesai, dan yang
+# dimulai setelahnya, punya txid >= xmin), dan diurutkan menurut (txid, id): entri yang commit belakangan selalu
+# berada setelah posisi yang sudah dibagikan.
+# Konsekuensinya, satu transaksi penulis yang lama (di mana pun di database) menahan semua entri yang commit
+# sesudahnya sampai ia selesai; get_changes_since melaporkannya sebagai lagging. Job panjang karena itu
+# menulis dalam transaksi pendek per batch (rebuild_all, build_neighbors, crawler per halaman).
+START_POSITION = (0, 0)
+
+
+def _snapshot_xmin():
+    return select(
+        func.pg_snapshot_xmin(func.pg_current_snapshot()).cast(Text).cast(BigInteger)
+    ).scalar_subquery()
+
+
+def visible_changes_after(position):
+    """
+    Filter entri product_changes setelah position yang transaksinya pasti sudah selesai.
+    """
+    return and_(
+        tuple_(ProductChange.txid, ProductChange.id) > tuple_(*position),
+        ProductChange.txid < _snapshot_xmin()
+    )
+
+
+def held_back_changes_after(position):
+    """
+    Filter entri product_changes setelah position yang sudah commit tetapi masih ditahan xmin snapshot
+    (ada transaksi lebih lama yang belum selesai).
+    """
+    return and_(
+        tuple_(ProductChange.txid, ProductChange.id) > tuple_(*position),
+        ProductChange.txid >= _snapshot_xmin()
+    )
+
+
+class SyncService:
+    @staticmethod
+    def classify_change(old, new, columns):
+        """
+        Menentukan jenis perubahan antara dua snapshot product_cards (None = tidak ada baris).
+        """
+        if old is None and new is None:
+            return []
+        if old is None:
+            return [CHANGE_INSERTED]
+        if new is None:
+            return [CHANGE_DELETED]
+
+        change_types = []
+        for column in columns:
+            if getattr(old, column) != getattr(new, column):
+                change_type = _DEDICATED_CHANGE_COLUMNS.get(column, CHANGE_UPDATED)
+                if change_type not in change_types:
+                    change_types.append(change_type)
+        return change_types
+
+    @staticmethod
+    def record_card_changes(old_cards, new_cards, columns):
+        """
+        Menambahkan entri product_changes untuk setiap produk yang berbeda antara old_cards dan new_cards.
+        Dijalankan di dalam transaksi pemanggil (tanpa commit).
+        """
+        rows = []
+        for product_id in sorted(set(old_cards) | set(new_cards)):
+            for change_type in SyncService.classify_change(old_cards.get(product_id), new_cards.get(product_id), columns):
+                rows.append({"product_id": product_id, "change_type": change_type})
+        if rows:
+            db.session.execute(insert(ProductChange), rows)
+        return len(rows)
+
+    @staticmethod
+    def record_changes(product_ids, change_type):
+        """
+        Menambahkan entri product_changes dengan jenis yang sama untuk beberapa produk (tanpa commit).
+        """
+        rows = [{"product_id": product_id, "change_type": change_type} for product_id in sorted(set(product_ids))]
+        if rows:
+            db.session.execute(insert(ProductChange), rows)
+        return len(rows)
+
+    @staticmethod
+    def format_sync_token(position):
+        return f"{position[0]}-{position[1]}"
+
+    @staticmethod
+    def parse_sync_token(token):
+        """
+        Token sync adalah posisi "<txid>-<id>" entri product_changes terakhir yang sudah diterima klien.
+        Kosong = sinkronisasi penuh. Token lama (hanya id) dipetakan ke posisi entri tersebut.
+        """
+        if not token:
+            return START_POSITION
+        parts = token.split('-')
+        if len(parts) == 1:
+            change_id = int(parts[0])
+            if change_id < 0:
+                raise ValueError("Token sync tidak valid.")
+            txid = db.session.execute(select(ProductChange.txid).where(ProductChange.id == change_id)).scalar()
+            return (txid, change_id) if txid is not None else START_POSITION
+        if len(parts) != 2:
+            raise ValueError("Token sync tidak valid.")
+        position = (int(parts[0]), int(parts[1]))
+        if position[0] < 0 or position[1] < 0:
+            raise ValueError("Token sync tidak valid.")
+        return position
+
+    @staticmethod
+    def get_changes_since(position, limit):
+        """
+        Mengambil hingga limit entri log perubahan setelah position, dipadatkan menjadi satu entri per produk
+        dengan kondisi terbarunya. Satu query: product_changes (range scan (txid, id)) LEFT JOIN product_cards.
+        lagging True berarti sudah ada perubahan yang commit setelah token berikutnya tetapi masih ditahan transaksi
+        lain yang belum selesai; klien sebaiknya mencoba lagi sebentar kemudian.
+        Returns:
+            (list entri, token berikutnya, has_more, lagging)
+        """
+        page = (
+            select(ProductChange.txid, ProductChange.id, ProductChange.product_id, ProductChange.change_type)
+            .where(visible_changes_after(position))
+            .order_by(ProductChange.txid, ProductChange.id)
+            .limit(limit + 1)
+            .subquery('page')
+        )
+        numbered = select(
+            page,
+            func.row_number().over(order_by=(page.c.txid, page.c.id)).label('row_number'),
+            func.count().over().label('page_rows')
+        ).subquery('numbered')
+
+        last_position = func.max(array([numbered.c.txid, numbered.c.id])).label('last_position')
+        change_types = func.array_agg(numbered.c.change_type.distinct()).label('change_types')
+        rows = db.session.execute(
+            select(
+                numbered.c.product_id.label('changed_product_id'), last_position, change_types,
+                func.max(numbered.c.page_rows).label('page_rows'), *PRODUCT_CARD_COLUMNS
+            )
+            .select_from(numbered)
+            .outerjoin(ProductCard, ProductCard.product_id == numbered.c.product_id)
+            .where(numbered.c.row_number <= limit)
+            .group_by(numbered.c.product_id, ProductCard.product_id)
+            .order_by(last_position)
+        ).all()
+
+        has_more = bool(rows) and rows[0].page_rows > limit
+
+        changes = []
+        with serialization_span():
+            for row in rows:
+                if row.id is None:
+                    changes.append({"id": row.changed_product_id, "deleted": True})
+                else:
+                    changes.append({"id": row.id, "changes": sorted(row.change_types), "product": dump_product_card_row(row)})
+
+        next_position = tuple(rows[-1].last_position) if rows else position
+        lagging = not has_more and db.session.execute(
+            select(select(ProductChange.id).where(held_back_changes_after(next_position)).exists())
+        ).scalar()
+        return changes, SyncService.format_sync_token(next_position), has_more, lagging
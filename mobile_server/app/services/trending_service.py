@@ -0,0 +1,257 @@
+import atexit
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app import db
+from app.models.analytics import ProductTrendingScore
+from app.models.product import ProductCard
+from app.schemas.product_serializer import product_card_columns
+from app.utils.decayed_counter import DecayedCounters, DECAY_EPOCH, decay_tau, decayed_value, epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+# Kenaikan counter per proses yang belum dipersist, dan snapshot top-N per window (dibaca endpoint tanpa lock).
+_counters = None
+_counters_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_last_flush = time.monotonic()
+_snapshots = {}  # window -> (dimuat pada monotonic, [(product_id, log_score)])
+_snapshot_lock = threading.Lock()
+
+
+class TrendingService:
+    # Rebuild membaca event sampai REBUILD_HALF_LIVES half-life ke belakang (bobot tersisa < 0.1%)
+    REBUILD_HALF_LIVES = 10
+    # Window dengan half-life minimal ini di-rebuild dari rollup harian, bukan dari event mentah
+    ROLLUP_MIN_HALF_LIFE_SECONDS = 86400
+
+    @staticmethod
+    def _windows():
+        return current_app.config['TRENDING_WINDOWS']
+
+    @staticmethod
+    def _get_counters():
+        global _counters
+        if _counters is None:
+            with _counters_lock:
+                if _counters is None:
+                    _counters = DecayedCounters(TrendingService._windows())
+                    atexit.register(TrendingService._flush_at_exit, current_app._get_current_object())
+        return _counters
+
+    @staticmethod
+    def record_views(product_ids, timestamp):
+        """
+        Menambah counter view untuk produk (dipanggil dari aliran aktivitas, tanpa I/O).
+        Kenaikan dipersist oleh thread latar setiap TRENDING_FLUSH_SECONDS.
+        """
+        counters = TrendingService._get_counters()
+        for product_id in product_ids:
+            counters.add(product_id, timestamp)
+        TrendingService.maybe_flush()
+
+    @staticmethod
+    def maybe_flush():
+        global _last_flush
+        if time.monotonic() - _last_flush < current_app.config['TRENDING_FLUSH_SECONDS']:
+            return False
+        if not _flush_lock.acquire(blocking=False):
+            return False
+        _last_flush = time.monotonic()
+        threading.Thread(
+            target=TrendingService._flush_in_background,
+            args=(current_app._get_current_object(),),
+            daemon=True
+        ).start()
+        return True
+
+    @staticmethod
+    def _flush_in_background(app):
+        try:
+            with app.app_context():
+                TrendingService.flush()
+        except Exception as e:
+            logger.error(f"Persist counter trending gagal: {e}")
+        finally:
+            _flush_lock.release()
+
+    @staticmethod
+    def _flush_at_exit(app):
+        try:
+            with app.app_context():
+                TrendingService.flush()
+        except Exception as e:
+            logger.error(f"Persist counter trending saat shutdown gagal: {e}")
+
+    @staticmethod
+    def flush():
+        """
+        Menggabungkan kenaikan counter proses ini ke product_trending_scores dengan satu upsert:
+        log_score baru = ln(exp(lama) + exp(kenaikan)). Kenaikan dari beberapa proses bisa digabung dalam urutan apa pun.
+        """
+        if _counters is None:
+            return 0
+        pending = _counters.drain()
+        if not pending:
+            return 0
+
+        rows = [
+            {"window_name": window, "product_id": product_id, "log_score": log_score}
+            for (window, product_id), log_score in sorted(pending.items())
+        ]
+        stmt = pg_insert(ProductTrendingScore).values(rows)
+        current, added = ProductTrendingScore.__table__.c.log_score, stmt.excluded.log_score
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProductTrendingScore.window_name, ProductTrendingScore.product_id],
+            set_={
+                "log_score": func.greatest(current, added) + func.ln(1 + func.exp(-func.abs(current - added))),
+                "updated_at": func.now()
+            }
+        )
+        try:
+            db.session.execute(stmt)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Kenaikan dikembalikan ke buffer agar dicoba lagi pada flush berikutnya
+            for (window, product_id), log_score in pending.items():
+                _counters.add_log((window, product_id), log_score)
+            raise
+        return len(rows)
+
+    @staticmethod
+    def _load_snapshot(window):
+        size = current_app.config['TRENDING_MAX_LIMIT'] * 2
+        rows = db.session.execute(
+            select(ProductTrendingScore.product_id, ProductTrendingScore.log_score)
+            .where(ProductTrendingScore.window_name == window)
+            .order_by(ProductTrendingScore.log_score.desc())
+            .limit(size)
+        ).all()
+        return [(row.product_id, row.log_score) for row in rows]
+
+    @staticmethod
+    def top(window, limit):
+        """
+        Top-N produk untuk window dari snapshot in-memory (dimuat ulang dengan satu index scan setiap
+        TRENDING_SNAPSHOT_SECONDS). Returns: list (product_id, skor saat ini).
+        """
+        entry = _snapshots.get(window)
+        if entry is None or time.monotonic() - entry[0] >= current_app.config['TRENDING_SNAPSHOT_SECONDS']:
+            with _snapshot_lock:
+                entry = _snapshots.get(window)
+                if entry is None or time.monotonic() - entry[0] >= current_app.config['TRENDING_SNAPSHOT_SECONDS']:
+                    entry = (time.monotonic(), TrendingService._load_snapshot(window))
+                    _snapshots[window] = entry
+        tau = decay_tau(TrendingService._windows()[window])
+        now = datetime.now(timezone.utc)
+        return [(product_id, decayed_value(log_score, now, tau)) for product_id, log_score in entry[1][:limit]]
+
+    @staticmethod
+    def get_trending(window, limit, fields=None):
+        """
+        Produk trending dengan kolom kartu produk: top-N dari snapshot, lalu satu lookup primary key product_cards.
+        Produk yang sudah dihapus dilewati.
+        Returns:
+            list (row kartu produk, skor)
+        """
+        ranked = TrendingService.top(window, current_app.config['TRENDING_MAX_LIMIT'] * 2)
+        if not ranked:
+            return []
+        rows = db.session.execute(
+            select(*product_card_columns(fields), ProductCard.product_id.label('trending_product_id'))
+            .where(ProductCard.product_id.in_([product_id for product_id, _ in ranked]))
+        ).all()
+        rows_by_id = {row.trending_product_id: row for row in rows}
+        return [
+            (rows_by_id[product_id], score)
+            for product_id, score in ranked if product_id in rows_by_id
+        ][:limit]
+
+    @staticmethod
+    def rebuild(windows=None):
+        """
+        Menghitung ulang counter dari data historis (setelah kehilangan data atau perubahan konfigurasi window).
+        Window pendek dihitung dari event view_product mentah, window panjang dari rollup harian
+        product_activity_daily (event dianggap terjadi di tengah hari). Diganti per window dalam satu transaksi.
+        """
+        half_lives = TrendingService._windows()
+        now = datetime.now(timezone.utc)
+        total = 0
+        try:
+            for window in windows or half_lives:
+                half_life = half_lives[window]
+                tau = decay_tau(half_life)
+                since = now - timedelta(seconds=half_life * TrendingService.REBUILD_HALF_LIVES)
+                if half_life >= TrendingService.ROLLUP_MIN_HALF_LIFE_SECONDS:
+                    source = """
+                        SELECT product_id AS product_id,
+                               (EXTRACT(EPOCH FROM day::timestamp AT TIME ZONE 'UTC') + 43200 - :epoch) / :tau AS x,
+                               event_count::double precision AS weight
+                        FROM product_activity_daily
+                        WHERE activity_type = 'view_product' AND day >= :since_day
+                    """
+                else:
+                    source = """
+                        SELECT related_id AS product_id,
+                               (EXTRACT(EPOCH FROM timestamp) - :epoch) / :tau AS x,
+                               1.0::double precision AS weight
+                        FROM user_activities
+                        WHERE activity_type = 'view_product' AND related_type = 'product'
+                          AND related_id IS NOT NULL AND timestamp >= :since
+                    """
+                db.session.execute(delete(ProductTrendingScore).where(ProductTrendingScore.window_name == window))
+                total += db.session.execute(text(f"""
+                    WITH events AS ({source}),
+                    peaks AS (SELECT product_id, MAX(x) AS peak FROM events GROUP BY product_id)
+                    INSERT INTO product_trending_scores (window_name, product_id, log_score)
+                    SELECT :window, events.product_id, peaks.peak + LN(SUM(events.weight * EXP(events.x - peaks.peak)))
+                    FROM events JOIN peaks USING (product_id)
+                    GROUP BY events.product_id, peaks.peak
+                """), {
+                    "window": window,
+                    "epoch": DECAY_EPOCH.timestamp(),
+                    "tau": tau,
+                    "since": since,
+                    "since_day": since.date()
+                }).rowcount
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        _snapshots.clear()
+        logger.info(f"Counter trending dibangun ulang: {total} baris.")
+        return total
+
+    @staticmethod
+    def rebuild_if_empty():
+        if db.session.execute(select(ProductTrendingScore.product_id).limit(1)).first() is None:
+            return TrendingService.rebuild()
+        db.session.rollback()
+        return 0
+
+    @staticmethod
+    def prune():
+        """
+        Menghapus counter yang skornya sudah di bawah TRENDING_MIN_SCORE (tidak akan muncul di top-N).
+        """
+        now_seconds = epoch_seconds(datetime.now(timezone.utc))
+        threshold = math.log(current_app.config['TRENDING_MIN_SCORE'])
+        deleted = 0
+        for window, half_life in TrendingService._windows().items():
+            deleted += db.session.execute(
+                delete(ProductTrendingScore).where(
+                    ProductTrendingScore.window_name == window,
+                    ProductTrendingScore.log_score < now_seconds / decay_tau(half_life) + threshold
+                )
+            ).rowcount
+        db.session.commit()
+        if deleted:
+            logger.info(f"{deleted} counter trending kedaluwarsa dihapus.")
+        return deleted
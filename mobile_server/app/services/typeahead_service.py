@@ -0,0 +1,216 @@
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import array
+
+from app import db
+from app.models.product import ProductCard, ProductChange
+from app.models.analytics import ProductActivityDaily
+from app.services.catalog_service import CatalogService
+from app.services.sync_service import START_POSITION, visible_changes_after
+from app.utils.prefix_index import PrefixIndex
+
+logger = logging.getLogger(__name__)
+
+# Indeks typeahead per proses. _state diganti utuh (bukan diubah) saat refresh,
+# sehingga suggest() cukup membaca satu referensi tanpa lock.
+_state = None
+_refresh_lock = threading.Lock()
+
+
+class _TypeaheadState:
+    def __init__(self, index, catalog_version, last_position, brand_products, popularity_refreshed_at):
+        self.index = index
+        self.catalog_version = catalog_version
+        self.last_position = last_position  # Posisi (txid, id) product_changes terakhir yang sudah diterapkan
+        self.brand_products = brand_products  # brand_id -> set(product_id), untuk skor dan penghapusan merek
+        self.popularity_refreshed_at = popularity_refreshed_at
+        self.checked_at = time.monotonic()
+
+
+class TypeaheadService:
+    @staticmethod
+    def _index_options():
+        return {
+            "max_words": current_app.config['TYPEAHEAD_MAX_WORDS'],
+            "max_limit": current_app.config['TYPEAHEAD_MAX_LIMIT'],
+        }
+
+    @staticmethod
+    def _product_views(product_ids=None):
+        """
+        Jumlah view_product per produk dalam TYPEAHEAD_POPULARITY_DAYS terakhir, dari rollup harian
+        product_activity_daily (tidak membaca event mentah).
+        """
+        since = (datetime.now(timezone.utc) - timedelta(days=current_app.config['TYPEAHEAD_POPULARITY_DAYS'])).date()
+        query = select(ProductActivityDaily.product_id, func.sum(ProductActivityDaily.event_count))\
+            .where(
+                ProductActivityDaily.activity_type == 'view_product',
+                ProductActivityDaily.day >= since
+            )\
+            .group_by(ProductActivityDaily.product_id)
+        if product_ids is not None:
+            query = query.where(ProductActivityDaily.product_id.in_(product_ids))
+        return dict(db.session.execute(query).all())
+
+    @staticmethod
+    def _brand_scores(brand_products, views):
+        return {
+            ('brand', brand_id): math.log1p(sum(views.get(product_id, 0) for product_id in product_ids))
+            for brand_id, product_ids in brand_products.items()
+        }
+
+    @staticmethod
+    def build():
+        """
+        Membangun ulang indeks dari product_cards dan popularitas view_product, lalu mempublikasikannya.
+        """
+        global _state
+        started = time.perf_counter()
+        catalog_version, _ = CatalogService.get_version()
+        # Dibaca sebelum product_cards: perubahan setelah titik ini akan diterapkan ulang oleh refresh (idempoten).
+        last_position = db.session.execute(
+            select(ProductChange.txid, ProductChange.id)
+            .where(visible_changes_after(START_POSITION))
+            .order_by(ProductChange.txid.desc(), ProductChange.id.desc())
+            .limit(1)
+        ).first()
+        last_position = tuple(last_position) if last_position else START_POSITION
+        rows = db.session.execute(
+            select(ProductCard.product_id, ProductCard.name, ProductCard.brand_id, ProductCard.brand_name)
+        ).all()
+        views = TypeaheadService._product_views()
+
+        entries = []
+        brand_products = {}
+        brand_names = {}
+        for row in rows:
+            entries.append((('product', row.product_id), row.name, math.log1p(views.get(row.product_id, 0)), None))
+            if row.brand_id is not None and row.brand_name:
+                brand_products.setdefault(row.brand_id, set()).add(row.product_id)
+                brand_names[row.brand_id] = row.brand_name
+
+        brand_scores = TypeaheadService._brand_scores(brand_products, views)
+        entries.extend(
+            (('brand', brand_id), name, brand_scores[('brand', brand_id)], None) for brand_id, name in brand_names.items()
+        )
+        db.session.rollback()  # Lepaskan koneksi; indeks hanya di memori
+
+        index = PrefixIndex.build(entries, **TypeaheadService._index_options())
+        _state = _TypeaheadState(index, catalog_version, last_position, brand_products, time.monotonic())
+        logger.info(f"Indeks typeahead dibangun: {len(index)} entri dalam {time.perf_counter() - started:.2f} s.")
+        return len(index)
+
+    @staticmethod
+    def refresh():
+        """
+        Menerapkan perubahan katalog sejak refresh terakhir (product_changes setelah last_position, hanya dari
+        transaksi yang sudah selesai; lihat SyncService)
+        dan, jika sudah waktunya, memperbarui skor popularitas. Tidak melakukan apa-apa jika versi katalog sama.
+        """
+        global _state
+        state = _state
+        if state is None:
+            return TypeaheadService.build()
+
+        catalog_version, _ = CatalogService.get_version()
+        popularity_due = time.monotonic() - state.popularity_refreshed_at >= current_app.config['TYPEAHEAD_POPULARITY_REFRESH_SECONDS']
+        if catalog_version == state.catalog_version and not popularity_due:
+            db.session.rollback()
+            state.checked_at = time.monotonic()
+            return 0
+
+        last_position = func.max(array([ProductChange.txid, ProductChange.id])).label('last_position')
+        rows = db.session.execute(
+            select(ProductChange.product_id, last_position, ProductCard.name, ProductCard.brand_id, ProductCard.brand_name)
+            .outerjoin(ProductCard, ProductCard.product_id == ProductChange.product_id)
+            .where(visible_changes_after(state.last_position))
+            .group_by(ProductChange.product_id, ProductCard.product_id)
+        ).all()
+        changed_ids = [row.product_id for row in rows]
+        views = TypeaheadService._product_views() if popularity_due else TypeaheadService._product_views(changed_ids)
+        db.session.rollback()
+
+        brand_products = {brand_id: set(product_ids) for brand_id, product_ids in state.brand_products.items()}
+        for product_ids in brand_products.values():
+            product_ids.difference_update(changed_ids)
+
+        upserts = []
+        removals = []
+        for row in rows:
+            ref = ('product', row.product_id)
+            if row.name is None:
+                removals.append(ref)
+                continue
+            upserts.append((ref, row.name, math.log1p(views.get(row.product_id, 0)), None))
+            if row.brand_id is not None and row.brand_name:
+                brand_products.setdefault(row.brand_id, set()).add(row.product_id)
+                upserts.append((('brand', row.brand_id), row.brand_name, None, None))
+
+        removals.extend(('brand', brand_id) for brand_id, product_ids in brand_products.items() if not product_ids)
+        brand_products = {brand_id: product_ids for brand_id, product_ids in brand_products.items() if product_ids}
+
+        scores = {}
+        if popularity_due:
+            scores = {('product', product_id): math.log1p(count) for product_id, count in views.items()}
+            scores.update(TypeaheadService._brand_scores(brand_products, views))
+            # Produk yang tidak lagi dilihat dalam jendela popularitas kembali ke skor 0
+            for entry_ref in state.index.refs():
+                if entry_ref[0] == 'product' and entry_ref not in scores:
+                    scores[entry_ref] = 0.0
+
+        index = state.index.updated(upserts=upserts, removals=removals, scores=scores)
+        new_last_position = max([state.last_position] + [tuple(row.last_position) for row in rows])
+        popularity_refreshed_at = time.monotonic() if popularity_due else state.popularity_refreshed_at
+        _state = _TypeaheadState(index, catalog_version, new_last_position, brand_products, popularity_refreshed_at)
+        logger.info(f"Indeks typeahead diperbarui: {len(rows)} produk berubah, popularitas {'diperbarui' if popularity_due else 'tetap'}.")
+        return len(rows)
+
+    @staticmethod
+    def _refresh_in_background(app):
+        try:
+            with app.app_context():
+                TypeaheadService.refresh()
+        except Exception as e:
+            logger.error(f"Refresh indeks typeahead gagal: {e}")
+        finally:
+            _refresh_lock.release()
+
+    @staticmethod
+    def maybe_refresh():
+        """
+        Memicu refresh di thread latar jika pemeriksaan terakhir sudah lebih lama dari
+        TYPEAHEAD_CHECK_INTERVAL_SECONDS. Permintaan tidak pernah menunggu refresh; selama refresh
+        berjalan, indeks lama tetap dipakai.
+        """
+        state = _state
+        if state is not None and time.monotonic() - state.checked_at < current_app.config['TYPEAHEAD_CHECK_INTERVAL_SECONDS']:
+            return False
+        if not _refresh_lock.acquire(blocking=False):
+            return False
+        if state is not None:
+            state.checked_at = time.monotonic()
+        threading.Thread(
+            target=TypeaheadService._refresh_in_background,
+            args=(current_app._get_current_object(),),
+            daemon=True
+        ).start()
+        return True
+
+    @staticmethod
+    def suggest(query, limit):
+        """
+        Saran autocomplete untuk query (prefix), dari indeks in-memory tanpa query database.
+        Mengembalikan None jika indeks belum siap.
+        """
+        state = _state
+        if state is None:
+            return None
+        return [
+            {"type": ref[0], "id": ref[1], "name": name}
+            for ref, name, _ in state.index.search(query, limit)
+        ]
@@ -0,0 +1,199 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Buffer in-memory untuk event yang ditulis secara asinkron: emit() hanya menambah ke antrean,
+# thread latar menulis per batch (multi-row INSERT) setiap batch_size event atau flush_interval detik.
+# Memori dibatasi max_events; event di atas batas dibuang dan dihitung (dropped). Batch yang gagal ditulis
+# dikembalikan ke depan buffer dan dicoba ulang dengan backoff eksponensial, lalu dibuang (failed) setelah max_retries.
+
+
+class ActivitySink:
+    def __init__(self, write_batch, max_events, batch_size, flush_interval, max_retries=3, retry_backoff=0.5,
+                 name='activity-sink'):
+        """
+        Args:
+            write_batch (callable): menerima list row dan menulisnya (dipanggil dari thread latar).
+            max_events (int): jumlah maksimum event di buffer.
+            batch_size (int): jumlah event yang memicu flush dan ukuran maksimum satu INSERT.
+            flush_interval (float): jeda maksimum (detik) sebelum event di buffer ditulis.
+            max_retries (int): jumlah percobaan ulang batch yang gagal ditulis sebelum dibuang.
+            retry_backoff (float): jeda (detik) sebelum percobaan ulang pertama, berlipat dua setiap kegagalan.
+        """
+        self.write_batch = write_batch
+        self.max_events = max_events
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.name = name
+        self._reset()
+        atexit.register(self.close)
+        if hasattr(os, 'register_at_fork'):
+            # Proses hasil fork (worker WSGI): thread dan buffer milik proses induk tidak ikut. Di-reset segera
+            # setelah fork, sebelum thread request mana pun berjalan, agar tidak ada reset bersamaan di emit()
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._condition = threading.Condition()
+        self._buffer = []
+        self._closed = False
+        self._thread = None
+        self._flushing = False
+        self._flush_requested = False
+        self._retry_at = None
+        self._attempt = 0
+        self._enqueued = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._retries = 0
+        self._flushes = 0
+
+    def _ensure_thread(self):
+        # Dipanggil dengan _condition terkunci
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def emit(self, row):
+        """
+        Menambahkan satu event ke buffer tanpa I/O. Returns: False jika event dibuang (buffer penuh/ditutup).
+        """
+        with self._condition:
+            if self._closed or len(self._buffer) >= self.max_events:
+                self._dropped += 1
+                return False
+            self._buffer.append(row)
+            self._enqueued += 1
+            self._ensure_thread()
+            if len(self._buffer) == self.batch_size:
+                self._condition.notify_all()
+        return True
+
+    def _take_batch(self):
+        batch = self._buffer[:self.batch_size]
+        del self._buffer[:self.batch_size]
+        return batch
+
+    def _write(self, batch):
+        """
+        Returns: True jika batch tertulis. Kegagalan hanya dicatat; pemanggil yang mengantre ulang batch.
+        """
+        try:
+            self.write_batch(batch)
+        except Exception as e:
+            logger.error(f"Gagal menulis {len(batch)} event dari buffer {self.name}: {e}")
+            return False
+        with self._condition:
+            self._written += len(batch)
+            self._flushes += 1
+            self._attempt = 0
+        return True
+
+    def _retry_or_drop(self, batch):
+        # Dipanggil dengan _condition terkunci setelah _write gagal
+        self._attempt += 1
+        if self._attempt > self.max_retries:
+            logger.error(f"{len(batch)} event dari buffer {self.name} dibuang setelah {self.max_retries} percobaan ulang.")
+            self._failed += len(batch)
+            self._attempt = 0
+            return
+        # Dikembalikan ke depan buffer, tetap dalam batas max_events (event yang tidak muat ikut dihitung failed)
+        room = max(0, self.max_events - len(self._buffer))
+        if room < len(batch):
+            logger.warning(f"Buffer {self.name} penuh, {len(batch) - room} event gagal tidak dapat diantre ulang.")
+            self._failed += len(batch) - room
+        self._buffer[:0] = batch[:room]
+        self._retries += 1
+        self._retry_at = time.monotonic() + self.retry_backoff * 2 ** (self._attempt - 1)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed:
+                    if self._retry_at is not None:
+                        # Backoff setelah penulisan gagal, walaupun buffer penuh atau flush diminta
+                        remaining = self._retry_at - time.monotonic()
+                    elif self._flush_requested or len(self._buffer) >= self.batch_size:
+                        break
+                    else:
+                        remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                self._retry_at = None
+                if not self._buffer:
+                    self._flush_requested = False
+                    if self._closed:
+                        return
+                    continue
+                batch = self._take_batch()
+                if not self._buffer:
+                    self._flush_requested = False
+                self._flushing = True
+            written = False
+            try:
+                written = self._write(batch)
+            finally:
+                with self._condition:
+                    if not written:
+                        self._retry_or_drop(batch)
+                    self._flushing = False
+                    self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Menunggu sampai buffer kosong dan tidak ada batch yang sedang ditulis. Returns: True jika berhasil.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            if self._buffer:
+                self._flush_requested = True
+                self._ensure_thread()
+                self._condition.notify_all()
+            while self._buffer or self._flushing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout=10):
+        """
+        Menutup sink saat shutdown: event berikutnya ditolak, sisa buffer ditulis sebelum thread berhenti.
+        """
+        if self._pid != os.getpid():
+            return
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+        with self._condition:
+            if self._buffer:
+                logger.warning(f"{len(self._buffer)} event di buffer {self.name} tidak sempat ditulis saat shutdown.")
+                self._dropped += len(self._buffer)
+                self._buffer = []
+
+    def stats(self):
+        with self._condition:
+            return {
+                "buffered": len(self._buffer),
+                "max_events": self.max_events,
+                "enqueued": self._enqueued,
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "retries": self._retries,
+                "flushes": self._flushes,
+            }
@@ -0,0 +1,71 @@
+import gzip
+import logging
+from flask import request
+
+try:
+    import brotli  # Opsional: jika tidak terpasang, hanya gzip yang ditawarkan
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Kompresi respons berdasarkan Accept-Encoding klien, didaftarkan sebagai after_request di create_app().
+
+
+def _preferred_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br'] > 0 and accepted['br'] >= accepted['gzip']:
+        return 'br'
+    if accepted['gzip'] > 0:
+        return 'gzip'
+    return None
+
+
+def compress_response(response, min_size, level, mimetypes):
+    """
+    Mengompres body respons dengan brotli atau gzip jika klien menerimanya dan ukurannya
+    minimal min_size byte. Respons streaming, non-200, atau yang sudah memiliki Content-Encoding dibiarkan.
+    Strong ETag diberi akhiran encoding agar representasi terkompresi punya validator sendiri.
+    """
+    if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+        return response
+    if 'Content-Encoding' in response.headers or response.mimetype not in mimetypes:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if response.content_length is not None and response.content_length < min_size:
+        return response
+
+    encoding = _preferred_encoding()
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=min(level, 11))
+    else:
+        compressed = gzip.compress(data, compresslevel=min(level, 9))
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+
+    etag, is_weak = response.get_etag()
+    if etag and not is_weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+
+def init_compression(app):
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    @app.after_request
+    def _compress(response):
+        return compress_response(
+            response,
+            min_size=app.config['COMPRESS_MIN_SIZE'],
+            level=app.config['COMPRESS_LEVEL'],
+            mimetypes=app.config['COMPRESS_MIMETYPES'],
+        )
+
+    logger.info(f"Kompresi respons aktif (brotli: {'ya' if brotli is not None else 'tidak'}).")
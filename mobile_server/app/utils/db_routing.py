@@ -0,0 +1,103 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from flask import g, request, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Select
+
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Routing baca ke read replica (bind SQLALCHEMY_BINDS 'replica_*'):
+# - request GET/HEAD/OPTIONS membaca SELECT dari replica; statement lain dan request tulis memakai primary
+# - read-your-writes: setelah request tulis yang berhasil, request pengguna tersebut dipin ke primary selama
+#   DB_REPLICA_PIN_SECONDS (cookie untuk klien yang menyimpannya, ditambah pin per user di proses ini)
+# - di luar request (job, script) selalu primary
+# Tanpa replica yang dikonfigurasi, tidak ada hook yang dipasang dan semua query ke primary.
+
+READ_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+PIN_COOKIE = 'db_primary_until'
+REPLICA_BIND_PREFIX = 'replica_'
+
+_user_pins = None
+
+
+def replica_bind_keys(app):
+    return sorted(key for key in app.config.get('SQLALCHEMY_BINDS') or {} if key.startswith(REPLICA_BIND_PREFIX))
+
+
+def reads_from_replica():
+    return has_request_context() and g.get('db_use_replica', False)
+
+
+def use_primary():
+    """
+    Memindahkan sisa request ini ke primary (misal data harus terbaru, atau replica belum menyusul).
+    """
+    if has_request_context():
+        g.db_use_replica = False
+
+
+@contextmanager
+def primary_reads():
+    """
+    Menjalankan blok dengan pembacaan dari primary, lalu mengembalikan routing request sebelumnya.
+    """
+    if not has_request_context():
+        yield
+        return
+    previous = g.get('db_use_replica', False)
+    g.db_use_replica = False
+    try:
+        yield
+    finally:
+        g.db_use_replica = previous
+
+
+class RoutingSession(Session):
+    """
+    Session Flask-SQLAlchemy yang mengarahkan SELECT ke salah satu replica saat reads_from_replica().
+    Flush (INSERT/UPDATE/DELETE ORM), statement non-SELECT, dan bind eksplisit tetap memakai primary.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and isinstance(clause, Select) and reads_from_replica():
+            replica_keys = g.get('db_replica_keys')
+            if replica_keys:
+                return self._db.engines[random.choice(replica_keys)]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def pin_user_if_recent_write(user_id):
+    """
+    Dipanggil setelah pengguna teridentifikasi: jika pengguna baru saja menulis lewat proses ini, baca dari primary.
+    """
+    if _user_pins is not None and reads_from_replica() and _user_pins.get(user_id) is True:
+        use_primary()
+
+
+def init_db_routing(app):
+    global _user_pins
+    replica_keys = replica_bind_keys(app)
+    if not replica_keys:
+        return
+    pin_seconds = app.config['DB_REPLICA_PIN_SECONDS']
+    _user_pins = TTLCache(maxsize=app.config['DB_REPLICA_PIN_CACHE_SIZE'], ttl=pin_seconds)
+
+    @app.before_request
+    def _route_reads():
+        g.db_replica_keys = replica_keys
+        pinned_until = request.cookies.get(PIN_COOKIE, type=float)
+        g.db_use_replica = request.method in READ_METHODS and not (pinned_until and pinned_until > time.time())
+
+    @app.after_request
+    def _pin_after_write(response):
+        if request.method not in READ_METHODS and response.status_code < 400:
+            response.set_cookie(PIN_COOKIE, f"{time.time() + pin_seconds:.0f}", max_age=pin_seconds, httponly=True)
+            current_user = g.get('current_user')
+            if current_user is not None:
+                _user_pins.set(current_user.id, True)
+        return response
+
+    logger.info(f"Routing baca ke {len(replica_keys)} replica aktif (pin setelah tulis {pin_seconds} s).")
@@ -0,0 +1,72 @@
+import math
+import threading
+from datetime import datetime, timezone
+
+# Counter dengan peluruhan eksponensial (forward decay).
+# Skor saat t: S(t) = sum_i w_i * 2^(-(t - t_i) / half_life). Yang disimpan adalah
+#   G = ln(sum_i w_i * exp(t_i / tau)),  tau = half_life / ln 2,  t diukur dari DECAY_EPOCH,
+# sehingga S(t) = exp(G - t / tau). G hanya berubah saat ada event (tidak perlu diperbarui seiring waktu),
+# urutan berdasarkan G sama dengan urutan skor saat ini, dan G dari beberapa proses digabung dengan log_add.
+
+DECAY_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def decay_tau(half_life_seconds):
+    return half_life_seconds / math.log(2)
+
+
+def epoch_seconds(timestamp):
+    return (timestamp - DECAY_EPOCH).total_seconds()
+
+
+def log_add(a, b):
+    """
+    ln(exp(a) + exp(b)) tanpa overflow.
+    """
+    if a < b:
+        a, b = b, a
+    return a + math.log1p(math.exp(b - a))
+
+
+def log_weight(timestamp, tau, weight=1.0):
+    return epoch_seconds(timestamp) / tau + math.log(weight)
+
+
+def decayed_value(log_score, now, tau):
+    return math.exp(log_score - epoch_seconds(now) / tau)
+
+
+class DecayedCounters:
+    """
+    Kenaikan counter per (window, key) yang belum dipersist, untuk beberapa window (half-life) sekaligus.
+    Thread-safe; drain() mengambil dan mengosongkan semua kenaikan.
+    """
+    def __init__(self, half_lives):
+        self.taus = {window: decay_tau(half_life) for window, half_life in half_lives.items()}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, timestamp, weight=1.0):
+        increments = [((window, key), log_weight(timestamp, tau, weight)) for window, tau in self.taus.items()]
+        with self._lock:
+            for pending_key, value in increments:
+                self._add_locked(pending_key, value)
+
+    def add_log(self, pending_key, log_value):
+        """
+        Menggabungkan kenaikan dalam bentuk log (misal hasil drain() yang gagal dipersist) ke buffer.
+        """
+        with self._lock:
+            self._add_locked(pending_key, log_value)
+
+    def _add_locked(self, pending_key, value):
+        current = self._pending.get(pending_key)
+        self._pending[pending_key] = value if current is None else log_add(current, value)
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def __len__(self):
+        return len(self._pending)
@@ -0,0 +1,61 @@
+import hashlib
+from flask import request, make_response
+
+# Helper conditional GET (ETag / Last-Modified).
+# ETag dihitung dari penanda versi yang murah (versi katalog, updated_at) sehingga
+# pengecekan If-None-Match bisa dilakukan sebelum query berat dan serialisasi.
+
+
+def make_etag(*parts):
+    """
+    Membuat strong ETag (tanpa tanda kutip) dari komponen penanda versi.
+    """
+    raw = '|'.join('' if part is None else str(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def canonical_query_string():
+    """
+    Query string yang dinormalisasi (urutan parameter tidak berpengaruh) untuk bahan ETag daftar.
+    """
+    return '&'.join(f"{key}={value}" for key, value in sorted(request.args.items(multi=True)))
+
+
+# Akhiran yang ditambahkan app/utils/compression.py ke ETag representasi terkompresi.
+ETAG_ENCODING_SUFFIXES = ('', '-gzip', '-br')
+
+
+def _matching_etag(etag):
+    for suffix in ETAG_ENCODING_SUFFIXES:
+        if request.if_none_match.contains(etag + suffix):
+            return etag + suffix
+    return None
+
+
+def is_not_modified(etag, last_modified=None):
+    """
+    True jika klien sudah memiliki representasi terbaru (termasuk varian terkompresinya).
+    If-None-Match diutamakan; If-Modified-Since hanya dipakai jika If-None-Match tidak dikirim.
+    """
+    if request.if_none_match:
+        return _matching_etag(etag) is not None
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def apply_cache_headers(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Klien boleh menyimpan, tetapi wajib revalidasi setiap kali (murah berkat 304).
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def not_modified_response(etag, last_modified=None):
+    if request.if_none_match:
+        etag = _matching_etag(etag) or etag
+    response = apply_cache_headers(make_response('', 304), etag, last_modified)
+    response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,151 @@
+import logging
+import re
+from datetime import date, datetime, timezone
+from sqlalchemy import text
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Helper partisi bulanan PostgreSQL (PARTITION BY RANGE pada kolom waktu).
+# Partisi diberi nama <tabel>_pYYYYMM dan mencakup [awal bulan, awal bulan berikutnya).
+
+_IDENTIFIER = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+
+def _check_identifier(name):
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Nama tabel tidak valid: {name}")
+    return name
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    month_index = value.year * 12 + (value.month - 1) + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(table_name, month):
+    return f"{table_name}_p{month.year:04d}{month.month:02d}"
+
+
+def default_partition_name(table_name):
+    return f"{table_name}_default"
+
+
+def ensure_default_partition(table_name):
+    """
+    Membuat partisi DEFAULT (<tabel>_default) jika belum ada, agar INSERT tidak gagal saat partisi bulanannya
+    belum dibuat (mis. job pemeliharaan partisi tidak berjalan). Dijalankan di dalam transaksi pemanggil (tanpa commit).
+    """
+    _check_identifier(table_name)
+    name = default_partition_name(table_name)
+    db.session.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table_name} DEFAULT"))
+    return name
+
+
+def _relation_exists(name):
+    return db.session.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+
+def _partition_column(table_name):
+    return db.session.execute(text(
+        "SELECT a.attname FROM pg_partitioned_table p "
+        "JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0] "
+        "WHERE p.partrelid = to_regclass(:table_name)"
+    ), {"table_name": table_name}).scalar()
+
+
+def _create_monthly_partition(table_name, name, start, end, partition_column):
+    """
+    Membuat satu partisi bulanan. Baris di partisi DEFAULT yang masuk rentang bulan ini dipindahkan lebih dulu
+    (PostgreSQL menolak partisi baru jika DEFAULT masih memuat baris untuk rentangnya).
+    """
+    default_name = default_partition_name(table_name)
+    bounds = {"start": start, "end": end}
+    in_range = f"{partition_column} >= :start AND {partition_column} < :end"
+    has_default_rows = _relation_exists(default_name) and db.session.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {default_name} WHERE {in_range})"), bounds
+    ).scalar()
+
+    if not has_default_rows:
+        db.session.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {table_name} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        return 0
+
+    # Dikunci dulu (ATTACH juga membutuhkannya) agar tidak ada baris baru untuk rentang ini masuk ke DEFAULT
+    db.session.execute(text(f"LOCK TABLE {default_name} IN ACCESS EXCLUSIVE MODE"))
+    db.session.execute(text(f"CREATE TABLE {name} (LIKE {table_name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = db.session.execute(text(
+        f"WITH moved AS (DELETE FROM {default_name} WHERE {in_range} RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+    ), bounds).rowcount
+    db.session.execute(text(
+        f"ALTER TABLE {table_name} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    logger.info(f"Partisi {name} dibuat; {moved} baris dipindahkan dari {default_name}.")
+    return moved
+
+
+def ensure_monthly_partitions(table_name, months_ahead=3, months_behind=0, reference=None):
+    """
+    Membuat partisi DEFAULT dan partisi bulanan yang belum ada untuk rentang
+    [bulan ini - months_behind, bulan ini + months_ahead]. Dijalankan di dalam transaksi pemanggil (tanpa commit).
+    """
+    _check_identifier(table_name)
+    current = month_start(reference or datetime.now(timezone.utc))
+    partition_column = _partition_column(table_name)
+    created = []
+    for offset in range(-months_behind, months_ahead + 1):
+        start = add_months(current, offset)
+        end = add_months(start, 1)
+        name = partition_name(table_name, start)
+        if not _relation_exists(name):
+            _create_monthly_partition(table_name, name, start, end, partition_column)
+        created.append(name)
+    ensure_default_partition(table_name)
+    logger.debug(f"Partisi {table_name} dipastikan ada: {', '.join(created)}")
+    return created
+
+
+def list_monthly_partitions(table_name):
+    """
+    Daftar (nama_partisi, awal_bulan) untuk partisi bulanan table_name, urut dari yang terlama.
+    """
+    _check_identifier(table_name)
+    rows = db.session.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :table_name"
+    ), {"table_name": table_name}).scalars().all()
+
+    pattern = re.compile(rf'^{table_name}_p(\d{{4}})(\d{{2}})$')
+    partitions = []
+    for name in rows:
+        match = pattern.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def drop_monthly_partitions_before(table_name, cutoff):
+    """
+    Menghapus (DROP) partisi bulanan yang seluruh rentangnya sebelum cutoff. Jauh lebih murah
+    daripada DELETE massal: tidak ada dead tuple, vacuum, maupun pembengkakan indeks.
+    Dijalankan di dalam transaksi pemanggil (tanpa commit).
+    """
+    cutoff_month = month_start(cutoff)
+    dropped = []
+    for name, start in list_monthly_partitions(table_name):
+        if add_months(start, 1) <= cutoff_month:
+            db.session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+    if dropped:
+        logger.info(f"Partisi {table_name} dihapus: {', '.join(dropped)}")
+    return dropped
@@ -0,0 +1,172 @@
+import base64
+import hashlib
+import hmac
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+# Hasher password dengan format hash berversi:
+# - scrypt (memory-hard, default):  $scrypt$n=16384,r=8,p=1$<salt base64>$<hash base64>
+# - sha256 lama (static salt):       64 karakter heksadesimal tanpa prefix
+# Hash lama tetap bisa diverifikasi dan ditandai needs_rehash, sehingga diperbarui saat login berikutnya.
+
+
+class PasswordHashingBusy(Exception):
+    """
+    Antrean pool hashing penuh, atau hashing tidak selesai dalam batas waktu; permintaan dijawab HTTP 503.
+    """
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+
+def _b64decode(value):
+    return base64.b64decode(value + '=' * (-len(value) % 4))
+
+
+class ScryptHasher:
+    scheme = 'scrypt'
+    _FORMAT = re.compile(r'^\$scrypt\$n=(\d+),r=(\d+),p=(\d+)\$([A-Za-z0-9+/]+)\$([A-Za-z0-9+/]+)$')
+
+    def __init__(self, n=2 ** 14, r=8, p=1, salt_size=16, key_size=32):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.salt_size = salt_size
+        self.key_size = key_size
+
+    def _derive(self, password, salt, n, r, p, key_size):
+        # maxmem harus di atas 128 * n * r byte; beri ruang dua kali lipat
+        return hashlib.scrypt(
+            password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+            maxmem=256 * n * r + 1024 * 1024, dklen=key_size
+        )
+
+    def identify(self, stored_hash):
+        return stored_hash.startswith('$scrypt$')
+
+    def hash(self, password):
+        salt = os.urandom(self.salt_size)
+        derived = self._derive(password, salt, self.n, self.r, self.p, self.key_size)
+        return f"$scrypt$n={self.n},r={self.r},p={self.p}${_b64encode(salt)}${_b64encode(derived)}"
+
+    def verify(self, password, stored_hash):
+        match = self._FORMAT.match(stored_hash)
+        if not match:
+            return False
+        n, r, p = (int(value) for value in match.group(1, 2, 3))
+        salt = _b64decode(match.group(4))
+        expected = _b64decode(match.group(5))
+        derived = self._derive(password, salt, n, r, p, len(expected))
+        return hmac.compare_digest(derived, expected)
+
+    def needs_rehash(self, stored_hash):
+        match = self._FORMAT.match(stored_hash)
+        if not match:
+            return True
+        return tuple(int(value) for value in match.group(1, 2, 3)) != (self.n, self.r, self.p)
+
+
+class LegacySha256Hasher:
+    """
+    Format lama: sha256(password + STATIC_SALT) dalam heksadesimal. Hanya untuk verifikasi hash lama.
+    """
+    scheme = 'sha256'
+    _FORMAT = re.compile(r'^[0-9a-f]{64}$')
+
+    def __init__(self, static_salt):
+        self.static_salt = static_salt
+
+    def identify(self, stored_hash):
+        return bool(self._FORMAT.match(stored_hash))
+
+    def hash(self, password):
+        return hashlib.sha256((password + self.static_salt).encode('utf-8')).hexdigest()
+
+    def verify(self, password, stored_hash):
+        return hmac.compare_digest(self.hash(password), stored_hash)
+
+    def needs_rehash(self, stored_hash):
+        return True
+
+
+class PasswordHasher:
+    """
+    Memilih hasher berdasarkan format hash tersimpan; hash baru selalu memakai hasher pertama (default).
+    """
+    def __init__(self, hashers):
+        self.hashers = list(hashers)
+        self.default = self.hashers[0]
+
+    def _identify(self, stored_hash):
+        for hasher in self.hashers:
+            if stored_hash and hasher.identify(stored_hash):
+                return hasher
+        return None
+
+    def hash(self, password):
+        return self.default.hash(password)
+
+    def verify(self, password, stored_hash):
+        """
+        Returns:
+            (cocok(bool), perlu_rehash(bool))
+        """
+        hasher = self._identify(stored_hash)
+        if hasher is None:
+            return False, False
+        if not hasher.verify(password, stored_hash):
+            return False, False
+        return True, hasher is not self.default or self.default.needs_rehash(stored_hash)
+
+
+class HashingPool:
+    """
+    Pool thread terbatas untuk operasi hashing. hashlib.scrypt melepas GIL, sehingga jumlah worker
+    membatasi CPU yang dipakai hashing tanpa menghentikan thread request lain.
+    Jika pekerjaan yang sedang berjalan + mengantre mencapai batas, submit ditolak seketika (PasswordHashingBusy);
+    hasil yang tidak selesai dalam timeout juga dilaporkan sebagai PasswordHashingBusy.
+    """
+    def __init__(self, workers, max_queue):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._rejected = 0
+        self._timed_out = 0
+        self._completed = 0
+        self._lock = threading.Lock()
+
+    def run(self, function, *args, timeout=None):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHashingBusy("Antrean hashing password penuh")
+        try:
+            future = self._executor.submit(function, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=timeout)
+        except FuturesTimeoutError:
+            # Pekerjaan tetap selesai di pool (slot dilepas saat itu), request tidak menunggu lebih lama
+            with self._lock:
+                self._timed_out += 1
+            raise PasswordHashingBusy("Hashing password melebihi batas waktu")
+
+    def _release(self, _future):
+        self._slots.release()
+        with self._lock:
+            self._completed += 1
+
+    def stats(self):
+        with self._lock:
+            return {"workers": self.workers, "max_queue": self.max_queue, "completed": self._completed, "rejected": self._rejected,
+                    "timed_out": self._timed_out}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
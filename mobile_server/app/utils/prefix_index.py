@@ -0,0 +1,179 @@
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left
+
+# Indeks prefix in-memory berbasis array terurut: setiap entri disimpan dengan beberapa key
+# (awal setiap kata pada nama yang dinormalisasi), pencarian prefix = dua bisect pada array key.
+# Top-K untuk range sembarang dijawab dari sparse table atas blok-blok array key: setiap blok
+# menyimpan K entri terbaiknya, dan level ke-j menyimpan gabungan 2^j blok berurutan, sehingga
+# satu range cukup digabung dari dua run yang saling tumpang-tindih ditambah sisa di kedua tepinya.
+# Objek PrefixIndex tidak diubah setelah dipublikasikan: pembaruan membuat salinan (copy-on-write),
+# sehingga pembacaan dari banyak thread tidak memerlukan lock.
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+_PREFIX_END = '\uffff'
+
+
+def normalize(value):
+    """
+    Menormalkan teks untuk pencocokan: huruf kecil, tanpa aksen, non-alfanumerik menjadi spasi.
+    """
+    if not value:
+        return ''
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(' ', value.lower()).strip()
+
+
+def index_keys(name, max_words):
+    """
+    Key untuk satu nama: teks ternormalisasi mulai dari masing-masing kata (maksimal max_words kata pertama),
+    sehingga "gelang tangan" ditemukan lewat "gel" maupun "tang".
+    """
+    words = normalize(name).split()
+    return list(dict.fromkeys(' '.join(words[position:]) for position in range(min(len(words), max_words))))
+
+
+class PrefixIndex:
+    def __init__(self, max_words=8, max_limit=20, block_size=64):
+        self.max_words = max_words
+        self.max_limit = max_limit
+        self.block_size = block_size
+        self._keys = []
+        self._refs = []
+        # ref -> (skor, nama, payload); ref adalah tuple hashable, misal ('product', 12)
+        self._entries = {}
+        self._ranks = {}
+        self._block_tops = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def refs(self):
+        return self._entries.keys()
+
+    def _copy(self):
+        index = PrefixIndex(self.max_words, self.max_limit, self.block_size)
+        index._keys = list(self._keys)
+        index._refs = list(self._refs)
+        index._entries = dict(self._entries)
+        return index
+
+    def _remove_keys(self, ref):
+        _, name, _ = self._entries[ref]
+        for key in index_keys(name, self.max_words):
+            position = bisect_left(self._keys, key)
+            while position < len(self._keys) and self._keys[position] == key:
+                if self._refs[position] == ref:
+                    del self._keys[position]
+                    del self._refs[position]
+                    break
+                position += 1
+
+    def _insert_keys(self, ref, name):
+        for key in index_keys(name, self.max_words):
+            position = bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+            self._refs.insert(position, ref)
+
+    def _top(self, refs):
+        return heapq.nlargest(self.max_limit, set(refs), key=self._ranks.__getitem__)
+
+    def _finalize(self):
+        """
+        Menghitung kunci urutan per entri (skor, nama terpendek, ref) dan sparse table top-K per blok.
+        """
+        self._ranks = {ref: (score, -len(name), ref) for ref, (score, name, _) in self._entries.items()}
+        size = self.block_size
+        level = [self._top(self._refs[start:start + size]) for start in range(0, len(self._refs), size)]
+        levels = [level]
+        span = 1
+        while span * 2 <= len(level):
+            previous = levels[-1]
+            levels.append([
+                self._top(previous[block] + previous[block + span])
+                for block in range(len(previous) - span)
+            ])
+            span *= 2
+        self._block_tops = levels
+
+    @classmethod
+    def build(cls, entries, **options):
+        """
+        Membangun indeks dari iterable (ref, nama, skor, payload).
+        """
+        index = cls(**options)
+        pairs = []
+        for ref, name, score, payload in entries:
+            index._entries[ref] = (score, name, payload)
+            pairs.extend((key, ref) for key in index_keys(name, index.max_words))
+        pairs.sort()
+        index._keys = [key for key, _ in pairs]
+        index._refs = [ref for _, ref in pairs]
+        index._finalize()
+        return index
+
+    def updated(self, upserts=(), removals=(), scores=None):
+        """
+        Mengembalikan salinan indeks dengan perubahan diterapkan (indeks ini tidak diubah).
+        Args:
+            upserts: iterable (ref, nama, skor atau None untuk mempertahankan skor lama, payload).
+            removals: iterable ref yang dihapus.
+            scores (dict, optional): ref -> skor baru untuk entri yang sudah ada.
+        """
+        index = self._copy()
+        for ref in removals:
+            if ref in index._entries:
+                index._remove_keys(ref)
+                del index._entries[ref]
+        for ref, name, score, payload in upserts:
+            previous = index._entries.get(ref)
+            if score is None:
+                score = previous[0] if previous else 0.0
+            if previous is not None and previous[1] != name:
+                index._remove_keys(ref)
+                index._insert_keys(ref, name)
+            elif previous is None:
+                index._insert_keys(ref, name)
+            index._entries[ref] = (score, name, payload)
+        for ref, score in (scores or {}).items():
+            if ref in index._entries:
+                _, name, payload = index._entries[ref]
+                index._entries[ref] = (score, name, payload)
+        index._finalize()
+        return index
+
+    def _range_candidates(self, start, end):
+        size = self.block_size
+        first_block = -(-start // size)
+        last_block = end // size
+        if last_block - first_block < 1:
+            return self._refs[start:end]
+
+        level = (last_block - first_block).bit_length() - 1
+        tops = self._block_tops[level]
+        return (
+            self._refs[start:first_block * size]
+            + tops[first_block]
+            + tops[last_block - (1 << level)]
+            + self._refs[last_block * size:end]
+        )
+
+    def search(self, query, limit):
+        """
+        Top-`limit` entri yang salah satu key-nya diawali query ternormalisasi,
+        diurutkan berdasarkan skor lalu nama terpendek. Mengembalikan list (ref, nama, payload).
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + _PREFIX_END, start)
+        if limit <= self.max_limit:
+            candidates = self._range_candidates(start, end)
+        else:
+            candidates = self._refs[start:end]
+        refs = heapq.nlargest(limit, set(candidates), key=self._ranks.__getitem__)
+        return [(ref, self._entries[ref][1], self._entries[ref][2]) for ref in refs]
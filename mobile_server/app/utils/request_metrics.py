@@ -0,0 +1,253 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import g, request, has_request_context
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Instrumentasi per request, dipasang di create_app() sebelum blueprint:
+# - SQL: jumlah dan waktu statement lewat event before/after_cursor_execute semua engine (primary dan replica),
+#   dikelompokkan per teks SQL agar pola N+1 terlihat sebagai satu statement dengan count besar
+# - serialisasi: encoding JSON respons dan blok serialization_span() di sekitar loop dump per respons
+#   (bukan per item, agar jalur per baris tetap murah), di luar waktu SQL-nya
+# - handler: sisa waktu request (total - SQL - serialisasi)
+# Hasilnya: header Server-Timing, log request lambat dengan statement teratas, dan histogram latensi per route
+# di proses ini (GET /api/users/request-metrics). Statement di luar request (job, thread latar) tidak dihitung.
+
+_registry = None
+_listeners_installed = False
+_install_lock = threading.Lock()
+
+
+class RequestMetrics:
+    """
+    Pengukuran satu request, disimpan di g.request_metrics.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.statements = {}
+        self.serialize_ms = 0.0
+        self.serializing = False
+
+    def record_statement(self, statement, elapsed_ms):
+        self.sql_count += 1
+        self.sql_ms += elapsed_ms
+        entry = self.statements.get(statement)
+        if entry is None:
+            self.statements[statement] = [1, elapsed_ms]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed_ms
+
+    def top_statements(self, limit):
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {"sql": " ".join(statement.split())[:300], "count": count, "ms": round(elapsed_ms, 1)}
+            for statement, (count, elapsed_ms) in ranked
+        ]
+
+
+def _current():
+    if not has_request_context():
+        return None
+    return g.get('request_metrics')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current() is not None:
+        context._request_metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_request_metrics_started', None)
+    if started is None:
+        return
+    metrics = _current()
+    if metrics is not None:
+        metrics.record_statement(statement, (time.perf_counter() - started) * 1000)
+
+
+def _install_sql_listeners():
+    global _listeners_installed
+    with _install_lock:
+        if _listeners_installed:
+            return
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listeners_installed = True
+
+
+@contextmanager
+def serialization_span():
+    """
+    Mengukur blok sebagai waktu serialisasi request ini. Span bersarang hanya dihitung sekali (yang terluar),
+    dan query yang dipicu di dalamnya (lazy load) tetap dihitung sebagai waktu SQL.
+    """
+    metrics = _current()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    started = time.perf_counter()
+    sql_before = metrics.sql_ms
+    try:
+        yield
+    finally:
+        metrics.serializing = False
+        metrics.serialize_ms += (time.perf_counter() - started) * 1000 - (metrics.sql_ms - sql_before)
+
+
+def timed_serialization(function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        with serialization_span():
+            return function(*args, **kwargs)
+    return wrapper
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """
+    Provider JSON default Flask yang mencatat waktu encoding (jsonify) sebagai serialisasi.
+    """
+    def dumps(self, obj, **kwargs):
+        with serialization_span():
+            return super().dumps(obj, **kwargs)
+
+
+class LatencyHistogram:
+    """
+    Histogram latensi dengan batas bucket tetap (ms); bucket terakhir untuk nilai di atas batas tertinggi.
+    """
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.errors = 0
+
+    def observe(self, elapsed_ms, sql_count, sql_ms, status_code):
+        self.buckets[bisect.bisect_left(self.bounds, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.sql_count += sql_count
+        self.sql_ms += sql_ms
+        if status_code >= 500:
+            self.errors += 1
+
+    def quantile(self, q):
+        """
+        Estimasi kuantil: batas atas bucket tempat kuantil jatuh (maksimum teramati untuk bucket terakhir).
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.buckets):
+            cumulative += bucket_count
+            if cumulative >= rank and bucket_count:
+                upper = min(self.bounds[index], self.max_ms) if index < len(self.bounds) else self.max_ms
+                return round(upper, 1)
+        return round(self.max_ms, 1)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 1),
+            "avg_sql_count": round(self.sql_count / self.count, 1) if self.count else None,
+            "avg_sql_ms": round(self.sql_ms / self.count, 1) if self.count else None,
+            # [batas atas ms, jumlah] per bucket (tidak kumulatif); batas None = di atas batas tertinggi
+            "buckets": [[bound, count] for bound, count in zip(self.bounds + (None,), self.buckets)],
+        }
+
+
+class RouteMetricsRegistry:
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self._routes = {}
+        self._lock = threading.Lock()
+        self.since = datetime.now(timezone.utc)
+
+    def observe(self, route, elapsed_ms, metrics, status_code):
+        with self._lock:
+            histogram = self._routes.get(route)
+            if histogram is None:
+                histogram = self._routes[route] = LatencyHistogram(self.bounds)
+            histogram.observe(elapsed_ms, metrics.sql_count, metrics.sql_ms, status_code)
+
+    def snapshot(self):
+        with self._lock:
+            routes = {route: histogram.as_dict() for route, histogram in sorted(self._routes.items())}
+        return {"pid": os.getpid(), "since": self.since.isoformat(), "routes": routes}
+
+
+def request_metrics_snapshot():
+    """
+    Histogram latensi per route proses ini (setiap worker gunicorn punya histogramnya sendiri).
+    """
+    if _registry is None:
+        return {"pid": os.getpid(), "enabled": False, "routes": {}}
+    return {"enabled": True, **_registry.snapshot()}
+
+
+def init_request_metrics(app):
+    global _registry
+    if not app.config.get('REQUEST_METRICS_ENABLED', True):
+        return
+    _install_sql_listeners()
+    _registry = RouteMetricsRegistry(app.config['REQUEST_LATENCY_BUCKETS_MS'])
+    app.json = TimedJSONProvider(app)
+
+    server_timing = app.config.get('REQUEST_SERVER_TIMING', True)
+    slow_ms = app.config['REQUEST_SLOW_MS']
+    top_statements = app.config['REQUEST_SLOW_TOP_STATEMENTS']
+
+    # Didaftarkan sebelum hook lain: before_request berjalan pertama, after_request (urutan terbalik) terakhir
+    @app.before_request
+    def _start_request_metrics():
+        g.request_metrics = RequestMetrics()
+
+    @app.after_request
+    def _finish_request_metrics(response):
+        metrics = g.pop('request_metrics', None)
+        if metrics is None:
+            return response
+        total_ms = (time.perf_counter() - metrics.started) * 1000
+        handler_ms = max(total_ms - metrics.sql_ms - metrics.serialize_ms, 0.0)
+        route = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+        _registry.observe(route, total_ms, metrics, response.status_code)
+
+        if server_timing:
+            response.headers['Server-Timing'] = (
+                f'db;dur={metrics.sql_ms:.1f};desc="{metrics.sql_count} queries", '
+                f'serialize;dur={metrics.serialize_ms:.1f}, handler;dur={handler_ms:.1f}, total;dur={total_ms:.1f}'
+            )
+
+        if total_ms >= slow_ms:
+            logger.warning(
+                f"Request lambat {route} ({response.status_code}): {total_ms:.0f} ms, "
+                f"{metrics.sql_count} query {metrics.sql_ms:.0f} ms, serialisasi {metrics.serialize_ms:.0f} ms, "
+                f"handler {handler_ms:.0f} ms. Statement teratas: {metrics.top_statements(top_statements)}"
+            )
+        return response
+
+    logger.info(f"Instrumentasi request aktif (request lambat >= {slow_ms} ms).")
@@ -0,0 +1,96 @@
+import numpy as np
+from scipy import sparse
+
+# Kemiripan item-item dari co-view (user yang melihat kedua produk), dihitung tervektorisasi
+# dengan matriks sparse user x produk. Modul ini hanya dipakai job offline (numpy/scipy diimpor
+# oleh pemanggil secara lazy), tidak diimpor saat aplikasi web berjalan.
+
+
+def build_view_matrix(user_ids, product_ids, max_items_per_user=None):
+    """
+    Matriks biner CSR user x produk dari pasangan (user_id, product_id) (duplikat boleh).
+    User dengan lebih dari max_items_per_user produk (bot/crawler) dibuang karena kontribusinya
+    ke co-occurrence kuadratik dan tidak informatif.
+    Returns:
+        (matriks CSR, array product_id per kolom)
+    """
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    product_ids = np.asarray(product_ids, dtype=np.int64)
+    _, user_index = np.unique(user_ids, return_inverse=True)
+    products, product_index = np.unique(product_ids, return_inverse=True)
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(user_index), dtype=np.float32), (user_index, product_index)),
+        shape=(int(user_index.max()) + 1 if len(user_index) else 0, len(products))
+    )
+    matrix.sum_duplicates()
+    matrix.data[:] = 1.0
+
+    if max_items_per_user:
+        items_per_user = np.diff(matrix.indptr)
+        keep = items_per_user <= max_items_per_user
+        if not keep.all():
+            matrix = matrix[keep]
+    return matrix, products
+
+
+def top_k_neighbors(matrix, k, min_coviews=1, block_size=2000):
+    """
+    Top-k produk terdekat per kolom matriks user x produk berdasarkan cosine similarity co-view:
+    coviews(i, j) / sqrt(views(i) * views(j)). Dihitung per blok produk agar memori tetap terbatas.
+    Returns:
+        (rows, neighbors, scores): array sejajar berisi indeks kolom produk, indeks kolom tetangga,
+        dan skor, terurut per produk lalu skor menurun.
+    """
+    item_user = matrix.T.tocsr()
+    views = np.asarray(item_user.sum(axis=1)).ravel()
+    norms = np.sqrt(np.maximum(views, 1.0)).astype(np.float32)
+    product_count = item_user.shape[0]
+
+    rows_out, neighbors_out, scores_out = [], [], []
+    for start in range(0, product_count, block_size):
+        end = min(start + block_size, product_count)
+        coviews = (item_user[start:end] @ matrix).tocoo()
+
+        row = coviews.row
+        col = coviews.col
+        counts = coviews.data
+        keep = (row + start != col) & (counts >= min_coviews)
+        row, col, counts = row[keep], col[keep], counts[keep]
+        if not len(row):
+            continue
+
+        scores = counts / (norms[row + start] * norms[col])
+        # Urutkan per produk lalu skor menurun (tie: id tetangga naik), ambil k pertama per produk
+        order = np.lexsort((col, -scores, row))
+        row, col, scores = row[order], col[order], scores[order]
+        first = np.searchsorted(row, row, side='left')
+        rank = np.arange(len(row)) - first
+        keep = rank < k
+
+        rows_out.append(row[keep] + start)
+        neighbors_out.append(col[keep])
+        scores_out.append(scores[keep].astype(np.float32))
+
+    if not rows_out:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=np.float32)
+    return np.concatenate(rows_out), np.concatenate(neighbors_out), np.concatenate(scores_out)
+
+
+def group_neighbors(products, rows, neighbors, scores):
+    """
+    Mengelompokkan hasil top_k_neighbors menjadi (product_id, [neighbor_id], [skor]) per produk.
+    """
+    if not len(rows):
+        return
+    boundaries = np.flatnonzero(np.diff(rows)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(rows)]))
+    neighbor_ids = products[neighbors]
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        yield (
+            int(products[rows[start]]),
+            neighbor_ids[start:end].tolist(),
+            [round(score, 6) for score in scores[start:end].tolist()],
+        )
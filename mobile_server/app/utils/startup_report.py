@@ -0,0 +1,72 @@
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Laporan biaya startup app factory: waktu import dan pertambahan RSS per langkah (model, setiap blueprint).
+# Modul yang sudah dimuat langkah sebelumnya tidak dihitung lagi, jadi angka per blueprint adalah biaya tambahannya.
+
+# Library berat yang seharusnya tidak dimuat oleh worker API (hanya crawler/import yang memakainya)
+HEAVY_MODULES = ('selenium', 'bs4', 'requests', 'pandas', 'numpy')
+
+
+def current_rss_bytes():
+    """
+    RSS proses saat ini dari /proc/self/statm; di luar Linux memakai puncak RSS dari getrusage.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class StartupReport:
+    def __init__(self):
+        self.steps = []
+        self._started = time.perf_counter()
+        self._start_rss = current_rss_bytes()
+
+    @contextmanager
+    def measure(self, name):
+        modules_before = len(sys.modules)
+        rss_before = current_rss_bytes()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append({
+                "name": name,
+                "import_ms": round((time.perf_counter() - started) * 1000, 1),
+                "rss_delta_kb": (current_rss_bytes() - rss_before) // 1024,
+                "modules_loaded": len(sys.modules) - modules_before,
+            })
+
+    def finish(self):
+        self.total_ms = round((time.perf_counter() - self._started) * 1000, 1)
+        self.rss_kb = current_rss_bytes() // 1024
+        self.rss_delta_kb = self.rss_kb - self._start_rss // 1024
+        return self
+
+    def as_dict(self):
+        return {
+            "total_ms": self.total_ms,
+            "rss_kb": self.rss_kb,
+            "rss_delta_kb": self.rss_delta_kb,
+            "heavy_modules_loaded": sorted(name for name in HEAVY_MODULES if name in sys.modules),
+            "steps": self.steps,
+        }
+
+    def log(self):
+        for step in self.steps:
+            logger.debug(f"Startup {step['name']}: {step['import_ms']} ms, +{step['rss_delta_kb']} KB RSS, {step['modules_loaded']} modul")
+        heavy = self.as_dict()["heavy_modules_loaded"]
+        logger.info(
+            f"App siap dalam {self.total_ms} ms (RSS {self.rss_kb // 1024} MB, +{self.rss_delta_kb // 1024} MB). "
+            f"Library berat termuat: {', '.join(heavy) if heavy else 'tidak ada'}."
+        )
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Cache in-process berukuran terbatas (LRU) dengan masa berlaku per entri.
+# Nilai None disimpan sebagai hasil negatif (misal token tidak valid) dan dihitung terpisah di statistik.
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, maxsize, ttl, negative_ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self._data = OrderedDict()  # key -> (expires_at monotonic, value)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def get(self, key, default=_MISSING):
+        """
+        Mengembalikan nilai yang masih berlaku, atau default (sentinel internal jika tidak diberikan)
+        jika tidak ada/kadaluwarsa. Gunakan `is_missing()` untuk membedakan miss dari hasil negatif (None).
+        """
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._misses += 1
+                return default
+            expires_at, value = item
+            if expires_at <= now:
+                del self._data[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            if value is None:
+                self._negative_hits += 1
+            else:
+                self._hits += 1
+            return value
+
+    @staticmethod
+    def is_missing(value):
+        return value is _MISSING
+
+    def set(self, key, value, ttl=None):
+        """
+        Menyimpan nilai. ttl default: self.ttl untuk nilai biasa, self.negative_ttl untuk None.
+        """
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0:
+            return
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self._invalidations += 1
+
+    def delete_where(self, predicate):
+        """
+        Menghapus semua entri yang predicate(key, value)-nya True. O(n), untuk invalidasi yang jarang.
+        """
+        with self._lock:
+            keys = [key for key, (_, value) in self._data.items() if predicate(key, value)]
+            for key in keys:
+                del self._data[key]
+            self._invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._negative_hits + self._misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self._hits,
+                "negative_hits": self._negative_hits,
+                "misses": self._misses,
+                "hit_ratio": round((self._hits + self._negative_hits) / lookups, 4) if lookups else None,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
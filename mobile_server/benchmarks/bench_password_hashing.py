@@ -0,0 +1,113 @@
+"""
+Benchmark hashing password saat lonjakan login (app/utils/password_hashing.py).
+
+Membandingkan dua mode dengan beban yang sama:
+- langsung: setiap thread request menghitung scrypt sendiri (jumlah hashing paralel tidak dibatasi)
+- pool: hashing lewat HashingPool (worker terbatas, antrean terbatas, kelebihan ditolak cepat)
+
+Selama lonjakan, satu thread "API" terus menjalankan pekerjaan request biasa (serialisasi JSON)
+untuk mengukur dampak hashing terhadap latensi endpoint lain. Tidak membutuhkan database.
+
+Cara pakai:
+    python benchmarks/bench_password_hashing.py [jumlah_login_bersamaan] [worker_pool] [antrean_pool]
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.password_hashing import ScryptHasher, PasswordHasher, HashingPool, PasswordHashingBusy
+
+CONCURRENT_LOGINS = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+POOL_WORKERS = int(sys.argv[2]) if len(sys.argv) > 2 else max(1, os.cpu_count() or 1)
+POOL_QUEUE = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+PAYLOAD = [{"id": i, "name": f"Produk {i}", "price": i * 1000.0, "tags": ["a", "b", "c"]} for i in range(200)]
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def api_worker(stop, latencies):
+    # Latensi dihitung dari saat request "datang" (setelah jeda 2 ms) sampai selesai, termasuk waktu
+    # menunggu CPU, karena thread yang bangun harus bersaing dengan thread hashing
+    interval = 0.002
+    arrival = time.perf_counter() + interval
+    while not stop.is_set():
+        time.sleep(max(0.0, arrival - time.perf_counter()))
+        json.dumps(PAYLOAD)
+        finished = time.perf_counter()
+        latencies.append(finished - arrival)
+        arrival = max(arrival + interval, finished)
+
+
+def run(mode, hasher, stored_hash):
+    pool = HashingPool(POOL_WORKERS, POOL_QUEUE) if mode == 'pool' else None
+    login_latencies, rejected_latencies, api_latencies = [], [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(CONCURRENT_LOGINS)
+
+    def login():
+        barrier.wait()
+        started = time.perf_counter()
+        try:
+            if pool:
+                ok, _ = pool.run(hasher.verify, 'rahasia123', stored_hash)
+            else:
+                ok, _ = hasher.verify('rahasia123', stored_hash)
+            assert ok
+            with lock:
+                login_latencies.append(time.perf_counter() - started)
+        except PasswordHashingBusy:
+            with lock:
+                rejected_latencies.append(time.perf_counter() - started)
+
+    stop = threading.Event()
+    api_thread = threading.Thread(target=api_worker, args=(stop, api_latencies))
+    api_thread.start()
+    time.sleep(0.2)
+    api_latencies.clear()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=login) for _ in range(CONCURRENT_LOGINS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    api_thread.join()
+    if pool:
+        pool.shutdown()
+
+    print(f"[{mode}] selesai dalam {elapsed:.2f} s")
+    print(f"  login berhasil: {len(login_latencies)}, p50 {percentile(login_latencies, 50) * 1000:.0f} ms, "
+          f"p99 {percentile(login_latencies, 99) * 1000:.0f} ms")
+    if rejected_latencies:
+        print(f"  ditolak (503): {len(rejected_latencies)}, p99 {percentile(rejected_latencies, 99) * 1000:.2f} ms")
+    print(f"  API selama lonjakan: {len(api_latencies)} request, p50 {percentile(api_latencies, 50) * 1000:.2f} ms, "
+          f"p99 {percentile(api_latencies, 99) * 1000:.2f} ms")
+
+
+def main():
+    hasher = PasswordHasher([ScryptHasher()])
+    stored_hash = hasher.hash('rahasia123')
+
+    single = time.perf_counter()
+    hasher.verify('rahasia123', stored_hash)
+    print(f"Satu verifikasi scrypt: {(time.perf_counter() - single) * 1000:.0f} ms, CPU: {os.cpu_count()}")
+    print(f"Login bersamaan: {CONCURRENT_LOGINS}, pool: {POOL_WORKERS} worker + antrean {POOL_QUEUE}")
+
+    run('langsung', hasher, stored_hash)
+    run('pool', hasher, stored_hash)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark serialisasi produk: ProductSchema (marshmallow) vs serializer cepat di
+app/schemas/product_serializer.py. Sebelum mengukur, script ini memeriksa paritas
+JSON kedua jalur dan berhenti dengan error jika ada perbedaan.
+
+Tidak membutuhkan database: objek Product dibuat transient di memori.
+
+Cara pakai:
+    python benchmarks/bench_product_serializer.py [jumlah_item] [ulangan]
+"""
+import os
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from app.models.product import Product, Category, Brand, ProductImage, Inventory
+from app.schemas.product_schema import products_schema
+from app.schemas.product_serializer import PRODUCT_ROW_COLUMNS, dump_products, dump_product_row
+
+ProductRow = namedtuple('ProductRow', [column.key for column in PRODUCT_ROW_COLUMNS])
+ImageRow = namedtuple('ImageRow', ['product_id', 'id', 'image_url', 'is_main'])
+
+
+def build_products(count):
+    now = datetime.now(timezone.utc)
+    categories = [Category(id=i, name=f"Kategori {i}", description=None if i % 2 else f"Deskripsi {i}") for i in range(1, 6)]
+    brands = [Brand(id=i, name=f"Toko {i}", description=None) for i in range(1, 21)]
+    products = []
+    for i in range(1, count + 1):
+        product = Product(
+            id=i,
+            name=f"Gelang Tangan Model {i}",
+            description=f"Deskripsi produk {i}" if i % 3 else None,
+            price=Decimal(f"{10000 + i * 250}.00"),
+            source_url=f"https://www.jakmall.com/produk-{i}",
+            created_at=now - timedelta(minutes=i),
+            updated_at=now if i % 2 else None,
+        )
+        if i % 7:
+            product.category = categories[i % len(categories)]
+            product.category_id = product.category.id
+        product.brand = brands[i % len(brands)]
+        product.brand_id = product.brand.id
+        product.images = [
+            ProductImage(id=i * 10 + n, image_url=f"https://cdn.jakmall.com/{i}/{n}.jpg", is_main=(n == 0))
+            for n in range(i % 3)
+        ]
+        if i % 5:
+            product.inventory = Inventory(quantity=i % 100)
+        products.append(product)
+    return products
+
+
+def to_row(product):
+    return ProductRow(
+        id=product.id, name=product.name, description=product.description, price=product.price,
+        source_url=product.source_url, category_id=product.category_id, brand_id=product.brand_id,
+        created_at=product.created_at, updated_at=product.updated_at,
+        category_name=product.category.name if product.category else None,
+        category_description=product.category.description if product.category else None,
+        brand_name=product.brand.name if product.brand else None,
+        brand_description=product.brand.description if product.brand else None,
+        stock=product.inventory.quantity if product.inventory else None,
+    )
+
+
+def check_parity(products, rows, images):
+    json_provider = Flask(__name__).json
+    expected = json_provider.dumps(products_schema.dump(products))
+    from_objects = json_provider.dumps(dump_products(products))
+    from_rows = json_provider.dumps([dump_product_row(row, images[row.id]) for row in rows])
+    if expected != from_objects:
+        raise SystemExit("Paritas GAGAL: dump_products() berbeda dengan ProductSchema.")
+    if expected != from_rows:
+        raise SystemExit("Paritas GAGAL: dump_product_row() berbeda dengan ProductSchema.")
+    print(f"Paritas OK untuk {len(products)} produk.")
+
+
+def measure(label, fn, item_count, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    per_item_us = best / item_count * 1e6
+    print(f"{label:<32} {best * 1000:9.2f} ms/halaman  {per_item_us:8.2f} us/item")
+    return per_item_us
+
+
+if __name__ == '__main__':
+    item_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    products = build_products(item_count)
+    rows = [to_row(product) for product in products]
+    images = {
+        product.id: [ImageRow(product.id, image.id, image.image_url, image.is_main) for image in product.images]
+        for product in products
+    }
+
+    check_parity(products, rows, images)
+
+    baseline = measure("ProductSchema(many=True).dump", lambda: products_schema.dump(products), item_count, repeat)
+    fast = measure("dump_products (objek ORM)", lambda: dump_products(products), item_count, repeat)
+    fast_rows = measure("dump_product_row (row kolom)", lambda: [dump_product_row(row, images[row.id]) for row in rows], item_count, repeat)
+
+    print(f"Percepatan objek ORM: {baseline / fast:.1f}x, row kolom: {baseline / fast_rows:.1f}x")
@@ -0,0 +1,65 @@
+"""
+Benchmark perhitungan rekomendasi co-view (app/utils/similarity.py) pada event sintetis:
+popularitas produk mengikuti distribusi Zipf dan user melihat produk dalam "cluster" kategori,
+sehingga hasilnya bisa dicek (tetangga terbaik sebagian besar berasal dari cluster yang sama).
+
+Tidak membutuhkan database; mengukur waktu membangun matriks dan menghitung top-K.
+
+Cara pakai:
+    python benchmarks/bench_recommendations.py [jumlah_event] [jumlah_user] [jumlah_produk]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from app.utils.similarity import build_view_matrix, top_k_neighbors, group_neighbors
+
+EVENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000000
+USERS = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+PRODUCTS = int(sys.argv[3]) if len(sys.argv) > 3 else 50000
+CLUSTERS = 100
+TOP_K = 20
+
+
+def generate_events(rng):
+    cluster_size = PRODUCTS // CLUSTERS
+    user_cluster = rng.integers(0, CLUSTERS, size=USERS)
+    users = rng.integers(0, USERS, size=EVENTS)
+    # 80% view di cluster milik user, sisanya acak; posisi di dalam cluster mengikuti Zipf
+    in_cluster = rng.random(EVENTS) < 0.8
+    offset = np.minimum(rng.zipf(1.3, size=EVENTS) - 1, cluster_size - 1)
+    clustered = user_cluster[users] * cluster_size + offset
+    random_products = rng.integers(0, PRODUCTS, size=EVENTS)
+    products = np.where(in_cluster, clustered, random_products)
+    return users + 1, products + 1, cluster_size
+
+
+def main():
+    rng = np.random.default_rng(7)
+    user_ids, product_ids, cluster_size = generate_events(rng)
+    print(f"Event: {EVENTS}, user: {USERS}, produk: {PRODUCTS}")
+
+    started = time.perf_counter()
+    matrix, products = build_view_matrix(user_ids, product_ids, max_items_per_user=500)
+    built = time.perf_counter()
+    rows, neighbors, scores = top_k_neighbors(matrix, k=TOP_K, min_coviews=2)
+    computed = time.perf_counter()
+    grouped = list(group_neighbors(products, rows, neighbors, scores))
+    finished = time.perf_counter()
+
+    print(f"Matriks: {matrix.shape[0]} x {matrix.shape[1]}, nnz {matrix.nnz}, dibangun dalam {built - started:.2f} s")
+    print(f"Top-{TOP_K}: {len(rows)} pasangan untuk {len(grouped)} produk dalam {computed - built:.2f} s")
+    print(f"Pengelompokan hasil: {finished - computed:.2f} s")
+
+    same_cluster = sum(
+        ((product_id - 1) // cluster_size) == ((neighbor_ids[0] - 1) // cluster_size)
+        for product_id, neighbor_ids, _ in grouped
+    )
+    print(f"Tetangga teratas dari cluster yang sama: {same_cluster / max(len(grouped), 1):.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark kontensi reservasi stok: banyak thread mereservasi SKU yang sama secara bersamaan.
+Memeriksa bahwa tidak terjadi overselling (reservasi berhasil == stok awal, stok akhir 0),
+lalu melaporkan throughput dan latensi p50/p99 per reservasi.
+
+Membutuhkan database PostgreSQL (DATABASE_URL) dengan skema server.sql.
+Script ini membuat user, kategori, merek, dan produk uji sendiri lalu menghapusnya kembali.
+Jumlah thread dibatasi max_connections PostgreSQL (satu koneksi per thread).
+
+Cara pakai:
+    python benchmarks/bench_reservations.py [jumlah_thread] [stok] [percobaan_per_thread]
+"""
+import os
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import Config
+
+THREADS = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+STOCK = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+ATTEMPTS_PER_THREAD = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+# Satu koneksi per thread agar kontensi terjadi di baris inventory, bukan di pool koneksi.
+Config.SQLALCHEMY_ENGINE_OPTIONS = {"pool_size": THREADS, "max_overflow": 0, "pool_timeout": 60}
+
+from sqlalchemy import text
+from app import create_app, db
+from app.models.user import User
+from app.models.product import Product, Category, Brand, Inventory
+from app.models.order import StockReservation
+from app.services.reservation_service import ReservationService
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def setup(suffix):
+    user = User(email=f"bench-{suffix}@example.com", password_hash='-', name='Bench')
+    category = Category(name=f"Bench {suffix}")
+    brand = Brand(name=f"Bench {suffix}")
+    db.session.add_all([user, category, brand])
+    db.session.flush()
+    product = Product(
+        name=f"Produk Flash Sale {suffix}", price=10000, source_url=f"bench://{suffix}",
+        category_id=category.id, brand_id=brand.id
+    )
+    db.session.add(product)
+    db.session.flush()
+    db.session.add(Inventory(product_id=product.id, quantity=STOCK))
+    db.session.commit()
+    return user.id, product.id, category.id, brand.id
+
+
+def teardown(user_id, product_id, category_id, brand_id):
+    db.session.execute(text("DELETE FROM stock_reservations WHERE product_id = :p"), {"p": product_id})
+    db.session.execute(text("DELETE FROM products WHERE id = :p"), {"p": product_id})
+    db.session.execute(text("DELETE FROM categories WHERE id = :c"), {"c": category_id})
+    db.session.execute(text("DELETE FROM brands WHERE id = :b"), {"b": brand_id})
+    db.session.execute(text("DELETE FROM users WHERE id = :u"), {"u": user_id})
+    db.session.commit()
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        user_id, product_id, category_id, brand_id = setup(uuid.uuid4().hex[:8])
+
+    latencies = []
+    successes = []
+    failures = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(THREADS)
+
+    def worker():
+        local_latencies, local_successes, local_failures = [], 0, 0
+        with app.app_context():
+            barrier.wait()
+            for _ in range(ATTEMPTS_PER_THREAD):
+                started = time.perf_counter()
+                reservation, _ = ReservationService.reserve_stock(user_id, product_id, 1)
+                local_latencies.append(time.perf_counter() - started)
+                if reservation:
+                    local_successes += 1
+                else:
+                    local_failures += 1
+            db.session.remove()
+        with lock:
+            latencies.extend(local_latencies)
+            successes.append(local_successes)
+            failures.append(local_failures)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        final_quantity = db.session.execute(
+            db.select(Inventory.quantity).where(Inventory.product_id == product_id)
+        ).scalar()
+        reserved_rows = db.session.execute(
+            db.select(db.func.count()).select_from(StockReservation).where(StockReservation.product_id == product_id)
+        ).scalar()
+        teardown(user_id, product_id, category_id, brand_id)
+
+    total_success = sum(successes)
+    attempts = THREADS * ATTEMPTS_PER_THREAD
+    print(f"Thread: {THREADS}, percobaan: {attempts}, stok awal: {STOCK}")
+    print(f"Berhasil: {total_success}, ditolak (stok habis): {sum(failures)}, baris reservasi: {reserved_rows}")
+    print(f"Stok akhir: {final_quantity}")
+    print(f"Durasi: {elapsed:.2f} s, throughput: {attempts / elapsed:.0f} reservasi/s")
+    print(f"Latensi p50: {percentile(latencies, 0.50) * 1000:.2f} ms, p99: {percentile(latencies, 0.99) * 1000:.2f} ms")
+
+    expected = min(STOCK, attempts)
+    if total_success != expected or reserved_rows != expected or final_quantity != STOCK - expected:
+        print("GAGAL: jumlah reservasi tidak sesuai stok (overselling atau stok hilang).")
+        sys.exit(1)
+    print("OK: tidak ada overselling.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark indeks typeahead (app/utils/prefix_index.py) pada katalog sintetis:
+waktu build, waktu pembaruan inkremental, dan latensi pencarian p50/p99 per panjang prefix.
+
+Tidak membutuhkan database.
+
+Cara pakai:
+    python benchmarks/bench_typeahead.py [jumlah_produk] [jumlah_query]
+"""
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.prefix_index import PrefixIndex
+
+PRODUCTS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+QUERIES = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+WORDS = [
+    "gelang", "kalung", "cincin", "anting", "jam", "tangan", "tas", "dompet", "kacamata", "topi",
+    "emas", "perak", "titanium", "kulit", "kayu", "wanita", "pria", "anak", "couple", "korea",
+    "premium", "murah", "elegan", "vintage", "minimalis", "hitam", "putih", "rose", "gold", "silver",
+]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def main():
+    rng = random.Random(42)
+    entries = []
+    for product_id in range(1, PRODUCTS + 1):
+        name = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))) + f" {product_id}"
+        entries.append((('product', product_id), name, math.log1p(rng.paretovariate(1.5)), None))
+    for brand_id in range(1, 501):
+        entries.append((('brand', brand_id), f"Toko {rng.choice(WORDS)} {brand_id}", rng.random() * 5, None))
+
+    started = time.perf_counter()
+    index = PrefixIndex.build(entries)
+    print(f"Build: {len(index)} entri dalam {time.perf_counter() - started:.2f} s")
+
+    started = time.perf_counter()
+    upserts = [(('product', product_id), f"kalung baru {product_id}", None, None) for product_id in range(1, 101)]
+    index = index.updated(upserts=upserts, removals=[('product', PRODUCTS)])
+    print(f"Pembaruan inkremental (100 produk): {time.perf_counter() - started:.2f} s")
+
+    for length in (1, 2, 3, 5, 8):
+        queries = []
+        for _ in range(QUERIES):
+            word = rng.choice(WORDS) + ' ' + rng.choice(WORDS)
+            queries.append(word[:length])
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query, 8)
+            latencies.append(time.perf_counter() - started)
+        print(f"Prefix {length} karakter: p50 {percentile(latencies, 0.5) * 1e6:.1f} µs, "
+              f"p99 {percentile(latencies, 0.99) * 1e6:.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Membandingkan dua hasil benchmarks/run_benchmarks.py (baseline vs hasil baru) per skenario.
+
+Skenario dianggap regresi jika metrik naik lebih dari --threshold persen dan selisihnya lebih dari
+--min-delta-ms (agar fluktuasi kecil pada skenario yang sangat cepat tidak dihitung), atau jika rata-rata
+jumlah query SQL bertambah. Exit code 1 jika ada regresi, sehingga bisa dipakai di CI.
+
+Cara pakai:
+    python benchmarks/compare_results.py baseline.json hasil.json [--metric p95_ms] [--threshold 10] [--min-delta-ms 0.5]
+"""
+import argparse
+import json
+import sys
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Membandingkan dua file hasil benchmark.")
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--metric', default='p95_ms', help="Metrik latensi yang dibandingkan. Default p95_ms.")
+    parser.add_argument('--threshold', type=float, default=10.0, help="Kenaikan (persen) yang dianggap regresi. Default 10.")
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help="Selisih minimum (ms) untuk regresi. Default 0.5.")
+    return parser.parse_args()
+
+
+def load(path):
+    with open(path, encoding='utf-8') as result_file:
+        return json.load(result_file)
+
+
+def main():
+    args = parse_args()
+    baseline, current = load(args.baseline), load(args.current)
+
+    # Aktivitas dan sesi bertambah oleh benchmark itu sendiri; ukuran katalog dan jumlah user yang menentukan
+    checks = [(key, baseline['meta'].get(key), current['meta'].get(key)) for key in ('iterations', 'cpu_count', 'postgres')]
+    checks += [(f"dataset.{key}", baseline['meta']['dataset'].get(key), current['meta']['dataset'].get(key))
+               for key in ('products', 'users')]
+    for key, old_value, new_value in checks:
+        if old_value != new_value:
+            print(f"Peringatan: {key} berbeda ({old_value} vs {new_value}); hasil mungkin tidak sebanding.")
+    print(f"Baseline {baseline['meta'].get('git_commit')} ({baseline['meta']['started_at']}) vs "
+          f"{current['meta'].get('git_commit')} ({current['meta']['started_at']}), metrik {args.metric}\n")
+
+    print(f"{'skenario':32s} {'baseline':>10s} {'baru':>10s} {'delta':>8s}  {'sql':>11s}")
+    regressions = []
+    for name in sorted(set(baseline['results']) | set(current['results'])):
+        old, new = baseline['results'].get(name), current['results'].get(name)
+        if old is None or new is None:
+            print(f"{name:32s} {'(hanya di ' + ('baseline' if new is None else 'hasil baru') + ')':>32s}")
+            continue
+        old_value, new_value = old[args.metric], new[args.metric]
+        change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+        old_sql, new_sql = old.get('avg_sql_count'), new.get('avg_sql_count')
+        sql_text = f"{old_sql}->{new_sql}" if old_sql is not None and new_sql is not None else '-'
+
+        status = ''
+        if change > args.threshold and new_value - old_value > args.min_delta_ms:
+            status = 'REGRESI'
+        elif old_sql is not None and new_sql is not None and new_sql > old_sql + 0.5:
+            status = 'REGRESI (query)'
+        elif change < -args.threshold and old_value - new_value > args.min_delta_ms:
+            status = 'lebih cepat'
+        if status.startswith('REGRESI'):
+            regressions.append(name)
+        print(f"{name:32s} {old_value:10.2f} {new_value:10.2f} {change:+7.1f}%  {sql_text:>11s}  {status}")
+
+    if regressions:
+        print(f"\n{len(regressions)} skenario regresi: {', '.join(regressions)}")
+        return 1
+    print("\nTidak ada regresi.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
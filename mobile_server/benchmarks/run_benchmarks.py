@@ -0,0 +1,390 @@
+"""
+Suite benchmark berulang untuk endpoint dan pipeline utama, terhadap database yang diisi
+benchmarks/seed_synthetic.py. Semua request lewat test client Flask di proses ini (tanpa jaringan);
+crawl memakai fixture HTML (benchmarks/fixtures/jakmall_search.html), bukan Selenium.
+
+Skenario:
+- list_products.*: halaman default, filter kategori + rentang harga, pencarian, sort multi-kolom, halaman dalam
+- product_detail: GET /api/products/<id>, produk dipilih dengan popularitas Zipf
+- activity_feed: GET /api/users/activities untuk user dengan aktivitas terbanyak
+- auth.token_cached / auth.token_uncached: verifikasi token (GET /api/users/profile) dengan/tanpa cache token
+- auth.login: POST /api/auth/login (scrypt)
+- csv_import: import_products_from_csv.py untuk CSV sintetis (baris/detik)
+- crawl.parse, crawl.ingest_new, crawl.ingest_existing: parse fixture dan ingest ke staging/katalog per halaman
+Produk/merek yang dibuat csv_import dan crawl dihapus kembali setelah skenarionya.
+
+Hasil ditulis sebagai JSON (metadata dataset + statistik latensi dan jumlah query per skenario);
+bandingkan dua hasil dengan benchmarks/compare_results.py.
+
+Cara pakai:
+    python benchmarks/seed_synthetic.py --products 100000 --reset
+    python benchmarks/run_benchmarks.py [--iterations 200] [--only list_products,auth] [--output hasil.json]
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import Config
+
+# Tanpa log request lambat dan indeks typeahead: yang diukur hanya jalur request itu sendiri
+Config.REQUEST_SLOW_MS = 10 ** 9
+Config.TYPEAHEAD_BUILD_ON_STARTUP = False
+
+from sqlalchemy import text
+from app import create_app, db
+from seed_synthetic import BENCH_PASSWORD, BENCH_EMAIL_DOMAIN, MATERIALS, zipf_cum_weights
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_HTML = os.path.join(BENCH_DIR, 'fixtures', 'jakmall_search.html')
+FIXTURE_URL = 'https://www.jakmall.com/search?q=aksesoris+tangan+gelang'
+SERVER_TIMING_DB = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Menjalankan suite benchmark dan menulis hasil JSON.")
+    parser.add_argument('--iterations', type=int, default=200, help="Iterasi terukur per skenario HTTP. Default 200.")
+    parser.add_argument('--warmup', type=int, default=20, help="Iterasi pemanasan (tidak diukur). Default 20.")
+    parser.add_argument('--login-iterations', type=int, default=30, help="Iterasi auth.login. Default 30.")
+    parser.add_argument('--csv-rows', type=int, default=300, help="Jumlah baris CSV untuk csv_import. Default 300.")
+    parser.add_argument('--crawl-pages', type=int, default=20, help="Jumlah halaman untuk crawl.ingest_*. Default 20.")
+    parser.add_argument('--seed', type=int, default=1234, help="Seed pemilihan parameter request. Default 1234.")
+    parser.add_argument('--only', help="Grup skenario yang dijalankan, dipisahkan koma (contoh: list_products,auth).")
+    parser.add_argument('--output', help="File hasil JSON. Default benchmarks/results/<waktu>.json.")
+    return parser.parse_args()
+
+
+def summarize(latencies, sql_counts=(), errors=0, **extra):
+    ordered = sorted(latencies)
+
+    def percentile(fraction):
+        return round(ordered[min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)], 3)
+
+    total_seconds = sum(ordered) / 1000
+    return {
+        "iterations": len(ordered),
+        "errors": errors,
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(ordered[-1], 3),
+        "ops_per_sec": round(len(ordered) / total_seconds, 1) if total_seconds else None,
+        "avg_sql_count": round(statistics.fmean(sql_counts), 2) if sql_counts else None,
+        **extra,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def delete_products(source_url_pattern):
+    """
+    Menghapus produk (dan read model/staging turunannya) yang dibuat oleh skenario benchmark.
+    product_cards dibersihkan lewat ProductCardService.refresh_cards() agar agregat facet dan versi katalog
+    ikut diperbarui, bukan dihapus langsung.
+    """
+    from app.services.product_card_service import ProductCardService
+
+    product_ids = db.session.execute(
+        text("SELECT id FROM products WHERE source_url LIKE :pattern"), {"pattern": source_url_pattern}
+    ).scalars().all()
+    if product_ids:
+        db.session.execute(text("DELETE FROM products WHERE id = ANY(:ids)"), {"ids": product_ids})
+        ProductCardService.refresh_cards(product_ids)
+        for table in ('product_observations', 'product_changes'):
+            db.session.execute(text(f"DELETE FROM {table} WHERE product_id = ANY(:ids)"), {"ids": product_ids})
+    db.session.execute(text("DELETE FROM product_staging WHERE source_url LIKE :pattern"), {"pattern": source_url_pattern})
+    db.session.commit()
+    return len(product_ids)
+
+
+class BenchmarkSuite:
+    def __init__(self, app, args):
+        self.app = app
+        self.args = args
+        self.client = app.test_client()
+        self.rnd = random.Random(args.seed)
+        self.results = {}
+
+    # --- Data uji dari database hasil seed_synthetic.py ---
+
+    def load_dataset(self):
+        with self.app.app_context():
+            counts = {
+                table: db.session.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+                for table in ('products', 'brands', 'categories', 'product_images', 'users', 'sessions', 'user_activities')
+            }
+            if not counts['products'] or not counts['users']:
+                raise SystemExit("Database kosong. Isi dulu dengan benchmarks/seed_synthetic.py.")
+            self.product_ids = db.session.execute(text("SELECT id FROM products ORDER BY id")).scalars().all()
+            self.top_categories = db.session.execute(text(
+                "SELECT category_id FROM products WHERE category_id IS NOT NULL "
+                "GROUP BY category_id ORDER BY count(*) DESC LIMIT 10"
+            )).scalars().all()
+            self.price_quartiles = db.session.execute(text(
+                "SELECT percentile_cont(ARRAY[0.25, 0.75]) WITHIN GROUP (ORDER BY price) FROM products"
+            )).scalar()
+            active_sessions = db.session.execute(text(
+                "SELECT s.token, s.user_id FROM sessions s JOIN users u ON u.id = s.user_id "
+                "WHERE s.expiry_time > now() AND u.email LIKE :domain"
+            ), {"domain": f"%@{BENCH_EMAIL_DOMAIN}"}).all()
+            activity_counts = dict(db.session.execute(text(
+                "SELECT user_id, count(*) FROM user_activities WHERE user_id = ANY(:ids) GROUP BY user_id"
+            ), {"ids": [row.user_id for row in active_sessions]}).all())
+            by_activity = sorted(active_sessions, key=lambda row: activity_counts.get(row.user_id, 0), reverse=True)
+            self.feed_tokens = [row.token for row in by_activity[:50]]
+            self.tokens = [row.token for row in active_sessions]
+            # Login mengganti sesi user; pakai user tanpa sesi agar token skenario lain tetap berlaku
+            self.login_emails = db.session.execute(text(
+                "SELECT email FROM users u WHERE email LIKE :domain "
+                "AND NOT EXISTS (SELECT 1 FROM sessions s WHERE s.user_id = u.id) ORDER BY id LIMIT 200"
+            ), {"domain": f"%@{BENCH_EMAIL_DOMAIN}"}).scalars().all()
+            self.brand_names = db.session.execute(text("SELECT name FROM brands ORDER BY id LIMIT 20")).scalars().all()
+            self.category_names = db.session.execute(text("SELECT name FROM categories ORDER BY id LIMIT 20")).scalars().all()
+        if not self.tokens:
+            raise SystemExit("Tidak ada sesi aktif di database. Jalankan ulang seed_synthetic.py.")
+        self.product_weights = zipf_cum_weights(len(self.product_ids), 1.0)
+        self.popularity_order = self.product_ids[:]
+        random.Random(self.args.seed).shuffle(self.popularity_order)
+        return counts
+
+    def auth_headers(self, tokens=None):
+        return {"Authorization": f"Bearer {self.rnd.choice(tokens or self.tokens)}"}
+
+    # --- Runner ---
+
+    def run_http(self, name, make_request, iterations=None, before_each=None):
+        """
+        make_request(rnd) -> (method, url, kwargs untuk test client). Jumlah query diambil dari header Server-Timing.
+        """
+        iterations = iterations or self.args.iterations
+        latencies, sql_counts = [], []
+        errors = 0
+        for index in range(self.args.warmup + iterations):
+            method, url, kwargs = make_request(self.rnd)
+            if before_each:
+                before_each()
+            started = time.perf_counter()
+            response = self.client.open(url, method=method, **kwargs)
+            response.get_data()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if index < self.args.warmup:
+                continue
+            latencies.append(elapsed_ms)
+            if response.status_code >= 400:
+                errors += 1
+            match = SERVER_TIMING_DB.search(response.headers.get('Server-Timing', ''))
+            if match:
+                sql_counts.append(int(match.group(1)))
+        self.record(name, summarize(latencies, sql_counts, errors))
+
+    def record(self, name, result):
+        self.results[name] = result
+        print(f"{name:32s} p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+              f"sql {result['avg_sql_count'] if result['avg_sql_count'] is not None else '-':>6}  "
+              f"error {result['errors']}", flush=True)
+
+    # --- Skenario ---
+
+    def bench_list_products(self):
+        last_page = max(1, len(self.product_ids) // Config.DEFAULT_PAGE_SIZE)
+        low, high = (float(value) for value in self.price_quartiles)
+        self.run_http('list_products.default', lambda rnd: ('GET', '/api/products/', {}))
+        self.run_http('list_products.filter', lambda rnd: (
+            'GET', f"/api/products/?category_id={rnd.choice(self.top_categories)}&min_price={low:.0f}&max_price={high:.0f}", {}
+        ))
+        self.run_http('list_products.search', lambda rnd: (
+            'GET', f"/api/products/?search={rnd.choice(MATERIALS).split()[0].lower()}", {}
+        ))
+        self.run_http('list_products.multi_sort', lambda rnd: (
+            'GET', f"/api/products/?sort_by=price,created_at&sort_order=asc,desc&page={rnd.randint(1, 20)}", {}
+        ))
+        self.run_http('list_products.deep_page', lambda rnd: (
+            'GET', f"/api/products/?page={rnd.randint(last_page // 2, last_page)}", {}
+        ))
+
+    def bench_product_detail(self):
+        def make_request(rnd):
+            product_id = rnd.choices(self.popularity_order, cum_weights=self.product_weights)[0]
+            return 'GET', f"/api/products/{product_id}", {"headers": self.auth_headers()}
+        self.run_http('product_detail', make_request)
+
+    def bench_activity_feed(self):
+        self.run_http('activity_feed', lambda rnd: (
+            'GET', f"/api/users/activities?per_page=50&page={rnd.randint(1, 3)}", {"headers": self.auth_headers(self.feed_tokens)}
+        ))
+
+    def bench_auth(self):
+        from app.services.auth_service import AuthService
+
+        self.run_http('auth.token_cached', lambda rnd: ('GET', '/api/users/profile', {"headers": self.auth_headers()}))
+        self.run_http('auth.token_uncached', lambda rnd: ('GET', '/api/users/profile', {"headers": self.auth_headers()}),
+                      before_each=lambda: AuthService._get_token_cache().clear())
+        if not self.login_emails:
+            print("auth.login dilewati: tidak ada user tanpa sesi.")
+            return
+        self.run_http('auth.login', lambda rnd: ('POST', '/api/auth/login', {"json": {
+            "email": rnd.choice(self.login_emails), "password": BENCH_PASSWORD
+        }}), iterations=self.args.login_iterations)
+        with self.app.app_context():
+            db.session.execute(text(
+                "DELETE FROM sessions WHERE user_id IN (SELECT id FROM users WHERE email = ANY(:emails))"
+            ), {"emails": self.login_emails})
+            db.session.commit()
+
+    def bench_csv_import(self):
+        from import_products_from_csv import import_products_from_csv
+
+        run_id = uuid.uuid4().hex[:8]
+        pattern = f"bench-csv://{run_id}/%"
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'products.csv')
+            with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(['name', 'Harga', 'source_url', 'image_url', 'brand', 'Kategori', 'description'])
+                for index in range(self.args.csv_rows):
+                    writer.writerow([
+                        f"Produk Impor {run_id} {index}", f"Rp {self.rnd.randint(10, 500) * 1000:,}".replace(',', '.'),
+                        f"bench-csv://{run_id}/{index}", f"https://cdn.bench.example/csv/{run_id}/{index}.jpg",
+                        self.rnd.choice(self.brand_names), self.rnd.choice(self.category_names), "Produk impor CSV benchmark",
+                    ])
+            started = time.perf_counter()
+            import_products_from_csv(path)
+            elapsed = time.perf_counter() - started
+        with self.app.app_context():
+            imported = delete_products(pattern)
+        result = summarize([elapsed * 1000], rows=self.args.csv_rows, imported=imported,
+                           rows_per_sec=round(self.args.csv_rows / elapsed, 1))
+        self.record('csv_import', result)
+
+    def bench_crawl(self):
+        from app.services.crawler_service import CrawlerService
+
+        with open(FIXTURE_HTML, encoding='utf-8') as fixture:
+            html = fixture.read()
+        latencies = []
+        for index in range(self.args.warmup + self.args.iterations):
+            started = time.perf_counter()
+            products = CrawlerService.scrape_jakmall_product_list_page(html, FIXTURE_URL)
+            CrawlerService._extract_jakmall_pagination_links(html, FIXTURE_URL)
+            if index >= self.args.warmup:
+                latencies.append((time.perf_counter() - started) * 1000)
+        self.record('crawl.parse', summarize(latencies, products_per_page=len(products), html_bytes=len(html)))
+
+        run_id = uuid.uuid4().hex[:8]
+        with self.app.app_context():
+            max_brand_id = db.session.execute(text("SELECT COALESCE(MAX(id), 0) FROM brands")).scalar()
+            try:
+                for phase in ('ingest_new', 'ingest_existing'):
+                    latencies = []
+                    for page in range(self.args.crawl_pages):
+                        latencies.append(self._ingest_page(CrawlerService, html, run_id, page))
+                    self.record(f"crawl.{phase}", summarize(latencies, products_per_page=len(products)))
+            finally:
+                db.session.rollback()
+                delete_products(f"%bench_run={run_id}%")
+                db.session.execute(text(
+                    "DELETE FROM brands b WHERE b.id > :max_id AND NOT EXISTS (SELECT 1 FROM products p WHERE p.brand_id = b.id)"
+                ), {"max_id": max_brand_id})
+                db.session.commit()
+
+    def _ingest_page(self, crawler_service, html, run_id, page):
+        """
+        Satu halaman seperti loop crawl: parse, simpan ke staging, ingest ke katalog, refresh read model, commit.
+        """
+        from flask import current_app
+        from app.services.product_card_service import ProductCardService
+        from app.services.price_history_service import PriceHistoryService
+
+        started = time.perf_counter()
+        products = crawler_service.scrape_jakmall_product_list_page(html, FIXTURE_URL)
+        ingested = []
+        for product_data in products:
+            product_data['source_url'] = f"{product_data['source_url']}?bench_run={run_id}&page={page}"
+            crawler_service.save_scraped_data(product_data)
+            ingested.append(crawler_service._ingest_staging_to_main_products(
+                product_data, current_app.config['MIN_STOCK_RANDOM'], current_app.config['MAX_STOCK_RANDOM']
+            ))
+        db.session.flush()
+        product_ids = [product.id for product in ingested]
+        ProductCardService.refresh_cards(product_ids)
+        PriceHistoryService.record_observations(product_ids)
+        db.session.commit()
+        return (time.perf_counter() - started) * 1000
+
+
+SCENARIOS = (
+    ('list_products', BenchmarkSuite.bench_list_products),
+    ('product_detail', BenchmarkSuite.bench_product_detail),
+    ('activity_feed', BenchmarkSuite.bench_activity_feed),
+    ('auth', BenchmarkSuite.bench_auth),
+    ('csv_import', BenchmarkSuite.bench_csv_import),
+    ('crawl', BenchmarkSuite.bench_crawl),
+)
+
+
+def main():
+    args = parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    # Ingest ulang (crawl.ingest_existing) memberi peringatan per produk; cukup error yang ditampilkan
+    logging.getLogger('app.services.crawler_service').setLevel(logging.ERROR)
+    app = create_app()
+    suite = BenchmarkSuite(app, args)
+    dataset = suite.load_dataset()
+    with app.app_context():
+        postgres_version = db.session.execute(text("SHOW server_version")).scalar()
+        database = db.engine.url.render_as_string(hide_password=True)
+
+    started_at = datetime.now(timezone.utc)
+    print(f"Dataset: {dataset}")
+    selected = [prefix.strip() for prefix in args.only.split(',')] if args.only else None
+    for name, scenario in SCENARIOS:
+        if selected is None or name in selected:
+            scenario(suite)
+
+    with app.app_context():
+        from app.services.activity_service import ActivityService
+        ActivityService.flush(timeout=10)
+
+    output = args.output or os.path.join(BENCH_DIR, 'results', f"{started_at:%Y%m%dT%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as result_file:
+        json.dump({
+            "meta": {
+                "started_at": started_at.isoformat(),
+                "git_commit": git_commit(),
+                "python": platform.python_version(),
+                "postgres": postgres_version,
+                "database": database,
+                "cpu_count": os.cpu_count(),
+                "iterations": args.iterations,
+                "warmup": args.warmup,
+                "seed": args.seed,
+                "dataset": dataset,
+            },
+            "results": suite.results,
+        }, result_file, indent=2)
+    print(f"Hasil ditulis ke {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,302 @@
+"""
+Generator katalog sintetis untuk benchmark (benchmarks/run_benchmarks.py).
+
+Mengisi database dengan produk, kategori, merek, inventory, gambar, user, sesi, dan aktivitas dengan distribusi
+yang menyerupai data nyata:
+- popularitas merek, kategori, dan produk mengikuti distribusi Zipf (sedikit yang sangat populer, ekor panjang)
+- harga log-normal (median sekitar Rp75.000), ~8% produk stok habis, 1-5 gambar per produk
+- jumlah aktivitas per user heavy-tailed (Pareto), lebih banyak event di hari-hari terakhir
+- ~30% user memiliki sesi, sebagian sudah kadaluwarsa
+
+Data dimuat dengan COPY per chunk, lalu read model (product_cards, facet, rollup harian) dibangun ulang dan
+tabel di-ANALYZE. Hasilnya deterministik untuk --seed yang sama. Semua user sintetis memakai password
+BENCH_PASSWORD. Hanya untuk database lokal khusus benchmark: --reset mengosongkan tabel katalog, user, dan
+turunannya (TRUNCATE).
+
+Cara pakai:
+    python benchmarks/seed_synthetic.py --products 10000 --reset
+    python benchmarks/seed_synthetic.py --products 1000000 --users 200000 --activities-per-user 30 --reset
+"""
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app import create_app, db
+from app.cli import migrate_database
+from app.utils.partitions import ensure_monthly_partitions
+
+BENCH_PASSWORD = 'benchpass123'
+BENCH_EMAIL_DOMAIN = 'bench.example'
+CHUNK_SIZE = 20000
+
+KINDS = ['Gelang', 'Kalung', 'Cincin', 'Anting', 'Jam Tangan', 'Bros', 'Liontin', 'Gelang Kaki', 'Tas Selempang', 'Dompet']
+AUDIENCES = ['Pria', 'Wanita', 'Anak', 'Unisex']
+MATERIALS = ['Kulit', 'Titanium', 'Stainless Steel', 'Perak 925', 'Kayu', 'Manik-manik', 'Tali Kur', 'Emas Imitasi',
+             'Kanvas', 'Resin', 'Mutiara', 'Tembaga']
+STYLES = ['Vintage', 'Minimalis', 'Korea', 'Etnik', 'Premium', 'Casual', 'Elegan', 'Sporty', 'Bohemian', 'Klasik']
+OCCASIONS = ['sehari-hari', 'pesta', 'hadiah ulang tahun', 'kantor', 'liburan', 'pernikahan', 'wisuda']
+BRAND_WORDS = ['Aksesoris', 'Galeri', 'Butik', 'Kedai', 'Pusat', 'Rumah', 'Toko', 'Sentra', 'Studio', 'Gudang']
+BRAND_NAMES = ['Bunda', 'Cantik', 'Anggrek', 'Melati', 'Sinar', 'Jaya', 'Makmur', 'Lestari', 'Permata', 'Mulia',
+               'Indah', 'Abadi', 'Sejahtera', 'Nusantara', 'Kencana']
+
+# Jenis aktivitas dan bobotnya; related product untuk jenis yang berkaitan dengan produk
+ACTIVITY_TYPES = [
+    ('view_product', 70), ('add_to_cart', 10), ('login', 8), ('view_profile', 5),
+    ('update_cart_item', 3), ('remove_from_cart', 2), ('purchase', 2),
+]
+PRODUCT_ACTIVITIES = {'view_product', 'add_to_cart', 'update_cart_item', 'remove_from_cart'}
+
+RESET_TABLES = (
+    'user_activities', 'user_activity_daily', 'product_activity_daily', 'product_trending_scores',
+    'product_neighbors', 'product_cards', 'product_facet_counts', 'product_changes', 'product_observations',
+    'stock_reservations', 'order_items', 'orders', 'cart_items', 'carts', 'sessions', 'users',
+    'product_images', 'inventory', 'products', 'product_staging', 'brands', 'categories',
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Mengisi database benchmark dengan katalog sintetis.")
+    parser.add_argument('--products', type=int, default=10000, help="Jumlah produk (10k-1M). Default 10000.")
+    parser.add_argument('--users', type=int, help="Jumlah user. Default produk / 10 (minimal 1000).")
+    parser.add_argument('--brands', type=int, help="Jumlah merek. Default produk / 200 (minimal 50).")
+    parser.add_argument('--activities-per-user', type=float, default=20, help="Rata-rata aktivitas per user. Default 20.")
+    parser.add_argument('--activity-days', type=int, default=90, help="Rentang hari aktivitas ke belakang. Default 90.")
+    parser.add_argument('--seed', type=int, default=42, help="Seed random (data deterministik). Default 42.")
+    parser.add_argument('--reset', action='store_true', help="Kosongkan tabel katalog/user terlebih dahulu (TRUNCATE).")
+    args = parser.parse_args()
+    args.users = args.users or max(1000, args.products // 10)
+    args.brands = args.brands or max(50, args.products // 200)
+    return args
+
+
+def zipf_cum_weights(n, exponent):
+    """
+    Bobot kumulatif Zipf untuk peringkat 1..n (untuk random.choices(cum_weights=...)).
+    """
+    total = 0.0
+    cumulative = []
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** exponent
+        cumulative.append(total)
+    return cumulative
+
+
+def copy_rows(cursor, table, columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(['' if value is None else value for value in row])
+    buffer.seek(0)
+    # Kolom kosong tanpa tanda kutip dibaca sebagai NULL (default format CSV COPY)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def reset_tables():
+    db.session.execute(text(f"TRUNCATE {', '.join(RESET_TABLES)} RESTART IDENTITY CASCADE"))
+    db.session.commit()
+
+
+def ensure_empty():
+    for table in ('products', 'users', 'brands', 'categories'):
+        if db.session.execute(text(f"SELECT EXISTS (SELECT 1 FROM {table})")).scalar():
+            raise SystemExit(f"Tabel {table} tidak kosong. Jalankan dengan --reset pada database khusus benchmark.")
+
+
+def sync_sequences():
+    for table in ('categories', 'brands', 'products', 'inventory', 'product_images', 'users', 'sessions', 'user_activities'):
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+        ))
+    db.session.commit()
+
+
+def generate_categories(cursor, now):
+    names = [f"{kind} {audience}" for kind in KINDS for audience in AUDIENCES]
+    copy_rows(cursor, 'categories', ('id', 'name', 'description', 'created_at', 'updated_at'), (
+        (index, name, f"Koleksi {name.lower()}", now, now) for index, name in enumerate(names, start=1)
+    ))
+    return names
+
+
+def generate_brands(cursor, rnd, count, now):
+    names = set()
+    while len(names) < count:
+        base = f"{rnd.choice(BRAND_WORDS)} {rnd.choice(BRAND_NAMES)}"
+        names.add(base if base not in names else f"{base} {len(names)}")
+    copy_rows(cursor, 'brands', ('id', 'name', 'description', 'created_at', 'updated_at'), (
+        (index, name, None, now, now) for index, name in enumerate(sorted(names), start=1)
+    ))
+
+
+def generate_products(raw, rnd, args, category_names, now):
+    cursor = raw.cursor()
+    brand_weights = zipf_cum_weights(args.brands, 1.1)
+    category_weights = zipf_cum_weights(len(category_names), 0.8)
+    brand_ids = list(range(1, args.brands + 1))
+    category_ids = list(range(1, len(category_names) + 1))
+    rnd.shuffle(brand_ids)
+    rnd.shuffle(category_ids)
+    image_id = 0
+    created_window = 730 * 86400
+
+    for chunk_start in range(1, args.products + 1, CHUNK_SIZE):
+        chunk_ids = range(chunk_start, min(chunk_start + CHUNK_SIZE, args.products + 1))
+        brands = rnd.choices(brand_ids, cum_weights=brand_weights, k=len(chunk_ids))
+        categories = rnd.choices(category_ids, cum_weights=category_weights, k=len(chunk_ids))
+        products, inventory, images = [], [], []
+        for product_id, brand_id, category_id in zip(chunk_ids, brands, categories):
+            kind = category_names[category_id - 1].rsplit(' ', 1)[0]
+            material = rnd.choice(MATERIALS)
+            style = rnd.choice(STYLES)
+            name = f"{kind} {material} {style} {rnd.choice('ABCDEFGHJKLMNPRSTUVWXYZ')}{rnd.randint(10, 9999)}"
+            description = (f"{name}. Bahan {material.lower()} berkualitas, gaya {style.lower()}, "
+                           f"cocok untuk {rnd.choice(OCCASIONS)}.")
+            price = min(max(round(rnd.lognormvariate(math.log(75000), 1.0) / 500) * 500, 1000), 50000000)
+            created_at = now - timedelta(seconds=created_window * rnd.random() ** 2)
+            updated_at = created_at + timedelta(seconds=(now - created_at).total_seconds() * rnd.random() * 0.5)
+            products.append((
+                product_id, name, description, price, f"synthetic://product/{product_id}",
+                category_id if rnd.random() > 0.05 else None, brand_id, created_at, updated_at,
+            ))
+            quantity = 0 if rnd.random() < 0.08 else int(rnd.expovariate(1 / 40)) + 1
+            inventory.append((product_id, product_id, quantity, updated_at))
+            image_count = rnd.choices((1, 2, 3, 4, 5), weights=(30, 30, 20, 12, 8))[0]
+            for position in range(image_count):
+                image_id += 1
+                images.append((image_id, product_id, f"https://cdn.bench.example/p/{product_id}/{position}.jpg",
+                               position == 0, created_at))
+
+        copy_rows(cursor, 'products', ('id', 'name', 'description', 'price', 'source_url', 'category_id', 'brand_id',
+                                       'created_at', 'updated_at'), products)
+        copy_rows(cursor, 'inventory', ('id', 'product_id', 'quantity', 'last_updated'), inventory)
+        copy_rows(cursor, 'product_images', ('id', 'product_id', 'image_url', 'is_main', 'created_at'), images)
+        raw.commit()
+        print(f"  produk {chunk_ids[-1]}/{args.products}", flush=True)
+    return image_id
+
+
+def generate_users_and_sessions(raw, rnd, args, password_hash, now):
+    cursor = raw.cursor()
+    session_id = 0
+    for chunk_start in range(1, args.users + 1, CHUNK_SIZE):
+        chunk_ids = range(chunk_start, min(chunk_start + CHUNK_SIZE, args.users + 1))
+        users, sessions = [], []
+        for user_id in chunk_ids:
+            role = 'admin' if user_id <= 5 else 'pembeli'
+            created_at = now - timedelta(days=365 * rnd.random())
+            users.append((user_id, f"user{user_id}@{BENCH_EMAIL_DOMAIN}", password_hash, role, f"User {user_id}",
+                          created_at, created_at))
+            if rnd.random() < 0.3:
+                session_id += 1
+                expired = rnd.random() < 0.2
+                expiry = now - timedelta(hours=rnd.randint(1, 240)) if expired else now + timedelta(days=rnd.randint(1, 30))
+                sessions.append((session_id, user_id, role, f"bench{user_id:08d}{rnd.getrandbits(256):064x}", expiry,
+                                 expiry - timedelta(days=30)))
+        copy_rows(cursor, 'users', ('id', 'email', 'password_hash', 'role', 'name', 'created_at', 'updated_at'), users)
+        copy_rows(cursor, 'sessions', ('id', 'user_id', 'user_role', 'token', 'expiry_time', 'created_at'), sessions)
+        raw.commit()
+    return session_id
+
+
+def generate_activities(raw, rnd, args, now):
+    cursor = raw.cursor()
+    product_weights = zipf_cum_weights(args.products, 1.0)
+    popularity_order = list(range(1, args.products + 1))
+    rnd.shuffle(popularity_order)
+    type_names = [name for name, _ in ACTIVITY_TYPES]
+    type_weights = [weight for _, weight in ACTIVITY_TYPES]
+    # Pareto alpha 1.3 memiliki rata-rata 1.3 / 0.3; skala disesuaikan agar rata-rata mendekati target
+    pareto_scale = args.activities_per_user / (1.3 / 0.3)
+    window_seconds = args.activity_days * 86400
+    activity_id = 0
+    rows = []
+
+    def flush_rows():
+        copy_rows(cursor, 'user_activities', ('id', 'user_id', 'activity_type', 'related_id', 'related_type', 'details',
+                                              'timestamp'), rows)
+        raw.commit()
+        rows.clear()
+
+    for user_id in range(1, args.users + 1):
+        count = min(int(rnd.paretovariate(1.3) * pareto_scale), 5000)
+        if not count:
+            continue
+        types = rnd.choices(type_names, weights=type_weights, k=count)
+        products = rnd.choices(popularity_order, cum_weights=product_weights, k=count)
+        for activity_type, product_id in zip(types, products):
+            activity_id += 1
+            timestamp = now - timedelta(seconds=window_seconds * rnd.random() ** 1.5)
+            if activity_type in PRODUCT_ACTIVITIES:
+                details = json.dumps({"quantity": rnd.randint(1, 3)}) if activity_type != 'view_product' else None
+                rows.append((activity_id, user_id, activity_type, product_id, 'product', details, timestamp))
+            else:
+                rows.append((activity_id, user_id, activity_type, None, None, None, timestamp))
+        if len(rows) >= CHUNK_SIZE:
+            flush_rows()
+    if rows:
+        flush_rows()
+    return activity_id
+
+
+def main():
+    args = parse_args()
+    rnd = random.Random(args.seed)
+    app = create_app()
+    started = time.perf_counter()
+
+    with app.app_context():
+        from app.services.auth_service import AuthService
+        from app.services.product_card_service import ProductCardService
+        from app.services.facet_service import FacetService
+        from app.services.activity_rollup_service import ActivityRollupService, ACTIVITIES_TABLE
+
+        migrate_database()
+        ensure_monthly_partitions(ACTIVITIES_TABLE, months_ahead=0, months_behind=args.activity_days // 28 + 1)
+        db.session.commit()
+        if args.reset:
+            reset_tables()
+        ensure_empty()
+
+        print(f"Database: {db.engine.url.render_as_string(hide_password=True)}")
+        print(f"Produk: {args.products}, merek: {args.brands}, user: {args.users}, "
+              f"aktivitas/user: {args.activities_per_user}, seed: {args.seed}")
+
+        now = datetime.now(timezone.utc)
+        password_hash = AuthService.hash_password(BENCH_PASSWORD)
+        raw = db.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            category_names = generate_categories(cursor, now)
+            generate_brands(cursor, rnd, args.brands, now)
+            raw.commit()
+            images = generate_products(raw, rnd, args, category_names, now)
+            sessions = generate_users_and_sessions(raw, rnd, args, password_hash, now)
+            activities = generate_activities(raw, rnd, args, now)
+        finally:
+            raw.close()
+        sync_sequences()
+        loaded = time.perf_counter()
+        print(f"Data dimuat dalam {loaded - started:.1f} s: {images} gambar, {sessions} sesi, {activities} aktivitas.")
+
+        ProductCardService.rebuild_all()
+        FacetService.rebuild()
+        today = now.date()
+        ActivityRollupService.rollup_range(today - timedelta(days=args.activity_days), today)
+        db.session.commit()
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.execute(text("ANALYZE"))
+        print(f"Read model dan statistik dibangun dalam {time.perf_counter() - loaded:.1f} s.")
+
+
+if __name__ == '__main__':
+    main()
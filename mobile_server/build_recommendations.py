@@ -0,0 +1,26 @@
+import os
+import sys
+import logging
+
+# Tambahkan direktori root proyek ke Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from app import create_app
+from app.services.recommendation_service import RecommendationService
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def build_recommendations():
+    """
+    Membangun ulang tabel product_neighbors (produk serupa dari co-view) secara manual.
+    Job yang sama dijalankan setiap malam oleh scheduler (worker.py).
+    """
+    app = create_app()
+
+    with app.app_context():
+        total = RecommendationService.build_neighbors()
+        logger.info(f"Build rekomendasi selesai: {total} produk memiliki produk serupa.")
+
+if __name__ == '__main__':
+    build_recommendations()
@@ -0,0 +1,49 @@
+import multiprocessing
+import os
+
+# Konfigurasi gunicorn untuk web worker API: gunicorn -c gunicorn.conf.py wsgi:app
+# Skema database disiapkan terpisah sebelum deploy: flask --app wsgi migrate
+# Aplikasi di-preload di master (import, indeks typeahead) lalu di-fork ke worker (copy-on-write).
+
+# Batas waktu statement untuk request API (job batch di worker.py tidak dibatasi). Harus di-set sebelum app dimuat.
+os.environ.setdefault('DB_STATEMENT_TIMEOUT_MS', '15000')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+
+# Worker yang menerima SIGTERM berhenti menerima koneksi baru dan menyelesaikan request yang sedang berjalan
+# sampai graceful_timeout sebelum dimatikan paksa.
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Worker didaur ulang berkala agar pertumbuhan memori per proses tetap terbatas
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 500))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+
+
+def post_fork(server, worker):
+    # Koneksi pool yang dibuka master saat preload tidak boleh dipakai bersama oleh worker
+    from wsgi import app
+    from app import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    # Buffer aktivitas dan counter trending proses ini ditulis sebelum worker keluar
+    from wsgi import app
+    from app.services.activity_service import ActivityService
+    from app.services.trending_service import TrendingService
+    with app.app_context():
+        try:
+            ActivityService.flush(timeout=graceful_timeout)
+            TrendingService.flush()
+        except Exception as e:
+            server.log.error(f"Gagal menulis buffer worker {worker.pid} saat shutdown: {e}")
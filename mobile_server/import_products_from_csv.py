@@ -1,7 +1,6 @@
 import os
 import sys
 import logging
-import pandas as pd
 from datetime import datetime, timezone
 from sqlalchemy.exc import IntegrityError
 import random # <-- Impor modul random
@@ -11,12 +10,17 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.'))
 
 from app import create_app, db
 from app.models.product import Product, Category, Brand, ProductImage, Inventory # Impor Inventory
+from app.services.product_card_service import ProductCardService
+from app.services.price_history_service import PriceHistoryService
 
 # Konfigurasi logging untuk script ini
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 def import_products_from_csv(csv_file_path):
+    # pandas hanya dimuat saat impor benar-benar dijalankan
+    import pandas as pd
+
     logger.info(f"Memulai impor produk dari CSV: {csv_file_path}")
 
     app = create_app()
@@ -121,6 +125,11 @@ def import_products_from_csv(csv_file_path):
                     )
                     db.session.add(new_inventory)
 
+                    # Read model product_cards dan observasi harga/stok ikut dicatat di transaksi yang sama
+                    db.session.flush()
+                    ProductCardService.refresh_cards([new_product.id])
+                    PriceHistoryService.record_observations([new_product.id])
+
                     db.session.commit()
                     processed_count += 1
                     logger.info(f"Produk '{product_name}' berhasil diimpor.")
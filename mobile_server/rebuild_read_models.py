@@ -0,0 +1,28 @@
+import os
+import sys
+import logging
+
+# Tambahkan direktori root proyek ke Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from app import create_app
+from app.services.product_card_service import ProductCardService
+from app.services.facet_service import FacetService
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def rebuild_read_models():
+    """
+    Membangun ulang read model turunan (product_cards, product_facet_counts) dari tabel sumber.
+    Jalankan sekali setelah membuat tabel baru atau jika read model tidak sinkron.
+    """
+    app = create_app()
+
+    with app.app_context():
+        total_cards = ProductCardService.rebuild_all()
+        total_facets = FacetService.rebuild()
+        logger.info(f"Rebuild read model selesai. product_cards: {total_cards} produk, product_facet_counts: {total_facets} baris.")
+
+if __name__ == '__main__':
+    rebuild_read_models()
@@ -1,41 +1,29 @@
-from app import create_app, db
-from app.services.crawler_service import CrawlerService
+from app import create_app
+from app.jobs import register_jobs
+from app.cli import migrate_database
 import logging
-import threading
+import os
 from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime, timezone
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-app = create_app()
-
-def scheduled_crawl_job():
-    print(f"[{datetime.now(timezone.utc)}] -- DEBUG: Fungsi scheduled_crawl_job dipanggil! --")
+# Mode development: server Flask dan scheduler dalam satu proses.
+# Produksi: web dengan `gunicorn -c gunicorn.conf.py wsgi:app`, crawler/scheduler dengan `python worker.py`.
 
-    with app.app_context():
-        logger.info(f"[{datetime.now(timezone.utc)}] Memulai job crawling terjadwal...")
-        
-        seed_url_default = "https://www.jakmall.com/search?q=aksesoris%20fashion"
-        crawling_limit_per_run = 1
-
-        try:
-            CrawlerService.start_jakmall_scraping_selenium(seed_url_default, crawling_limit_per_run)
-            logger.info(f"[{datetime.now(timezone.utc)}] Job crawling terjadwal selesai.")
-        except Exception as e:
-            logger.error(f"[{datetime.now(timezone.utc)}] Job crawling terjadwal gagal: {e}")
+app = create_app()
 
 scheduler = BackgroundScheduler()
-
-# --- Tambahkan job ini untuk eksekusi SEGERA saat startup ---
-scheduler.add_job(scheduled_crawl_job, 'date', run_date=datetime.now(timezone.utc), id='initial_crawl_job') # <-- Job pertama, jalankan sekarang
-
-# --- Job ini untuk eksekusi berulang SETELAH itu ---
-scheduler.add_job(scheduled_crawl_job, 'interval', hours=1, id='recurring_crawl_job') # <-- Job berulang
+register_jobs(scheduler, app)
 
 if __name__ == '__main__':
-    logger.info("Memulai aplikasi Flask dan scheduler...")
+    # Produksi menjalankan `flask --app wsgi migrate` sekali per deploy; development langsung menyiapkan skema.
+    # Hanya saat dijalankan langsung: import run.py (termasuk reloader) tidak menjalankan DDL.
+    with app.app_context():
+        migrate_database()
+
+    logger.info("Memulai aplikasi Flask dan scheduler (mode development)...")
 
     scheduler.start()
 
-    app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=False)
\ No newline at end of file
+    app.run(debug=os.environ.get('FLASK_DEBUG', 'true').lower() == 'true', host='0.0.0.0', port=5000, use_reloader=False)
@@ -2,12 +2,25 @@
 SET client_min_messages TO WARNING;
 
 -- Hapus tabel jika sudah ada (untuk memudahkan pengujian/pengembangan)
+DROP TABLE IF EXISTS sync_watermarks CASCADE;
+DROP TABLE IF EXISTS crawl_jobs CASCADE;
+DROP TABLE IF EXISTS stock_reservations CASCADE;
+DROP TABLE IF EXISTS product_neighbors CASCADE;
 DROP TABLE IF EXISTS order_items CASCADE;
 DROP TABLE IF EXISTS orders CASCADE;
 DROP TABLE IF EXISTS cart_items CASCADE;
 DROP TABLE IF EXISTS carts CASCADE;
+DROP TABLE IF EXISTS product_trending_scores CASCADE;
+DROP TABLE IF EXISTS product_activity_daily CASCADE;
+DROP TABLE IF EXISTS user_activity_daily CASCADE;
 DROP TABLE IF EXISTS user_activities CASCADE;
 DROP TABLE IF EXISTS sessions CASCADE;
+DROP TABLE IF EXISTS product_observations CASCADE;
+DROP TABLE IF EXISTS product_changes CASCADE;
+DROP TABLE IF EXISTS product_facet_counts CASCADE;
+DROP TABLE IF EXISTS catalog_version CASCADE;
+DROP TABLE IF EXISTS product_card_refresh_queue CASCADE;
+DROP TABLE IF EXISTS product_cards CASCADE;
 DROP TABLE IF EXISTS product_images CASCADE; 
 DROP TABLE IF EXISTS inventory CASCADE; 
 DROP TABLE IF EXISTS products CASCADE; 
@@ -92,7 +105,7 @@ CREATE INDEX idx_products_brand_id ON products (brand_id);
 CREATE TABLE inventory (
     id SERIAL PRIMARY KEY,
     product_id INTEGER UNIQUE NOT NULL,
-    quantity INTEGER NOT NULL DEFAULT 0,
+    quantity INTEGER NOT NULL DEFAULT 0 CHECK (quantity >= 0),
     last_updated TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
 
     FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
@@ -100,6 +113,7 @@ CREATE TABLE inventory (
 
 CREATE UNIQUE INDEX idx_inventory_product_id ON inventory (product_id);
 CREATE INDEX idx_inventory_quantity ON inventory (quantity);
+CREATE INDEX idx_inventory_last_updated ON inventory (last_updated);
 
 ---
 
@@ -155,7 +169,7 @@ CREATE TABLE sessions (
     id SERIAL PRIMARY KEY,
     user_id INTEGER NOT NULL,
     user_role VARCHAR(50) NOT NULL,
-    token VARCHAR(255) UNIQUE NOT NULL,
+    token VARCHAR(255) NOT NULL, -- Unik lewat idx_sessions_token (tanpa constraint UNIQUE terpisah agar tidak ada indeks ganda)
     expiry_time TIMESTAMP WITH TIME ZONE NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
 
@@ -163,25 +177,34 @@ CREATE TABLE sessions (
 );
 
 CREATE UNIQUE INDEX idx_sessions_token ON sessions (token);
-CREATE INDEX idx_sessions_expiry ON sessions (expiry_time);
+CREATE INDEX idx_sessions_expiry ON sessions (expiry_time); -- Dipakai reaper sesi kadaluwarsa
+CREATE INDEX idx_sessions_user_id ON sessions (user_id); -- Penghapusan sesi lama saat login
 
 ---
 
--- 10. Tabel USER_ACTIVITIES
+-- 10. Tabel USER_ACTIVITIES (event append-only, dipartisi per bulan)
+-- Partisi bulanan (user_activities_pYYYYMM) dibuat oleh app/utils/partitions.py saat startup dan oleh job
+-- terjadwal; partisi yang lebih tua dari ACTIVITY_RETENTION_MONTHS di-DROP. Analitik membaca tabel rollup (22, 23).
 CREATE TABLE user_activities (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     user_id INTEGER NOT NULL,
     activity_type VARCHAR(100) NOT NULL,
     related_id INTEGER NULL,
     related_type VARCHAR(50) NULL,
     details JSONB NULL,
-    timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
 
+    PRIMARY KEY (id, timestamp),
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-);
+) PARTITION BY RANGE (timestamp);
 
 CREATE INDEX idx_activity_user_time_type ON user_activities (user_id, timestamp DESC, activity_type);
 CREATE INDEX idx_activity_related ON user_activities (related_type, related_id);
+-- Pasangan user-produk view_product dalam rentang waktu (job rekomendasi) tanpa membaca aktivitas lain
+CREATE INDEX idx_activity_view_product_time ON user_activities (timestamp, related_id) WHERE activity_type = 'view_product';
+
+-- Partisi DEFAULT: menampung event jika partisi bulanannya belum dibuat (dipindahkan saat partisi bulan itu dibuat)
+CREATE TABLE user_activities_default PARTITION OF user_activities DEFAULT;
 
 ---
 
@@ -225,10 +248,12 @@ CREATE TABLE orders (
     status VARCHAR(50) NOT NULL DEFAULT 'pending',
     shipping_address TEXT NOT NULL,
     payment_method VARCHAR(100),
+    idempotency_key VARCHAR(100), -- Dari header Idempotency-Key; checkout ulang dengan key sama mengembalikan order yang sama
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
 
-    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE RESTRICT
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE RESTRICT,
+    CONSTRAINT uq_orders_user_idempotency UNIQUE (user_id, idempotency_key)
 );
 
 CREATE INDEX idx_orders_user_id ON orders (user_id);
@@ -250,4 +275,228 @@ CREATE TABLE order_items (
 );
 
 CREATE INDEX idx_order_items_order_id ON order_items (order_id);
-CREATE INDEX idx_order_items_product_id ON order_items (product_id);
\ No newline at end of file
+CREATE INDEX idx_order_items_product_id ON order_items (product_id);
+
+---
+
+-- 15. Tabel PRODUCT_CARDS (read model datar untuk list_products, dipelihara oleh ProductCardService)
+CREATE TABLE product_cards (
+    product_id INTEGER PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    description TEXT,
+    price NUMERIC(15, 2) NOT NULL,
+    source_url VARCHAR(255),
+
+    category_id INTEGER,
+    category_name VARCHAR(100),
+    category_description TEXT,
+    brand_id INTEGER,
+    brand_name VARCHAR(100),
+    brand_description TEXT,
+
+    main_image_id INTEGER,
+    main_image_url VARCHAR(255),
+    main_image_is_main BOOLEAN,
+
+    stock INTEGER NOT NULL DEFAULT 0,
+    rating DOUBLE PRECISION,
+    review_count INTEGER,
+
+    created_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE
+    -- Tanpa FOREIGN KEY: produk yang dihapus dibersihkan oleh ProductCardService.refresh_cards()
+);
+
+CREATE INDEX idx_product_cards_created_at ON product_cards (created_at DESC);
+CREATE INDEX idx_product_cards_price ON product_cards (price);
+CREATE INDEX idx_product_cards_name ON product_cards (name);
+CREATE INDEX idx_product_cards_stock ON product_cards (stock);
+CREATE INDEX idx_product_cards_category_created ON product_cards (category_id, created_at DESC);
+CREATE INDEX idx_product_cards_brand_created ON product_cards (brand_id, created_at DESC);
+
+---
+
+-- 16. Tabel CATALOG_VERSION (satu baris; dinaikkan setiap perubahan product_cards, dasar ETag daftar produk)
+CREATE TABLE catalog_version (
+    id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO catalog_version (id, version) VALUES (1, 0);
+
+---
+
+-- 17. Tabel PRODUCT_FACET_COUNTS (agregat facet untuk kasus tanpa filter dan satu filter kategori/merek)
+CREATE TABLE product_facet_counts (
+    scope_type VARCHAR(20) NOT NULL,
+    scope_id INTEGER NOT NULL,
+    facet_type VARCHAR(20) NOT NULL,
+    facet_value INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (scope_type, scope_id, facet_type, facet_value)
+);
+
+---
+
+-- 18. Tabel PRODUCT_CHANGES (log perubahan append-only untuk delta-sync; token sync = posisi (txid, id) terakhir)
+-- id dibagikan sebelum commit (bukan urutan commit); txid transaksi penulis dipakai bersama xmin snapshot agar
+-- entri dari transaksi yang commit belakangan tidak terlewat oleh klien.
+CREATE TABLE product_changes (
+    id BIGSERIAL PRIMARY KEY,
+    txid BIGINT NOT NULL DEFAULT (pg_current_xact_id()::text::bigint),
+    product_id INTEGER NOT NULL,
+    change_type VARCHAR(20) NOT NULL, -- inserted, updated, price_changed, stock_changed, deleted
+    changed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_product_changes_product_id ON product_changes (product_id);
+CREATE INDEX idx_product_changes_position ON product_changes (txid, id);
+
+---
+
+-- 19. Tabel PRODUCT_OBSERVATIONS (riwayat harga & stok append-only, dipartisi per bulan)
+-- Partisi bulanan (product_observations_pYYYYMM) dibuat oleh app/utils/partitions.py saat startup
+-- dan oleh job terjadwal, beberapa bulan ke depan.
+CREATE TABLE product_observations (
+    product_id INTEGER NOT NULL,
+    observed_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    price NUMERIC(15, 2) NOT NULL,
+    stock INTEGER,
+
+    PRIMARY KEY (product_id, observed_at)
+) PARTITION BY RANGE (observed_at);
+
+-- Partisi DEFAULT: menampung observasi jika partisi bulanannya belum dibuat
+CREATE TABLE product_observations_default PARTITION OF product_observations DEFAULT;
+
+---
+
+-- 20. Tabel STOCK_RESERVATIONS (reservasi stok berumur pendek untuk checkout)
+CREATE TABLE stock_reservations (
+    id BIGSERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    quantity INTEGER NOT NULL CHECK (quantity > 0),
+    status VARCHAR(20) NOT NULL DEFAULT 'active', -- active, consumed, released, expired
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    order_id INTEGER,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE,
+    FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE SET NULL
+);
+
+CREATE INDEX idx_reservations_active_expiry ON stock_reservations (expires_at) WHERE status = 'active';
+CREATE INDEX idx_reservations_user_id ON stock_reservations (user_id);
+
+---
+
+-- 21. Tabel PRODUCT_NEIGHBORS (rekomendasi "produk serupa" dari co-view, dibangun ulang oleh job offline)
+-- Satu baris per produk: neighbor_ids dan scores berurutan dari skor tertinggi.
+CREATE TABLE product_neighbors (
+    product_id INTEGER PRIMARY KEY,
+    neighbor_ids INTEGER[] NOT NULL,
+    scores REAL[] NOT NULL,
+    computed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+);
+
+---
+
+-- 22. Tabel USER_ACTIVITY_DAILY (rollup harian aktivitas per pengguna, dihitung ulang per hari dari user_activities)
+CREATE TABLE user_activity_daily (
+    day DATE NOT NULL,
+    user_id INTEGER NOT NULL,
+    activity_type VARCHAR(100) NOT NULL,
+    event_count INTEGER NOT NULL,
+
+    PRIMARY KEY (day, user_id, activity_type)
+);
+
+---
+
+-- 23. Tabel PRODUCT_ACTIVITY_DAILY (rollup harian aktivitas per produk; tanpa FK agar riwayat tetap ada)
+CREATE TABLE product_activity_daily (
+    day DATE NOT NULL,
+    product_id INTEGER NOT NULL,
+    activity_type VARCHAR(100) NOT NULL,
+    event_count INTEGER NOT NULL,
+    unique_users INTEGER NOT NULL,
+
+    PRIMARY KEY (day, product_id, activity_type)
+);
+
+-- Statistik harian satu produk (endpoint activity-stats)
+CREATE INDEX idx_product_activity_daily_product ON product_activity_daily (product_id, day);
+
+---
+
+-- 24. Tabel PRODUCT_TRENDING_SCORES (counter view produk dengan peluruhan eksponensial per window)
+-- log_score = ln(sum bobot * exp(t_event / tau)); skor saat t = exp(log_score - t / tau). Nilai hanya berubah
+-- saat ada event, sehingga urutan log_score = urutan trending saat ini dan kenaikan dari beberapa proses bisa digabung.
+CREATE TABLE product_trending_scores (
+    window_name VARCHAR(16) NOT NULL,
+    product_id INTEGER NOT NULL,
+    log_score DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (window_name, product_id)
+);
+
+-- Top-N per window: index scan tanpa sort
+CREATE INDEX idx_trending_window_score ON product_trending_scores (window_name, log_score DESC);
+
+---
+
+-- 25. Tabel CRAWL_JOBS (job crawling yang dimasukkan API/scheduler dan dijalankan oleh proses crawler)
+CREATE TABLE crawl_jobs (
+    id SERIAL PRIMARY KEY,
+    seed_url VARCHAR(255) NOT NULL,
+    crawling_limit INTEGER NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- queued, running, completed, failed, cancelled
+    source VARCHAR(20) NOT NULL DEFAULT 'api', -- api, scheduler
+    requested_by INTEGER,
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+    urls_processed INTEGER NOT NULL DEFAULT 0,
+    products_ingested INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_expires_at TIMESTAMP WITH TIME ZONE, -- diperpanjang proses crawler selama job 'running'
+    error_message TEXT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (requested_by) REFERENCES users(id) ON DELETE SET NULL
+);
+
+-- Satu job aktif per seed URL (target ON CONFLICT saat submit)
+CREATE UNIQUE INDEX uq_crawl_jobs_active_seed ON crawl_jobs (seed_url) WHERE status IN ('queued', 'running');
+-- Klaim job antrean tertua oleh dispatcher
+CREATE INDEX idx_crawl_jobs_queued ON crawl_jobs (created_at, id) WHERE status = 'queued';
+-- Riwayat job (terbaru lebih dulu, opsional per status)
+CREATE INDEX idx_crawl_jobs_status_created ON crawl_jobs (status, created_at DESC);
+CREATE INDEX idx_crawl_jobs_created ON crawl_jobs (created_at DESC);
+
+---
+
+-- 26. Tabel SYNC_WATERMARKS (titik lanjut job sinkronisasi, mis. inventory.last_updated terakhir untuk sinkronisasi stok)
+CREATE TABLE sync_watermarks (
+    name VARCHAR(50) PRIMARY KEY,
+    position TIMESTAMP WITH TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+---
+
+-- 27. Tabel PRODUCT_CARD_REFRESH_QUEUE (produk yang refresh product_cards-nya gagal; diproses ulang oleh job terjadwal)
+CREATE TABLE product_card_refresh_queue (
+    product_id INTEGER PRIMARY KEY,
+    queued_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
@@ -0,0 +1,105 @@
+"""
+Kebenaran PrefixIndex (app/utils/prefix_index.py) terhadap pencarian brute-force:
+filter prefix pada semua key setiap entri lalu heapq.nlargest dengan urutan (skor, nama terpendek, ref).
+Tidak membutuhkan database.
+
+Cara pakai (dari direktori mobile_server):
+    python -m unittest discover tests
+"""
+import heapq
+import random
+import unittest
+
+from app.utils.prefix_index import PrefixIndex, index_keys, normalize
+
+WORDS = ["gelang", "gelas", "kulit", "tangan", "tas", "tali", "kabel", "kaca", "sepatu", "sendok", "Émas", "perak"]
+QUERIES = ["g", "gel", "gela", "ta", "tas", "k", "ka", "kabel k", "se", "emas", "PERAK", "x", "gelang kulit", "  "]
+LIMITS = [1, 3, 5, 20, 50]
+
+
+def brute_force_search(entries, query, limit, max_words):
+    prefix = normalize(query)
+    if not prefix:
+        return []
+    matches = [
+        (score, -len(name), ref)
+        for ref, (name, score, payload) in entries.items()
+        if any(key.startswith(prefix) for key in index_keys(name, max_words))
+    ]
+    return [(ref, entries[ref][0], entries[ref][2]) for _, _, ref in heapq.nlargest(limit, matches)]
+
+
+class PrefixIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.random = random.Random(20260301)
+        self.entries = {}
+        for number in range(300):
+            self.entries[('product', number)] = self.random_entry(number)
+
+    def random_entry(self, number):
+        name = ' '.join(self.random.choice(WORDS) for _ in range(self.random.randint(1, 4)))
+        # Skor sengaja banyak yang sama agar urutan nama terpendek dan ref ikut teruji
+        return name, float(self.random.randint(0, 10)), {"id": number}
+
+    def build_index(self):
+        # block_size kecil agar range pencarian melintasi banyak blok sparse table
+        return PrefixIndex.build(
+            ((ref, name, score, payload) for ref, (name, score, payload) in self.entries.items()),
+            max_words=3, max_limit=20, block_size=4
+        )
+
+    def assert_matches_brute_force(self, index):
+        for query in QUERIES:
+            for limit in LIMITS:
+                with self.subTest(query=query, limit=limit):
+                    self.assertEqual(
+                        index.search(query, limit),
+                        brute_force_search(self.entries, query, limit, index.max_words)
+                    )
+
+    def test_build_matches_brute_force(self):
+        index = self.build_index()
+
+        self.assertEqual(len(index), len(self.entries))
+        self.assert_matches_brute_force(index)
+
+    def test_updated_matches_brute_force(self):
+        index = self.build_index()
+
+        removals = self.random.sample(sorted(self.entries), 40)
+        for ref in removals:
+            del self.entries[ref]
+        upserts = []
+        for ref in self.random.sample(sorted(self.entries), 40):
+            # Nama baru, skor baru, atau skor lama dipertahankan (None)
+            name, score, payload = self.random_entry(ref[1])
+            keep_score = self.random.random() < 0.3
+            upserts.append((ref, name, None if keep_score else score, payload))
+            self.entries[ref] = (name, self.entries[ref][1] if keep_score else score, payload)
+        for number in range(300, 330):
+            ref = ('product', number)
+            name, score, payload = self.random_entry(number)
+            upserts.append((ref, name, score, payload))
+            self.entries[ref] = (name, score, payload)
+
+        updated = index.updated(upserts=upserts, removals=removals)
+
+        self.assertEqual(len(updated), len(self.entries))
+        self.assert_matches_brute_force(updated)
+
+    def test_updated_leaves_original_unchanged(self):
+        index = self.build_index()
+        before = {query: index.search(query, 20) for query in QUERIES}
+
+        index.updated(
+            upserts=[(('product', 999), "gelang baru", 100.0, {"id": 999})],
+            removals=[('product', 0), ('product', 1)]
+        )
+
+        for query in QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(index.search(query, 20), before[query])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Paritas serializer cepat (app/schemas/product_serializer.py) terhadap ProductSchema (marshmallow).
+Tidak membutuhkan database: objek Product dibuat transient di memori.
+
+Cara pakai (dari direktori mobile_server):
+    python -m unittest discover tests
+"""
+import unittest
+from collections import namedtuple
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from app.models.product import Product, Category, Brand, ProductImage, Inventory
+from app.schemas.product_schema import ProductSchema
+from app.schemas.product_serializer import (
+    PRODUCT_FIELDS, PRODUCT_ROW_COLUMNS, PRODUCT_CARD_COLUMNS,
+    dump_product, dump_products, dump_product_row, dump_product_card_row
+)
+
+ProductRow = namedtuple('ProductRow', [column.key for column in PRODUCT_ROW_COLUMNS])
+CardRow = namedtuple('CardRow', [column.key for column in PRODUCT_CARD_COLUMNS])
+
+CREATED_AT = datetime(2026, 3, 1, 8, 30, 15, 123456, tzinfo=timezone.utc)
+UPDATED_AT = datetime(2026, 3, 2, 9, 0, tzinfo=timezone.utc)
+
+
+def make_full_product():
+    product = Product(
+        id=1, name="Gelang Kulit", description="Gelang kulit asli", price=Decimal("125000.50"),
+        source_url="https://www.jakmall.com/gelang-kulit", created_at=CREATED_AT, updated_at=UPDATED_AT,
+    )
+    product.category = Category(id=3, name="Aksesoris", description="Aksesoris tangan")
+    product.category_id = 3
+    product.brand = Brand(id=7, name="TokoA", description=None)
+    product.brand_id = 7
+    product.images = [
+        ProductImage(id=11, image_url="https://cdn.jakmall.com/1/a.jpg", is_main=False),
+        ProductImage(id=12, image_url="https://cdn.jakmall.com/1/b.jpg", is_main=True),
+    ]
+    product.inventory = Inventory(quantity=42)
+    return product
+
+
+def make_sparse_product():
+    """
+    Produk dengan nilai kosong: tanpa deskripsi, kategori, merek, gambar, inventory, dan updated_at.
+    """
+    product = Product(
+        id=2, name="Cincin Polos", description=None, price=Decimal("9999.00"),
+        source_url=None, created_at=CREATED_AT, updated_at=None,
+    )
+    product.images = []
+    return product
+
+
+def make_zero_price_product():
+    product = Product(
+        id=3, name="Bonus", description="", price=Decimal("0.00"),
+        source_url="https://www.jakmall.com/bonus", created_at=None, updated_at=None,
+    )
+    product.brand = Brand(id=8, name="TokoB", description="Merek B")
+    product.brand_id = 8
+    product.images = [ProductImage(id=31, image_url="https://cdn.jakmall.com/3/a.jpg", is_main=None)]
+    product.inventory = Inventory(quantity=0)
+    return product
+
+
+def to_row(product):
+    return ProductRow(
+        id=product.id, name=product.name, description=product.description, price=product.price,
+        source_url=product.source_url, category_id=product.category_id, brand_id=product.brand_id,
+        created_at=product.created_at, updated_at=product.updated_at,
+        category_name=product.category.name if product.category else None,
+        category_description=product.category.description if product.category else None,
+        brand_name=product.brand.name if product.brand else None,
+        brand_description=product.brand.description if product.brand else None,
+        stock=product.inventory.quantity if product.inventory else None,
+    )
+
+
+def main_image(product):
+    """
+    Gambar utama seperti di ProductCardService: is_main lebih dulu, lalu id terkecil.
+    """
+    images = sorted(product.images, key=lambda image: (not image.is_main, image.id))
+    return images[0] if images else None
+
+
+def to_card_row(product, rating=None, review_count=None):
+    image = main_image(product)
+    return CardRow(
+        **to_row(product)._asdict(),
+        main_image_id=image.id if image else None,
+        main_image_url=image.image_url if image else None,
+        main_image_is_main=image.is_main if image else None,
+        rating=rating,
+        review_count=review_count,
+    )
+
+
+def expected_card(product, rating=None, review_count=None):
+    """
+    Bentuk kartu produk: ProductSchema dengan images berisi gambar utama saja, ditambah rating dan review_count.
+    """
+    expected = ProductSchema().dump(product)
+    expected["images"] = [image for image in expected["images"] if image["id"] == getattr(main_image(product), 'id', None)]
+    expected["rating"] = rating
+    expected["review_count"] = review_count
+    return expected
+
+
+class ProductSerializerParityTest(unittest.TestCase):
+    def setUp(self):
+        self.products = [make_full_product(), make_sparse_product(), make_zero_price_product()]
+
+    def test_dump_product_matches_schema(self):
+        for product in self.products:
+            with self.subTest(product_id=product.id):
+                self.assertEqual(dump_product(product), ProductSchema().dump(product))
+
+    def test_dump_products_matches_schema(self):
+        self.assertEqual(dump_products(self.products), ProductSchema(many=True).dump(self.products))
+
+    def test_dump_product_keeps_decimal_price(self):
+        data = dump_product(self.products[0])
+        self.assertIsInstance(data["price"], Decimal)
+        self.assertEqual(data["price"], ProductSchema().dump(self.products[0])["price"])
+
+    def test_dump_product_sparse_fields_matches_schema(self):
+        field_sets = [("id", "name"), ("id", "price", "stock"), ("id", "category", "brand", "images"), PRODUCT_FIELDS]
+        for product in self.products:
+            for fields in field_sets:
+                with self.subTest(product_id=product.id, fields=fields):
+                    self.assertEqual(dump_product(product, fields), ProductSchema(only=fields).dump(product))
+
+    def test_dump_product_row_matches_schema(self):
+        for product in self.products:
+            with self.subTest(product_id=product.id):
+                self.assertEqual(dump_product_row(to_row(product), product.images), ProductSchema().dump(product))
+
+    def test_dump_product_card_row_matches_schema(self):
+        cases = [(self.products[0], 4.5, 120), (self.products[1], None, None), (self.products[2], 0.0, 0)]
+        for product, rating, review_count in cases:
+            with self.subTest(product_id=product.id):
+                self.assertEqual(
+                    dump_product_card_row(to_card_row(product, rating, review_count)),
+                    expected_card(product, rating, review_count)
+                )
+
+    def test_dump_product_card_row_sparse_fields(self):
+        product = self.products[0]
+        expected = expected_card(product, 4.5, 120)
+        for fields in [("id", "name"), ("id", "images", "rating"), ("id", "category", "stock", "review_count")]:
+            with self.subTest(fields=fields):
+                self.assertEqual(
+                    dump_product_card_row(to_card_row(product, 4.5, 120), fields),
+                    {field: expected[field] for field in fields}
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Token sync dan klasifikasi perubahan product_cards (app/services/sync_service.py).
+Tidak membutuhkan database: lookup txid untuk token lama di-mock.
+
+Cara pakai (dari direktori mobile_server):
+    python -m unittest discover tests
+"""
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from app import db
+from app.services.sync_service import (
+    SyncService, START_POSITION, CHANGE_INSERTED, CHANGE_UPDATED, CHANGE_PRICE, CHANGE_STOCK, CHANGE_DELETED
+)
+
+COLUMNS = ['name', 'price', 'stock', 'brand_name']
+
+
+class SyncTokenTest(unittest.TestCase):
+    def test_round_trip(self):
+        for position in [(0, 0), (1, 1), (815, 42), (2 ** 40, 2 ** 50)]:
+            with self.subTest(position=position):
+                token = SyncService.format_sync_token(position)
+                self.assertEqual(SyncService.parse_sync_token(token), position)
+
+    def test_empty_token_is_full_sync(self):
+        for token in [None, '']:
+            with self.subTest(token=token):
+                self.assertEqual(SyncService.parse_sync_token(token), START_POSITION)
+
+    def test_legacy_id_token_maps_to_change_position(self):
+        with mock.patch.object(db, 'session') as session:
+            session.execute.return_value.scalar.return_value = 815
+            self.assertEqual(SyncService.parse_sync_token('42'), (815, 42))
+
+    def test_legacy_id_token_for_unknown_change_is_full_sync(self):
+        with mock.patch.object(db, 'session') as session:
+            session.execute.return_value.scalar.return_value = None
+            self.assertEqual(SyncService.parse_sync_token('42'), START_POSITION)
+
+    def test_invalid_tokens_raise_value_error(self):
+        for token in ['-1', '1--2', '-1-2', 'abc', '1-abc', '1-2-3', '1.5', ' ']:
+            with self.subTest(token=token):
+                with mock.patch.object(db, 'session') as session:
+                    with self.assertRaises(ValueError):
+                        SyncService.parse_sync_token(token)
+                    session.execute.assert_not_called()
+
+
+class ClassifyChangeTest(unittest.TestCase):
+    def setUp(self):
+        self.card = SimpleNamespace(name="Gelang Kulit", price=125000, stock=5, brand_name="TokoA")
+
+    def changed(self, **values):
+        return SimpleNamespace(**{**vars(self.card), **values})
+
+    def test_insert_and_delete(self):
+        self.assertEqual(SyncService.classify_change(None, self.card, COLUMNS), [CHANGE_INSERTED])
+        self.assertEqual(SyncService.classify_change(self.card, None, COLUMNS), [CHANGE_DELETED])
+        self.assertEqual(SyncService.classify_change(None, None, COLUMNS), [])
+
+    def test_unchanged(self):
+        self.assertEqual(SyncService.classify_change(self.card, self.changed(), COLUMNS), [])
+
+    def test_dedicated_and_other_columns(self):
+        cases = [
+            ({"price": 99000}, [CHANGE_PRICE]),
+            ({"stock": 0}, [CHANGE_STOCK]),
+            ({"name": "Gelang Kulit Asli"}, [CHANGE_UPDATED]),
+            ({"name": "Gelang", "brand_name": None}, [CHANGE_UPDATED]),
+            ({"stock": 0, "price": 99000, "name": "Gelang"}, [CHANGE_UPDATED, CHANGE_PRICE, CHANGE_STOCK]),
+        ]
+        for values, expected in cases:
+            with self.subTest(values=values):
+                self.assertEqual(SyncService.classify_change(self.card, self.changed(**values), COLUMNS), expected)
+
+    def test_only_listed_columns_are_compared(self):
+        self.assertEqual(SyncService.classify_change(self.card, self.changed(stock=0), ['name', 'price']), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
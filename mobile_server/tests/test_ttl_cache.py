@@ -0,0 +1,101 @@
+"""
+Perilaku TTLCache (app/utils/ttl_cache.py): masa berlaku, hasil negatif, LRU dan invalidasi.
+Waktu dikendalikan dengan mem-mock time.monotonic, sehingga tes tidak perlu sleep.
+
+Cara pakai (dari direktori mobile_server):
+    python -m unittest discover tests
+"""
+import unittest
+from unittest import mock
+
+from app.utils.ttl_cache import TTLCache
+
+
+class TTLCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('app.utils.ttl_cache.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_value_expires_after_ttl(self):
+        cache = TTLCache(maxsize=10, ttl=5)
+        cache.set('token', 'user-1')
+
+        self.now += 4
+        self.assertEqual(cache.get('token'), 'user-1')
+        self.now += 1
+        self.assertTrue(TTLCache.is_missing(cache.get('token')))
+        self.assertEqual(cache.get('token', 'default'), 'default')
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["expirations"], stats["size"]), (1, 2, 1, 0))
+
+    def test_explicit_ttl_overrides_default(self):
+        cache = TTLCache(maxsize=10, ttl=5)
+        cache.set('token', 'user-1', ttl=60)
+
+        self.now += 30
+        self.assertEqual(cache.get('token'), 'user-1')
+
+    def test_negative_result_uses_negative_ttl(self):
+        cache = TTLCache(maxsize=10, ttl=5, negative_ttl=1)
+        cache.set('unknown', None)
+
+        value = cache.get('unknown')
+        self.assertIsNone(value)
+        self.assertFalse(TTLCache.is_missing(value))
+        self.now += 1
+        self.assertTrue(TTLCache.is_missing(cache.get('unknown')))
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["negative_hits"], stats["misses"]), (0, 1, 1))
+
+    def test_negative_ttl_defaults_to_ttl(self):
+        cache = TTLCache(maxsize=10, ttl=5)
+        cache.set('unknown', None)
+
+        self.now += 4.9
+        self.assertIsNone(cache.get('unknown'))
+
+    def test_zero_ttl_is_not_stored(self):
+        cache = TTLCache(maxsize=10, ttl=5, negative_ttl=0)
+        cache.set('unknown', None)
+        cache.set('token', 'user-1', ttl=0)
+
+        self.assertTrue(TTLCache.is_missing(cache.get('unknown')))
+        self.assertTrue(TTLCache.is_missing(cache.get('token')))
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(maxsize=2, ttl=5)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertTrue(TTLCache.is_missing(cache.get('b')))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_delete_where_removes_matching_entries(self):
+        cache = TTLCache(maxsize=10, ttl=5)
+        cache.set('token-1', 'user-1')
+        cache.set('token-2', 'user-2')
+        cache.set('token-3', 'user-1')
+        cache.set('token-4', None)
+
+        removed = cache.delete_where(lambda key, value: value == 'user-1')
+
+        self.assertEqual(removed, 2)
+        self.assertTrue(TTLCache.is_missing(cache.get('token-1')))
+        self.assertTrue(TTLCache.is_missing(cache.get('token-3')))
+        self.assertEqual(cache.get('token-2'), 'user-2')
+        self.assertIsNone(cache.get('token-4'))
+        self.assertEqual(cache.stats()["invalidations"], 2)
+        self.assertEqual(cache.delete_where(lambda key, value: False), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import logging
+import os
+import signal
+import sys
+import threading
+
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from app import create_app
+from app.jobs import register_jobs
+from app.services.crawler_service import CrawlerService
+from app.services.crawl_job_service import CrawlJobService
+from app.services.activity_service import ActivityService
+from app.services.trending_service import TrendingService
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Proses crawler/scheduler, terpisah dari web worker: python worker.py (setelah `flask --app wsgi migrate`)
+# Jalankan tepat satu instance; job crawling dari API/scheduler dijalankan di sini (maksimal
+# CRAWL_MAX_CONCURRENT_JOBS bersamaan). SIGTERM/SIGINT: crawling berhenti setelah URL yang sedang diproses,
+# job yang sedang berjalan ditunggu selesai (job crawl kembali ke antrean), lalu buffer proses ini ditulis.
+# Sinyal kedua saat masih menunggu: keluar segera tanpa menunggu job.
+
+
+def main():
+    app = create_app()
+
+    with app.app_context():
+        CrawlerService.release_stale_leases()
+        CrawlJobService.requeue_interrupted()
+
+    # Executor dipegang di sini agar job yang masih berjalan bisa ditunggu di blok finally (bukan di handler sinyal)
+    executor = ThreadPoolExecutor()
+    scheduler = BlockingScheduler(executors={"default": executor}, job_defaults={"coalesce": True, "max_instances": 1})
+    register_jobs(scheduler, app)
+    stopping = threading.Event()
+
+    def handle_shutdown(signum, frame):
+        if stopping.is_set():
+            logger.warning(f"Sinyal {signal.Signals(signum).name} kedua diterima, keluar tanpa menunggu job yang berjalan.")
+            os._exit(1)
+        stopping.set()
+        logger.info(f"Sinyal {signal.Signals(signum).name} diterima, menghentikan worker...")
+        CrawlerService.request_stop()
+        # Handler tidak boleh memblokir: scheduler hanya dihentikan, job yang sedang berjalan ditunggu di finally
+        scheduler.shutdown(wait=False)
+
+    signal.signal(signal.SIGTERM, handle_shutdown)
+    signal.signal(signal.SIGINT, handle_shutdown)
+
+    logger.info("Worker crawler/scheduler dimulai.")
+    try:
+        scheduler.start()
+    finally:
+        # Job crawl yang sedang berjalan berhenti setelah URL saat ini dan kembali ke antrean
+        CrawlerService.request_stop()
+        CrawlJobService.shutdown(wait=True)
+        # Job terjadwal yang masih berjalan (mis. build rekomendasi malam) ditunggu selesai
+        executor.shutdown(wait=True)
+        with app.app_context():
+            ActivityService.flush(timeout=10)
+            TrendingService.flush()
+        logger.info("Worker crawler/scheduler berhenti.")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
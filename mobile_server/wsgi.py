@@ -0,0 +1,5 @@
+from app import create_app
+
+# Entry point WSGI untuk produksi: gunicorn -c gunicorn.conf.py wsgi:app
+# Hanya melayani API; crawling dan job terjadwal berjalan di proses terpisah (worker.py).
+app = create_app()